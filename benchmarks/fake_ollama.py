@@ -0,0 +1,183 @@
+"""
+A stand-in for the Ollama HTTP API, for benchmarks.
+
+Serves /api/chat (streamed or not), /api/generate, /api/tags and /api/ps with canned answers
+for each of the app's prompts. Every token takes `token_latency` seconds. Like a real box with
+limited memory, at most `max_loaded_models` models stay resident. Calling any other model costs
+`load_latency` seconds and evicts the least recently used one.
+
+Usage:
+    PYTHONPATH=. python -m benchmarks.fake_ollama --port 11500 --token-latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeOllamaConfig:
+    token_latency: float = 0.02
+    tokens: int = 12
+    load_latency: float = 2.0
+    max_loaded_models: int = 1
+
+
+@dataclass
+class FakeOllamaState:
+    config: FakeOllamaConfig
+    loaded: OrderedDict = field(default_factory=OrderedDict)
+    loads: int = 0
+    requests: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def ensure_loaded(self, model: str) -> float:
+        """
+        Makes the model resident, returning how long loading it took.
+        """
+        async with self.lock:
+            if model in self.loaded:
+                self.loaded.move_to_end(model)
+                return 0.0
+
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.config.load_latency)
+            self.loaded[model] = True
+            self.loads += 1
+            while len(self.loaded) > self.config.max_loaded_models:
+                self.loaded.popitem(last=False)
+            return time.perf_counter() - started_at
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _tool_names(body: dict) -> set[str]:
+    return {tool.get("function", {}).get("name") for tool in body.get("tools") or []}
+
+
+def _prompt(body: dict) -> str:
+    return "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+
+
+def _classify(prompt: str) -> str:
+    traveller_input = prompt.rsplit("Traveller input:", 1)[-1].lower()
+    if any(word in traveller_input for word in ("flight", "voo", "fly")):
+        return "search_flights"
+    if any(word in traveller_input for word in ("dollar", "euro", "reais", "real", "usd", "eur", "brl")):
+        return "currency_converter"
+    return "translation"
+
+
+def answer_for(body: dict, tokens: int) -> tuple[list[str], list[dict]]:
+    """
+    The text tokens and tool calls the app expects for a chat request.
+    """
+    tools = _tool_names(body)
+    prompt = _prompt(body)
+
+    if "search_flights" in tools:
+        arguments = {"from_airport": "GRU", "to_airport": "LIS", "departure_date": "2099-08-01"}
+        return [], [{"function": {"name": "search_flights", "arguments": arguments}}]
+    if "convert_currency" in tools:
+        arguments = {"amount": 100, "from_currency": "USD", "to_currency": "BRL"}
+        return [], [{"function": {"name": "convert_currency", "arguments": arguments}}]
+    if "Classification:" in prompt:
+        return [_classify(prompt)], []
+
+    words = ["Hola", "mundo", "y", "buen", "viaje", "para", "todos", "los", "viajeros", "de", "hoy", "!"]
+    return [f"{words[i % len(words)]} " for i in range(tokens)], []
+
+
+def create_app(config: FakeOllamaConfig) -> FastAPI:
+    app = FastAPI()
+    state = FakeOllamaState(config)
+    app.state.fake_ollama = state
+
+    def final_message(model: str, load_seconds: float, eval_count: int, started_at: float) -> dict:
+        return {
+            "model": model,
+            "created_at": _now(),
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.perf_counter() - started_at) * 1e9),
+            "load_duration": int(load_seconds * 1e9),
+            "prompt_eval_count": 100,
+            "eval_count": eval_count,
+        }
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        model = body["model"]
+        started_at = time.perf_counter()
+        state.requests += 1
+        load_seconds = await state.ensure_loaded(model)
+        tokens, tool_calls = answer_for(body, config.tokens)
+
+        async def stream():
+            for token in tokens:
+                await asyncio.sleep(config.token_latency)
+                message = {"role": "assistant", "content": token}
+                yield json.dumps({"model": model, "created_at": _now(), "message": message, "done": False}) + "\n"
+            if tool_calls:
+                await asyncio.sleep(config.token_latency * 8)
+                message = {"role": "assistant", "content": "", "tool_calls": tool_calls}
+                yield json.dumps({"model": model, "created_at": _now(), "message": message, "done": False}) + "\n"
+            yield json.dumps(final_message(model, load_seconds, len(tokens) or 8, started_at)) + "\n"
+
+        if body.get("stream", True):
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+        await asyncio.sleep(config.token_latency * (len(tokens) or 8))
+        response = final_message(model, load_seconds, len(tokens) or 8, started_at)
+        response["message"] = {"role": "assistant", "content": "".join(tokens), "tool_calls": tool_calls or None}
+        return JSONResponse(response)
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        started_at = time.perf_counter()
+        load_seconds = await state.ensure_loaded(body["model"])
+        response = final_message(body["model"], load_seconds, 0, started_at)
+        response.pop("message")
+        response["response"] = ""
+        return JSONResponse(response)
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": model, "model": model} for model in state.loaded]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {"models": [{"name": model, "model": model} for model in state.loaded], "loads": state.loads}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=12)
+    parser.add_argument("--load-latency", type=float, default=2.0)
+    parser.add_argument("--max-loaded-models", type=int, default=1)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(args.token_latency, args.tokens, args.load_latency, args.max_loaded_models)
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+End-to-end load and latency benchmark for the API.
+
+`run` starts the fake Ollama server (benchmarks/fake_ollama.py) and the app, both under uvicorn
+on local ports. fast_flights.get_flights and the currency rates are stubbed. Each workload is
+then driven with concurrent clients:
+
+    planning     POST /trip/planning, explicit trips (extractor) mixed with vague ones (LLM planner)
+    translation  POST /assist/stream, routed by the LLM and answered token by token
+    conversion   POST /assist/stream, amounts handled by the rules and the converter fast path
+
+For every workload it reports throughput, latency, time to the first event (first NDJSON line or
+SSE event) and, for token streams, time to the first token, as p50/p95/p99. Results are written
+as JSON, by default to benchmarks/results/<commit>.json, so runs can be compared across commits
+with `compare`.
+
+Usage:
+    PYTHONPATH=. python -m benchmarks.load run --concurrency 8 --requests 40
+    PYTHONPATH=. python -m benchmarks.load compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import patch
+
+import httpx
+import uvicorn
+
+from .fake_ollama import FakeOllamaConfig, create_app as create_fake_ollama
+
+RESULTS_DIR = Path(__file__).parent / "results"
+WORKLOADS = ("planning", "translation", "conversion")
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile, None for no values.
+    Example: percentile([1, 2, 3, 4], 50) -> 2
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def distribution(seconds: list[float]) -> dict:
+    millis = [value * 1000 for value in seconds]
+    return {
+        "p50": percentile(millis, 50),
+        "p95": percentile(millis, 95),
+        "p99": percentile(millis, 99),
+        "mean": sum(millis) / len(millis) if millis else None,
+    }
+
+
+def summarize(samples: list[dict], elapsed: float) -> dict:
+    ok = [sample for sample in samples if sample["ok"]]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+        "latency_ms": distribution([sample["latency"] for sample in ok]),
+        "ttfe_ms": distribution([sample["ttfe"] for sample in ok if sample["ttfe"] is not None]),
+        "ttft_ms": distribution([sample["ttft"] for sample in ok if sample["ttft"] is not None]),
+    }
+
+
+def request_for(workload: str, i: int) -> tuple[str, dict]:
+    if workload == "planning":
+        if i % 2:
+            return "/trip/planning", {"trip_details": f"I'd like to go from São Paulo to Lisbon sometime, trip #{i}"}
+        return "/trip/planning", {"trip_details": f"from GRU to LIS on 2099-08-{i % 28 + 1:02d}"}
+    if workload == "translation":
+        return "/assist/stream", {"input": f"Eu quero uma cerveja gelada número {i}, por favor"}
+    return "/assist/stream", {"input": f"{100 + i} USD"}
+
+
+async def measure(client: httpx.AsyncClient, path: str, payload: dict) -> dict:
+    started_at = time.perf_counter()
+    ttfe = ttft = None
+    try:
+        async with client.stream("POST", path, json=payload) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                now = time.perf_counter() - started_at
+                if ttfe is None:
+                    ttfe = now
+                if ttft is None and line == "event: token":
+                    ttft = now
+            ok = response.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+
+    return {"ok": ok, "latency": time.perf_counter() - started_at, "ttfe": ttfe, "ttft": ttft}
+
+
+async def run_workload(base_url: str, workload: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+
+        async def one(i: int) -> dict:
+            async with semaphore:
+                return await measure(client, *request_for(workload, i))
+
+        started_at = time.perf_counter()
+        samples = await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started_at
+
+    return summarize(samples, elapsed)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(app, port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def stub_get_flights(scrape_latency: float, results: int):
+    def get_flights(**query):
+        # Blocking, like the real scraper, so it occupies a worker thread.
+        time.sleep(scrape_latency)
+        day = datetime.strptime(query["flight_data"][0].date, "%Y-%m-%d").strftime("%a, %b %d, %Y")
+        return SimpleNamespace(
+            flights=[
+                SimpleNamespace(
+                    name=f"Airline {i}",
+                    price=f"R${1500 + (i * 37) % 900}",
+                    departure=f"{i % 12 + 1}:15 AM on {day}",
+                    stops=i % 3,
+                    duration=f"{10 + i % 5} hr {i * 7 % 60} min",
+                )
+                for i in range(results)
+            ]
+        )
+
+    return get_flights
+
+
+async def fake_rates():
+    from src.rates import RateTable
+
+    return RateTable({"USD": Decimal("1"), "BRL": Decimal("5.45"), "EUR": Decimal("0.92")})
+
+
+def git_revision() -> tuple[str, bool]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--", "src"], capture_output=True, text=True)
+        dirty = bool(status.stdout)
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def run(args) -> dict:
+    ollama_config = FakeOllamaConfig(args.token_latency, args.tokens, args.load_latency, args.max_loaded_models)
+    ollama_port = free_port()
+    fake_ollama = create_fake_ollama(ollama_config)
+
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{ollama_port}"
+    os.environ.setdefault("EXCHANGE_RATE_API_KEY", "benchmark")
+    os.environ["LLM_WARM_UP"] = "true" if args.warm_up else "false"
+
+    # The settings are read at import time, so the app is imported once the environment is set.
+    from src.main import app
+    from src.rates import rates_cache
+
+    output = io.StringIO()
+    results = {}
+    with (
+        serve(fake_ollama, ollama_port),
+        patch("src.nodes.flights_planner.tools.get_flights", stub_get_flights(args.scrape_latency, args.results)),
+        patch.object(rates_cache, "loader", fake_rates),
+        contextlib.redirect_stdout(sys.stderr if args.verbose else output),
+        serve(app, free_port()) as base_url,
+    ):
+        for workload in args.workloads:
+            results[workload] = asyncio.run(run_workload(base_url, workload, args.requests, args.concurrency))
+
+    commit, dirty = git_revision()
+    ollama_state = fake_ollama.state.fake_ollama
+    return {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("func", "output", "verbose")},
+        },
+        "workloads": results,
+        "fake_ollama": {"requests": ollama_state.requests, "loads": ollama_state.loads},
+    }
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(result: dict) -> None:
+    print(f"commit {result['meta']['commit']}{' (dirty)' if result['meta']['dirty'] else ''}")
+    print(f"{'workload':<12} {'req/s':>7} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'ttfe p50':>9} {'ttft p50':>9}")
+    for name, stats in result["workloads"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<12} {stats['throughput_rps']:>7.1f} {stats['errors']:>4} {_fmt(latency['p50']):>8} "
+            f"{_fmt(latency['p95']):>8} {_fmt(latency['p99']):>8} {_fmt(stats['ttfe_ms']['p50']):>9} "
+            f"{_fmt(stats['ttft_ms']['p50']):>9}"
+        )
+    print(f"fake ollama: {result['fake_ollama']['requests']} requests, {result['fake_ollama']['loads']} model loads")
+
+
+def compare(before: dict, after: dict) -> list[str]:
+    """
+    One line per workload and metric with the change from `before` to `after`.
+    """
+    lines = [f"{before['meta']['commit']} -> {after['meta']['commit']}"]
+    for name in after["workloads"]:
+        if name not in before["workloads"]:
+            continue
+        old, new = before["workloads"][name], after["workloads"][name]
+        metrics = [("throughput_rps", old["throughput_rps"], new["throughput_rps"])]
+        for group in ("latency_ms", "ttfe_ms", "ttft_ms"):
+            for q in ("p50", "p95", "p99"):
+                metrics.append((f"{group}.{q}", old[group][q], new[group][q]))
+
+        for metric, old_value, new_value in metrics:
+            if old_value is None or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            lines.append(f"{name:<12} {metric:<18} {old_value:>10.1f} {new_value:>10.1f} {change:>+8.1f}%")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the workloads and save the results")
+    run_parser.add_argument("--workloads", type=lambda value: value.split(","), default=list(WORKLOADS))
+    run_parser.add_argument("--requests", type=int, default=40, help="requests per workload")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--token-latency", type=float, default=0.02, help="seconds per generated token")
+    run_parser.add_argument("--tokens", type=int, default=12, help="tokens per text answer")
+    run_parser.add_argument("--load-latency", type=float, default=2.0, help="seconds to load a model")
+    run_parser.add_argument("--max-loaded-models", type=int, default=1)
+    run_parser.add_argument("--scrape-latency", type=float, default=0.5, help="seconds per get_flights call")
+    run_parser.add_argument("--results", type=int, default=40, help="flights returned per get_flights call")
+    run_parser.add_argument("--warm-up", action="store_true", help="warm the models on startup")
+    run_parser.add_argument("--output", type=Path, help="defaults to benchmarks/results/<commit>.json")
+    run_parser.add_argument("--verbose", action="store_true", help="show the app's output")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        before, after = (json.loads(path.read_text()) for path in (args.before, args.after))
+        print("\n".join(compare(before, after)))
+        return
+
+    result = run(args)
+    output = args.output or RESULTS_DIR / f"{result['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print_report(result)
+    print(f"saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
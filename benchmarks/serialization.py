@@ -0,0 +1,84 @@
+"""
+Per-event cost of encoding the /trip/planning stream chunks.
+
+Compares the previous path (model_dump to dicts, JSONResponse, .body.decode()) with
+the TypeAdapter path in src/serialization.py, for a status message and for a
+ranked flights message.
+
+Usage:
+    PYTHONPATH=. python -m benchmarks.serialization [--flights 10] [--number 20000]
+"""
+
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+from src.models import Flight
+from src.serialization import ndjson_line, stream_message
+
+
+def make_flights(count: int) -> list[Flight]:
+    return [
+        Flight(
+            from_airport="GRU",
+            to_airport="LIS",
+            departure_date=datetime(2025, 8, 1, 10, 0) + timedelta(hours=i),
+            airline=f"Airline {i}",
+            price=Decimal("2500.00") + i,
+            currency="BRL",
+            stops=i % 3,
+            duration_in_minutes=600 + i * 15,
+        )
+        for i in range(count)
+    ]
+
+
+def json_response_status() -> str:
+    data = {"response": "Working on your request..."}
+    return JSONResponse(content=data, media_type="application/json").body.decode() + "\n"
+
+
+def json_response_flights(flights: list[Flight]) -> str:
+    data = {
+        "response": "Here are the top ranked flights based on your preferences.",
+        "flights": [flight.model_dump(mode="json") for flight in flights],
+    }
+    return JSONResponse(content=data, media_type="application/json").body.decode() + "\n"
+
+
+def adapter_status() -> bytes:
+    return ndjson_line(stream_message("Working on your request..."))
+
+
+def adapter_flights(flights: list[Flight]) -> bytes:
+    return ndjson_line(stream_message("Here are the top ranked flights based on your preferences.", flights=flights))
+
+
+def per_event_microseconds(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, default=10)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    flights = make_flights(args.flights)
+    cases = [
+        ("status", json_response_status, adapter_status),
+        (f"{args.flights} flights", lambda: json_response_flights(flights), lambda: adapter_flights(flights)),
+    ]
+
+    print(f"{'event':<12} {'JSONResponse (us)':>18} {'TypeAdapter (us)':>17} {'speedup':>8}")
+    for name, before, after in cases:
+        before_us = per_event_microseconds(before, args.number)
+        after_us = per_event_microseconds(after, args.number)
+        print(f"{name:<12} {before_us:>18.2f} {after_us:>17.2f} {before_us / after_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,227 @@
+import hashlib
+import heapq
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Callable, Hashable, Optional
+
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from .config import settings
+from .metrics import CACHE_REQUESTS
 
 redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+binary_redis = Redis.from_url(settings.REDIS_URL, decode_responses=False)
+
+
+class LRUCache:
+    """
+    A bounded in-process mapping that evicts the least recently used entry once `maxsize`
+    is reached and drops entries that were not touched for `ttl` seconds, or that were set
+    more than `ttl` seconds ago when `sliding` is False. A non-sliding cache also takes a
+    per-entry `ttl` in `set`.
+    `on_evict(key, value)` is called for every entry removed by either policy.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        sliding: bool = True,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.sliding = sliding
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        # Deadlines of a non-sliding cache, soonest first. Entries overwritten or removed since
+        # are skipped when they come up, and dropped in bulk once they outnumber the live ones.
+        self._deadlines: list[tuple[float, int, Hashable]] = []
+        self._order = count()
+
+    def __len__(self) -> int:
+        self._purge_expired()
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, default=_MISSING, touch=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, touch: bool = True) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if self._is_expired(expires_at):
+            self._evict(key)
+            return default
+
+        if touch:
+            if self.sliding:
+                self._data[key] = (value, self._expires_at())
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is not None and self.sliding:
+            raise ValueError("A per-entry ttl needs a non-sliding cache")
+
+        expires_at = self._expires_at(ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if not self.sliding and expires_at != float("inf"):
+            heapq.heappush(self._deadlines, (expires_at, next(self._order), key))
+        self._purge_expired()
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._evict(oldest)
+
+    def touch(self, key: Hashable) -> None:
+        """Marks `key` as recently used, inserting it with a `None` value if missing."""
+        if self.get(key, default=_MISSING) is _MISSING:
+            self.set(key, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._deadlines.clear()
+
+    def _expires_at(self, ttl: Optional[float] = None) -> float:
+        ttl = self.ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl is not None else float("inf")
+
+    def _is_expired(self, expires_at: float) -> bool:
+        return expires_at <= time.monotonic()
+
+    def _purge_expired(self) -> None:
+        if not self.sliding:
+            # Deadlines are fixed when set, so recency says nothing about which ones passed.
+            while self._deadlines and self._is_expired(self._deadlines[0][0]):
+                expires_at, _, key = heapq.heappop(self._deadlines)
+                entry = self._data.get(key)
+                if entry is not None and entry[1] == expires_at:
+                    self._evict(key)
+
+            if len(self._deadlines) > 2 * len(self._data) + 16:
+                self._deadlines = [
+                    (expires_at, next(self._order), key)
+                    for key, (_, expires_at) in self._data.items()
+                    if expires_at != float("inf")
+                ]
+                heapq.heapify(self._deadlines)
+            return
+
+        # Entries are kept in recency order and every touch refreshes the deadline,
+        # so expired entries are always at the front.
+        while self._data:
+            key, (_, expires_at) = next(iter(self._data.items()))
+            if not self._is_expired(expires_at):
+                break
+            self._evict(key)
+
+    def _evict(self, key: Hashable) -> None:
+        value, _ = self._data.pop(key)
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+
+class TieredCache:
+    """
+    A bounded in-process LRU in front of Redis string keys under `prefix`.
+    Local entries expire with their Redis keys, however often they are read: `ttl_seconds`
+    after they were set, or when the Redis key they were promoted from expires. Redis errors
+    are treated as misses, so the cache never breaks the request it serves.
+    """
+
+    def __init__(self, prefix: str, maxsize: int, ttl_seconds: Optional[int] = None, client: Redis = redis):
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.client = client
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl_seconds, sliding=False)
+        self.hits = {"local": 0, "redis": 0}
+        self.misses = 0
+
+    def redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.local.get(key)
+        if value is not None:
+            self.hits["local"] += 1
+            CACHE_REQUESTS.labels(self.prefix, "local_hit").inc()
+            return value
+
+        remaining_ms = None
+        try:
+            value = await self.client.get(self.redis_key(key))
+            if value is not None and self.ttl_seconds is not None:
+                remaining_ms = await self.client.pttl(self.redis_key(key))
+        except RedisError as e:
+            print(f"Could not read {self.prefix} cache: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels(self.prefix, "miss").inc()
+            return None
+
+        self.hits["redis"] += 1
+        CACHE_REQUESTS.labels(self.prefix, "redis_hit").inc()
+        # PTTL is -1 for a key without an expiry and -2 for one that expired since the GET.
+        if remaining_ms is None or remaining_ms == -1:
+            self.local.set(key, value)
+        elif remaining_ms > 0:
+            self.local.set(key, value, ttl=remaining_ms / 1000)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self.local.set(key, value)
+
+        try:
+            await self.client.set(self.redis_key(key), value, ex=self.ttl_seconds)
+        except RedisError as e:
+            print(f"Could not write {self.prefix} cache: {e}")
+
+    async def set_many(self, items: dict[str, str]) -> None:
+        """Writes many entries to Redis in one pipelined round trip, without warming the local cache."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self.redis_key(key), value, ex=self.ttl_seconds)
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        lookups = self.hits["local"] + self.hits["redis"] + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+            "local_entries": len(self.local),
+        }
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes free text for use as a cache key: accents and case are dropped, whitespace is
+    collapsed and trailing punctuation is removed.
+    Examples:
+        "  Cerveja! " -> "cerveja"
+        "São  Paulo" -> "sao paulo"
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"\s+", " ", text.casefold()).strip()
+    return text.rstrip(".!?").strip()
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(normalize_text(text).encode()).hexdigest()
+
+
+_MISSING = object()
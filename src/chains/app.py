@@ -1,17 +1,91 @@
-from langchain_core.runnables import RunnableLambda
+from typing import AsyncIterator
+
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_core.output_parsers import PydanticOutputParser
-from .routing import routing_chain, invoke_chain
+from .routing import RoutingDecision, classify, invoke_chain
+from ..llms.scheduler import BATCH, priority
 from ..models import ModelResponse
 
 output_parser = PydanticOutputParser(pydantic_object=ModelResponse)
 
 
-def to_model_response_schema(answer):
-    return ModelResponse(model_response=answer)
+def to_model_response_schema(answer, routing: RoutingDecision | None = None):
+    return ModelResponse(
+        model_response=answer,
+        route=routing.route if routing else None,
+        routing_source=routing.source if routing else None,
+    )
+
+
+class UnsupportedRouteError(ValueError):
+    def __init__(self, route: str):
+        super().__init__(f"Unsupported route: {route}")
+        self.route = route
+
+
+def chain_for(routing: RoutingDecision):
+    chain = invoke_chain({"classification": routing.route})
+    if chain is None:
+        raise UnsupportedRouteError(routing.route)
+    return chain
+
+
+async def answer(input):
+    routing: RoutingDecision = input["routing"]
+    response = await chain_for(routing).ainvoke({"input": input["input"]})
+    return to_model_response_schema(response, routing)
+
+
+classify_chain = RunnableLambda(classify)
+
+app_chain = {"routing": classify_chain, "input": lambda x: x["input"]} | RunnableLambda(answer)
+
+
+def in_batch_priority(chain: Runnable) -> Runnable:
+    """
+    Wraps `chain` so every call it makes runs with batch priority. The priority is set inside each
+    call, never around a `yield`, so it does not leak into the caller of a streaming batch.
+    """
+
+    async def run(input, config):
+        with priority(BATCH):
+            return await chain.ainvoke(input, config)
+
+    return RunnableLambda(run)
+
+
+async def answer_batch(inputs: list[str], max_concurrency: int) -> AsyncIterator[tuple[int, ModelResponse | Exception]]:
+    """
+    Answers many inputs, yielding (index, response or error) pairs in order of completion.
+    Inputs are routed first and then answered one route at a time, so each group runs against the
+    same prompt prefix and resident model. Calls run with batch priority, behind interactive ones.
+    """
+    config = {"max_concurrency": max_concurrency}
+
+    routings = await in_batch_priority(classify_chain).abatch(
+        [{"input": text} for text in inputs], config=config, return_exceptions=True
+    )
+
+    groups: dict[str, list[int]] = {}
+    for index, routing in enumerate(routings):
+        if isinstance(routing, Exception):
+            yield index, routing
+        else:
+            groups.setdefault(routing.route, []).append(index)
 
+    for indices in groups.values():
+        try:
+            chain = chain_for(routings[indices[0]])
+        except UnsupportedRouteError as e:
+            for index in indices:
+                yield index, e
+            continue
 
-app_chain = (
-    {"classification": routing_chain, "input": lambda x: x["input"]}
-    | RunnableLambda(invoke_chain)
-    | RunnableLambda(to_model_response_schema)
-)
+        async for position, output in in_batch_priority(chain).abatch_as_completed(
+            [{"input": inputs[index]} for index in indices], config=config, return_exceptions=True
+        ):
+            index = indices[position]
+            if isinstance(output, Exception):
+                yield index, output
+            else:
+                yield index, to_model_response_schema(output, routings[index])
@@ -1,10 +1,17 @@
+import re
+from typing import Literal, Optional
+
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_ollama import ChatOllama
+from pydantic import BaseModel
 
+from ..cache import TieredCache, text_key
+from ..config import settings
 from ..llms.translator import translator_chain
-from ..llms.currency_converter import currency_converter_chain
+from ..llms.currency_converter import currency_converter_chain, parse_amount
 from ..llms.flights_seacher import search_flights_chain
+from ..llms.registry import get_llm
+from ..nodes.flights_planner.extractor import find_airports, find_date
 
 routing_chain = (
     ChatPromptTemplate.from_template(
@@ -47,7 +54,7 @@ routing_chain = (
         Classification:
     """
     )
-    | ChatOllama(model="gemma3:12b")
+    | get_llm("routing")
     | StrOutputParser()
 )
 
@@ -60,3 +67,60 @@ def invoke_chain(input):
         return currency_converter_chain
     elif "search_flights" in classification:
         return search_flights_chain
+
+
+ROUTES = ("translation", "currency_converter", "search_flights")
+
+FLIGHT_WORDS = re.compile(r"\b(?:flights?|fly|voos?|voar|passagens?|vuelos?)\b", re.IGNORECASE)
+
+
+class RoutingDecision(BaseModel):
+    route: str
+    source: Literal["rules", "cache", "llm"]
+
+
+routing_cache = TieredCache(
+    prefix=settings.ROUTING_CACHE_KEY_PREFIX,
+    maxsize=settings.ROUTING_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ROUTING_CACHE_TTL_SECONDS,
+)
+
+
+def classify_with_rules(text: str) -> Optional[str]:
+    """
+    Classifies inputs that do not need the LLM, returning None when the input is ambiguous.
+    Examples:
+        "54.2 EUR" -> "currency_converter"
+        "R$ 100" -> "currency_converter"
+        "Flights from CWB to GRU on 2025-08-01" -> "search_flights"
+        "Eu quero uma cerveja" -> None
+    """
+    if parse_amount(text) is not None:
+        return "currency_converter"
+
+    if len(find_airports(text)) >= 2 and (find_date(text) or FLIGHT_WORDS.search(text)):
+        return "search_flights"
+
+    return None
+
+
+def parse_route(classification: str) -> str:
+    return next((route for route in ROUTES if route in classification), classification.strip())
+
+
+async def classify(input: dict) -> RoutingDecision:
+    route = classify_with_rules(input["input"])
+    if route is not None:
+        return RoutingDecision(route=route, source="rules")
+
+    key = text_key(input["input"])
+    cached = await routing_cache.get(key)
+    if cached is not None:
+        return RoutingDecision(route=cached, source="cache")
+
+    classification = await routing_chain.ainvoke({"input": input["input"]})
+    route = parse_route(classification)
+    if route in ROUTES:
+        await routing_cache.set(key, route)
+
+    return RoutingDecision(route=route, source="llm")
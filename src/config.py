@@ -6,6 +6,58 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     CURRENCY_CACHE_KEY: str = "currency_rates"
     CURRENCY_CACHE_EXPIRE_SECONDS: int = 3600
+    CURRENCY_RATES_TTL_SECONDS: int = 600
+    CURRENCY_RATES_REFRESH_AFTER_SECONDS: int = 480
+    CURRENCY_API_TIMEOUT_SECONDS: float = 10.0
+    CURRENCY_HOME: str = "BRL"
+    CURRENCY_DESTINATION: str = "EUR"
+    FLIGHTS_CACHE_KEY_PREFIX: str = "flights"
+    FLIGHTS_CACHE_TTL_SECONDS: int = 900
+    FLIGHTS_CACHE_STALE_SECONDS: int = 3600
+    FLIGHTS_EXTRACTION_MIN_CONFIDENCE: float = 0.8
+    FLIGHTS_FLEX_MAX_DAYS: int = 3
+    FLIGHTS_SEARCH_MAX_CONCURRENCY: int = 4
+    FLIGHTS_SEARCH_MAX_COMBINATIONS: int = 30
+    FLIGHTS_SEARCH_TOP_K: int = 10
+    FLIGHTS_STREAM_PARTIAL_RESULTS: bool = False
+    FLIGHTS_CURRENCY: str | None = "BRL"
+    FLIGHTS_RANKING_MODE: str = "deterministic"
+    FLIGHTS_RANKING_TOP_K: int = 3
+    FLIGHTS_RANKING_WEIGHTS: dict[str, float] | None = None
+    FLIGHTS_RANKING_PARETO: bool = False
+    HOTELS_PROVIDER: str | None = None
+    HOTELS_DEFAULT_NIGHTS: int = 3
+    HOTELS_RANKING_TOP_K: int = 3
+    HOTELS_MIN_RATING: float = 0.0
+    PLAN_CACHE_ENABLED: bool = False
+    PLAN_CACHE_TTL_SECONDS: int | None = None
+    PLAN_CACHE_MAX_ENTRIES: int = 1000
+    PLANNING_DEDUP_ENABLED: bool = True
+    PLANNING_DEDUP_RETENTION_SECONDS: float = 30.0
+    ROUTING_CACHE_KEY_PREFIX: str = "routing"
+    ROUTING_CACHE_MAX_ENTRIES: int = 10000
+    ROUTING_CACHE_TTL_SECONDS: int = 86400
+    TRANSLATION_MEMORY_KEY_PREFIX: str = "translation_memory"
+    TRANSLATION_MEMORY_MAX_ENTRIES: int = 10000
+    TRANSLATION_MEMORY_TTL_SECONDS: int | None = None
+    OLLAMA_BASE_URL: str | None = None
+    LLM_ROLE_MODELS: dict[str, str] | None = None
+    LLM_NUM_CTX: dict[str, int] | None = None
+    LLM_KEEP_ALIVE: str | int | None = "30m"
+    LLM_WARM_UP: bool = True
+    LLM_LOAD_THRESHOLD_SECONDS: float = 1.0
+    LLM_MAX_CONCURRENCY: int = 2
+    LLM_MAX_CONCURRENCY_PER_MODEL: dict[str, int] | None = None
+    LLM_MAX_QUEUE: int = 16
+    LLM_MAX_QUEUE_WAIT_SECONDS: float = 30.0
+    ASSIST_BATCH_MAX_CONCURRENCY: int = 4
+    ASSIST_BATCH_MAX_INPUTS: int = 500
+    TRACING_ENABLED: bool = False
+    DEBUG: bool = False
+    CHECKPOINTER: str = "memory"
+    CHECKPOINT_KEY_PREFIX: str = "checkpoint"
+    CHECKPOINT_MAX_THREADS: int = 1000
+    CHECKPOINT_TTL_SECONDS: int = 3600
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
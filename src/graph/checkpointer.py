@@ -0,0 +1,313 @@
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+from redis.asyncio import Redis
+
+from ..cache import LRUCache
+
+KEY_SEPARATOR = "\x00"
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    An in-memory checkpointer that keeps at most `max_threads` threads and forgets threads
+    that were idle for longer than `ttl_seconds`, so the worker memory stays flat under
+    sustained traffic.
+    """
+
+    def __init__(self, max_threads: int, ttl_seconds: Optional[float] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.threads = LRUCache(
+            maxsize=max_threads,
+            ttl=ttl_seconds,
+            on_evict=lambda thread_id, _: self.delete_thread(thread_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id not in self.threads:
+            # Drop whatever an expired thread left behind before it is looked up again.
+            self.delete_thread(thread_id)
+            return None
+
+        self.threads.touch(thread_id)
+        return super().get_tuple(config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self.threads.touch(config["configurable"]["thread_id"])
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.threads.touch(config["configurable"]["thread_id"])
+        return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.threads.pop(thread_id)
+        super().delete_thread(thread_id)
+
+
+class RedisSaver(BaseCheckpointSaver[str]):
+    """
+    A checkpointer that stores threads in Redis so any worker can resume or inspect them.
+
+    Every thread lives in three keys that share a single TTL, refreshed on each write:
+        {prefix}:{thread_id}:index        sorted set of "{checkpoint_ns}<NUL>{checkpoint_id}" members
+        {prefix}:{thread_id}:checkpoints  hash of serialized (checkpoint, metadata, parent_id)
+        {prefix}:{thread_id}:writes       hash of serialized pending writes
+
+    The parts of members and fields are joined with a NUL byte, as subgraph namespaces already
+    contain "|" and ":" (e.g. "parent:1|child:2").
+
+    Values are serialized with the saver serde (msgpack by default) and each step is written
+    in a single pipelined round trip. Only the async API is implemented, as the graph is
+    always driven with `astream`/`ainvoke`.
+
+    The client must be created with `decode_responses=False`.
+    """
+
+    def __init__(self, client: Redis, ttl_seconds: Optional[int] = None, prefix: str = "checkpoint", **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = await self.client.zrevrangebylex(
+                self._index_key(thread_id), *self._ns_range(checkpoint_ns), start=0, num=1
+            )
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode().rsplit(KEY_SEPARATOR, 1)[1]
+
+        return await self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config:
+            thread_ids = [config["configurable"]["thread_id"]]
+        else:
+            thread_ids = [
+                key.decode()[len(self.prefix) + 1 : -len(":index")]
+                async for key in self.client.scan_iter(match=f"{self._escape(self.prefix)}:*:index")
+            ]
+
+        config_checkpoint_id = get_checkpoint_id(config) if config else None
+        before_checkpoint_id = get_checkpoint_id(before) if before else None
+
+        for thread_id in thread_ids:
+            members = await self.client.zrevrangebylex(self._index_key(thread_id), "+", "-")
+
+            for member in members:
+                checkpoint_ns, checkpoint_id = member.decode().rsplit(KEY_SEPARATOR, 1)
+
+                if config and "checkpoint_ns" in config["configurable"]:
+                    if checkpoint_ns != config["configurable"]["checkpoint_ns"]:
+                        continue
+                if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                    continue
+                if before_checkpoint_id and checkpoint_id >= before_checkpoint_id:
+                    continue
+
+                checkpoint_tuple = await self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+                if checkpoint_tuple is None:
+                    continue
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+
+                if limit is not None:
+                    if limit <= 0:
+                        return
+                    limit -= 1
+
+                yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id")
+
+        # Sends are rebuilt from the parent's TASKS writes when the checkpoint is loaded.
+        checkpoint = {**checkpoint, "pending_sends": []}
+        member = self._member(checkpoint_ns, checkpoint["id"])
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                self._checkpoints_key(thread_id),
+                member,
+                self._dumps((checkpoint, get_checkpoint_metadata(config, metadata), parent_checkpoint_id)),
+            )
+            pipe.zadd(self._index_key(thread_id), {member: 0})
+            self._expire_thread(pipe, thread_id)
+            await pipe.execute()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        fields = {}
+        special_fields = {}
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            field = KEY_SEPARATOR.join((self._member(checkpoint_ns, checkpoint_id), task_id, str(write_idx)))
+            packed = self._dumps((task_id, channel, value, task_path))
+            # Regular writes are idempotent per (task, idx), special ones always overwrite.
+            (fields if write_idx >= 0 else special_fields)[field] = packed
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for field, packed in fields.items():
+                pipe.hsetnx(self._writes_key(thread_id), field, packed)
+            if special_fields:
+                pipe.hset(self._writes_key(thread_id), mapping=special_fields)
+            self._expire_thread(pipe, thread_id)
+            await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.client.delete(
+            self._index_key(thread_id),
+            self._checkpoints_key(thread_id),
+            self._writes_key(thread_id),
+        )
+
+    async def _load_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        saved = await self.client.hget(self._checkpoints_key(thread_id), self._member(checkpoint_ns, checkpoint_id))
+        if saved is None:
+            return None
+
+        checkpoint, metadata, parent_checkpoint_id = self._loads(saved)
+        writes = await self._load_writes(thread_id, checkpoint_ns, checkpoint_id)
+
+        if parent_checkpoint_id:
+            parent_writes = await self._load_writes(thread_id, checkpoint_ns, parent_checkpoint_id)
+            sends = [value for _, channel, value, _ in parent_writes if channel == TASKS]
+        else:
+            sends = []
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "pending_sends": sends},
+            metadata=metadata,
+            pending_writes=[(task_id, channel, value) for task_id, channel, value, _ in writes],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    async def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[tuple]:
+        match = self._escape(self._member(checkpoint_ns, checkpoint_id) + KEY_SEPARATOR) + "*"
+        writes = []
+        async for field, packed in self.client.hscan_iter(self._writes_key(thread_id), match=match):
+            _, _, task_id, write_idx = field.decode().rsplit(KEY_SEPARATOR, 3)
+            writes.append(((task_id, int(write_idx)), self._loads(packed)))
+
+        # Same ordering as MemorySaver: by task path, then task id, then write index.
+        writes.sort(key=lambda w: (w[1][3], w[0][0], w[0][1]))
+        return [write for _, write in writes]
+
+    def _expire_thread(self, pipe, thread_id: str) -> None:
+        if self.ttl_seconds is None:
+            return
+        for key in (self._index_key(thread_id), self._checkpoints_key(thread_id), self._writes_key(thread_id)):
+            pipe.expire(key, self.ttl_seconds)
+
+    def _dumps(self, value: Any) -> bytes:
+        type_, data = self.serde.dumps_typed(value)
+        return type_.encode() + b":" + data
+
+    def _loads(self, packed: bytes) -> Any:
+        type_, data = packed.split(b":", 1)
+        return self.serde.loads_typed((type_.decode(), data))
+
+    def _index_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:{thread_id}:index"
+
+    def _checkpoints_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:{thread_id}:checkpoints"
+
+    def _writes_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:{thread_id}:writes"
+
+    @staticmethod
+    def _member(checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"{checkpoint_ns}{KEY_SEPARATOR}{checkpoint_id}"
+
+    @staticmethod
+    def _ns_range(checkpoint_ns: str) -> tuple[str, str]:
+        # Members are "{ns}\0{id}" with a constant score, so a lex range selects one namespace.
+        # "\1" is the byte right after "\0" and below any character a nested namespace can add.
+        return f"({checkpoint_ns}\x01", f"[{checkpoint_ns}{KEY_SEPARATOR}"
+
+    @staticmethod
+    def _escape(pattern: str) -> str:
+        for char in "\\*?[]":
+            pattern = pattern.replace(char, "\\" + char)
+        return pattern
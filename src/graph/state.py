@@ -1,19 +1,20 @@
 from pydantic import BaseModel, Field
-from typing import Any
 
 from ..models import Flight, Hotel
 
 
 class TravellerInputState(BaseModel):
     trip_details: str
+    want_hotel_search: bool = False
 
 
 class TravellerState(BaseModel):
     trip_details: str
     flights: list[Flight] = Field(default_factory=list)
     ranked_flights: list[Flight] = Field(default_factory=list)
-    hotels: Any
-    ranked_hotels: Any
+    trip_extraction_confidence: float = 0.0
+    hotels: list[Hotel] = Field(default_factory=list)
+    ranked_hotels: list[Hotel] = Field(default_factory=list)
     want_hotel_search: bool = False
 
 
@@ -1,8 +1,24 @@
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
+from .checkpointer import BoundedMemorySaver, RedisSaver
 from .state import TravellerState, TravellerInputState, TravellerOutputState
+from ..cache import binary_redis
+from ..config import settings
 from ..nodes.flights_planner.nodes import flights_search_node, flights_ranking_node
+from ..nodes.hotels_planner.nodes import hotels_search_node, hotels_ranking_node, wants_hotels
+from ..nodes.trip_output import trip_output_node
+
+
+def plan_branches(state: TravellerState) -> list[str]:
+    """
+    The branches to run in parallel: flights always, hotels when a provider is configured and
+    the traveller asked for them.
+    """
+    branches = ["flights_search_node"]
+    if settings.HOTELS_PROVIDER and (state.want_hotel_search or wants_hotels(state.trip_details)):
+        branches.append("hotels_search_node")
+    return branches
 
 
 def build_graph():
@@ -17,15 +33,46 @@ def build_graph():
         flights_ranking_node,
     )
 
-    builder.add_edge(START, "flights_search_node")
+    builder.add_node(
+        "hotels_search_node",
+        hotels_search_node,
+    )
+    builder.add_node(
+        "hotels_ranking_node",
+        hotels_ranking_node,
+    )
+    # Deferred, so it runs once after whichever branches were started have finished.
+    builder.add_node(
+        "trip_output_node",
+        trip_output_node,
+        defer=True,
+    )
+
+    builder.add_conditional_edges(START, plan_branches, ["flights_search_node", "hotels_search_node"])
     builder.add_edge("flights_search_node", "flights_ranking_node")
-    builder.add_edge("flights_ranking_node", END)
+    builder.add_edge("hotels_search_node", "hotels_ranking_node")
+    builder.add_edge("flights_ranking_node", "trip_output_node")
+    builder.add_edge("hotels_ranking_node", "trip_output_node")
+    builder.add_edge("trip_output_node", END)
 
     return builder
 
 
-def compile_with_checkpointer():
-    """Build the graph with a memory checkpointer for state management."""
+def build_checkpointer() -> BaseCheckpointSaver:
+    if settings.CHECKPOINTER == "redis":
+        return RedisSaver(
+            binary_redis,
+            ttl_seconds=settings.CHECKPOINT_TTL_SECONDS,
+            prefix=settings.CHECKPOINT_KEY_PREFIX,
+        )
+
+    return BoundedMemorySaver(
+        max_threads=settings.CHECKPOINT_MAX_THREADS,
+        ttl_seconds=settings.CHECKPOINT_TTL_SECONDS,
+    )
+
+
+def compile_with_checkpointer(checkpointer: BaseCheckpointSaver | None = None):
+    """Build the graph with a checkpointer for state management."""
     builder = build_graph()
-    checkpointer = MemorySaver()
-    return builder.compile(checkpointer=checkpointer)
+    return builder.compile(checkpointer=checkpointer or build_checkpointer())
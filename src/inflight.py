@@ -0,0 +1,142 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Hashable, Optional
+
+from .config import settings
+from .metrics import PLANNING_RUNS
+
+
+class SharedRun:
+    """
+    One producer stream, consumed once and fanned out to any number of subscribers. Every
+    subscriber first gets the events emitted so far, then follows along live. If the producer
+    fails, each subscriber gets its exception after the events that came before it.
+    Set `retain` to False from the producer when its result should not be served to late joiners.
+    With `cancel_when_abandoned`, the producer is cancelled once its last subscriber leaves.
+    """
+
+    def __init__(self, source: Callable[["SharedRun"], AsyncIterator], cancel_when_abandoned: bool = False, **meta):
+        self.meta = meta
+        self.cancel_when_abandoned = cancel_when_abandoned
+        self.subscribers = 0
+        self.abandoned = False
+        self.events: list = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.retain = True
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+        self.task = asyncio.create_task(self._pump(source(self)))
+        self.task.add_done_callback(self._finish)
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _pump(self, source: AsyncIterator) -> None:
+        try:
+            async for event in source:
+                self.events.append(event)
+                self._notify()
+        except Exception as e:
+            self.error = e
+
+    def _finish(self, task: asyncio.Task) -> None:
+        # A done callback rather than a finally block, so a run cancelled before it started ends too.
+        if task.cancelled() or self.error is not None:
+            self.retain = False
+        self.done = True
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator:
+        position = 0
+        self.subscribers += 1
+        try:
+            while True:
+                changed = self._changed
+                while position < len(self.events):
+                    yield self.events[position]
+                    position += 1
+
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+
+                await changed.wait()
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers and self.cancel_when_abandoned and not self.done:
+                # Marked right away, as the task only ends once the loop delivers the cancellation.
+                self.abandoned = True
+                self.task.cancel()
+
+
+class InflightRuns:
+    """
+    SharedRuns by key: a request whose key matches a running run, or a recently finished one
+    unless it joins `running_only`, subscribes to it instead of starting its own. Finished runs
+    are kept for `retention_seconds`, unless they failed or opted out with `retain = False`.
+    """
+
+    def __init__(self, retention_seconds: float):
+        self.retention_seconds = retention_seconds
+        self.runs: dict[Hashable, SharedRun] = {}
+
+    def get(self, key: Hashable) -> Optional[SharedRun]:
+        run = self.runs.get(key)
+        if run is None or not (run.done or run.abandoned):
+            return run
+
+        if run.done and run.retain and time.monotonic() - run.finished_at < self.retention_seconds:
+            return run
+
+        self.runs.pop(key, None)
+        return None
+
+    def start(
+        self,
+        key: Optional[Hashable],
+        source: Callable[[SharedRun], AsyncIterator],
+        cancel_when_abandoned: bool = False,
+        **meta,
+    ) -> SharedRun:
+        """
+        Starts a SharedRun over `source(run)`, registered under `key` unless the key is None.
+        """
+        run = SharedRun(source, cancel_when_abandoned, **meta)
+        PLANNING_RUNS.labels("started").inc()
+        if key is not None:
+            self.runs[key] = run
+            run.task.add_done_callback(lambda _: self._on_done(key, run))
+        return run
+
+    def join(self, key: Hashable, running_only: bool = False) -> Optional[SharedRun]:
+        run = self.get(key)
+        if run is not None and running_only and run.done:
+            return None
+        if run is not None:
+            PLANNING_RUNS.labels("joined").inc()
+        return run
+
+    def _on_done(self, key: Hashable, run: SharedRun) -> None:
+        if not run.retain:
+            self._forget(key, run)
+        else:
+            asyncio.get_running_loop().call_later(self.retention_seconds, self._forget, key, run)
+
+    def _forget(self, key: Hashable, run: SharedRun) -> None:
+        if self.runs.get(key) is run:
+            del self.runs[key]
+
+    async def aclose(self) -> None:
+        """Cancels the runs still going and forgets every run, on shutdown."""
+        tasks = [run.task for run in self.runs.values() if not run.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.runs.clear()
+
+
+planning_runs = InflightRuns(retention_seconds=settings.PLANNING_DEDUP_RETENTION_SECONDS)
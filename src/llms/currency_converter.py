@@ -1,44 +1,176 @@
-from decimal import Decimal, ROUND_CEILING
-from ..config import settings
-import httpx
-import json
+import re
+from decimal import Decimal
+from typing import Optional
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import ToolMessage
 from langchain_core.tools import tool
-from langchain_ollama import ChatOllama
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda
 
-from ..cache import redis
+from ..config import settings
+from ..models import Flight
+from ..rates import fetch_rates
+from .registry import get_llm
+
+
+# Currencies quoted by freecurrencyapi.
+CURRENCY_CODES = {
+    "AUD", "BGN", "BRL", "CAD", "CHF", "CNY", "CZK", "DKK", "EUR", "GBP", "HKD", "HRK", "HUF", "IDR", "ILS", "INR",
+    "ISK", "JPY", "KRW", "MXN", "MYR", "NOK", "NZD", "PHP", "PLN", "RON", "RUB", "SEK", "SGD", "THB", "TRY", "USD",
+    "ZAR",
+}
+
+CURRENCY_ALIASES = {
+    "r$": "BRL",
+    "us$": "USD",
+    "$": "USD",
+    "€": "EUR",
+    "£": "GBP",
+    "real": "BRL",
+    "reais": "BRL",
+    "euro": "EUR",
+    "euros": "EUR",
+    "dolar": "USD",
+    "dólar": "USD",
+    "dolares": "USD",
+    "dólares": "USD",
+    "dollar": "USD",
+    "dollars": "USD",
+    "libra": "GBP",
+    "libras": "GBP",
+    "pound": "GBP",
+    "pounds": "GBP",
+}
+
+AMOUNT_PATTERN = re.compile(
+    r"""^\s*
+    (?P<prefix>R\$|US\$|[$€£]|[A-Za-z]{3})?\s*
+    (?P<amount>\d+(?:[.,]\d+)*)\s*
+    (?P<suffix>R\$|US\$|[$€£]|[^\W\d_]+)?
+    \s*[?.!]?\s*$""",
+    re.IGNORECASE | re.VERBOSE,
+)
 
 
-async def fetch_rates():
-    cached = await redis.get(settings.CURRENCY_CACHE_KEY)
+def _is_grouped(integer_part: str) -> bool:
+    groups = re.split(r"[.,]", integer_part)
+    leading, rest = groups[0], groups[1:]
+    return 1 <= len(leading) <= 3 and not leading.startswith("0") and all(len(group) == 3 for group in rest)
 
-    if cached:
-        currencies_data = json.loads(cached)
+
+def parse_decimal(amount: str) -> Optional[Decimal]:
+    """
+    Parses amounts written with either decimal separator, telling thousands separators apart:
+    a separator is grouping when it repeats or is followed by exactly three digits.
+    Returns None for ambiguous or malformed amounts, which are left to the LLM.
+    Examples:
+        "54.2" -> Decimal("54.2")
+        "54,20" -> Decimal("54.20")
+        "1.000" -> Decimal("1000")
+        "1,000" -> Decimal("1000")
+        "1.234.567" -> Decimal("1234567")
+        "1.234,56" -> Decimal("1234.56")
+        "1,234.56" -> Decimal("1234.56")
+        "0.500" -> None
+    """
+    separators = set(re.findall(r"[.,]", amount))
+    if not separators:
+        return Decimal(amount)
+
+    if len(separators) == 2:
+        # Both kinds: the last one is the decimal point, the other one groups thousands.
+        last = max(amount.rfind("."), amount.rfind(","))
+        integer_part, fraction = amount[:last], amount[last + 1 :]
+        if amount[last] in integer_part:
+            return None
     else:
-        exchange_rate_api_url = f"https://api.freecurrencyapi.com/v1/latest?apikey={settings.EXCHANGE_RATE_API_KEY}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(exchange_rate_api_url)
-            currencies = response.json()
+        separator = separators.pop()
+        integer_part, _, fraction = amount.rpartition(separator)
+        if amount.count(separator) == 1 and len(fraction) != 3:
+            return Decimal(f"{integer_part}.{fraction}")
+        integer_part, fraction = amount, ""
+
+    if not _is_grouped(integer_part):
+        return None
+
+    digits = re.sub(r"[.,]", "", integer_part)
+    return Decimal(f"{digits}.{fraction}" if fraction else digits)
 
-        if "data" not in currencies:
-            raise ValueError("Invalid response from the currency API")
 
-        currencies_data = currencies["data"]
+def _currency_code(marker: Optional[str]) -> Optional[str]:
+    if not marker:
+        return None
+    if marker.lower() in CURRENCY_ALIASES:
+        return CURRENCY_ALIASES[marker.lower()]
+    if marker.upper() in CURRENCY_CODES:
+        return marker.upper()
+    return None
 
-        await redis.set(
-            settings.CURRENCY_CACHE_KEY,
-            json.dumps(currencies_data),
-            ex=settings.CURRENCY_CACHE_EXPIRE_SECONDS,
+
+def parse_amount(text: str) -> Optional[tuple[Decimal, str]]:
+    """
+    Parses inputs made only of an amount and a currency code, symbol or name.
+    Returns None for anything else, including amounts without a currency.
+    Examples:
+        "54.2 EUR" -> (Decimal("54.2"), "EUR")
+        "R$ 1.234,56" -> (Decimal("1234.56"), "BRL")
+        "1,000 USD" -> (Decimal("1000"), "USD")
+        "20 dólares?" -> (Decimal("20"), "USD")
+        "I have 20 EUR" -> None
+    """
+    match = AMOUNT_PATTERN.match(text)
+    if not match:
+        return None
+
+    prefix, suffix = match.group("prefix"), match.group("suffix")
+    currencies = {_currency_code(marker) for marker in (prefix, suffix) if marker}
+    if len(currencies) != 1 or None in currencies:
+        return None
+
+    amount = parse_decimal(match.group("amount"))
+    if amount is None:
+        return None
+
+    return amount, currencies.pop()
+
+
+def default_target_currency(currency: str) -> str:
+    """The traveller's home currency converts to the destination currency, anything else converts home."""
+    return settings.CURRENCY_DESTINATION if currency == settings.CURRENCY_HOME else settings.CURRENCY_HOME
+
+
+async def convert_many(amounts: list[Decimal], from_currency: str, to_currency: str) -> list[Decimal]:
+    """
+    Converts a batch of amounts between two currencies with a single rate lookup.
+    """
+    rates = await fetch_rates()
+    return rates.convert_many(amounts, from_currency.upper(), to_currency.upper())
+
+
+async def convert_flights(flights: list[Flight], currency: str) -> list[Flight]:
+    """
+    Converts every flight price to `currency` in one pass, fetching the rate table once for
+    the whole batch. Flights priced in a currency without a known rate are returned unchanged.
+    """
+    if all(flight.currency == currency for flight in flights):
+        return flights
+
+    rates = await fetch_rates()
+    if currency not in rates:
+        raise ValueError(f"Unsupported currency: {currency}")
+
+    return [
+        flight.model_copy(
+            update={
+                "price": rates.convert(flight.price, flight.currency, currency),
+                "currency": currency,
+            }
         )
-    return {
-        "BRL": Decimal(currencies_data["BRL"]),
-        "EUR": Decimal(currencies_data["EUR"]),
-        "USD": Decimal(currencies_data["USD"]),
-    }
+        if flight.currency in rates
+        else flight
+        for flight in flights
+    ]
 
 
 async def invoke_currency_converter_tool(response):
@@ -46,20 +178,21 @@ async def invoke_currency_converter_tool(response):
         return response.content
 
     for tool_call in response.tool_calls:
-        if tool_call["name"] == "eur_to_brl_converter":
-            eur_amount = tool_call["args"]["eur_amount"]
-            eur_amount = Decimal(eur_amount) if isinstance(eur_amount, str) else eur_amount
-            brl_amount = await eur_to_brl_converter.ainvoke({"eur_amount": eur_amount})
-            return ToolMessage(
-                content=f"{eur_amount} EUR = {brl_amount} BRL",
-                tool_call_id=tool_call["id"],
-            )
-        elif tool_call["name"] == "brl_to_eur_converter":
-            brl_amount = tool_call["args"]["brl_amount"]
-            brl_amount = Decimal(brl_amount) if isinstance(brl_amount, str) else brl_amount
-            eur_amount = await brl_to_eur_converter.ainvoke({"brl_amount": brl_amount})
+        if tool_call["name"] == "convert_currency":
+            args = tool_call["args"]
+            amount = Decimal(str(args["amount"]))
+            from_currency = args["from_currency"].upper()
+            to_currency = args["to_currency"].upper()
+
+            try:
+                converted = await convert_currency.ainvoke(
+                    {"amount": amount, "from_currency": from_currency, "to_currency": to_currency}
+                )
+            except ValueError:
+                return f"Sorry, I am not able to convert from {from_currency} to {to_currency}."
+
             return ToolMessage(
-                content=f"{brl_amount} BRL = {eur_amount} EUR",
+                content=f"{amount} {from_currency} = {converted} {to_currency}",
                 tool_call_id=tool_call["id"],
             )
         else:
@@ -67,35 +200,18 @@ async def invoke_currency_converter_tool(response):
 
 
 @tool
-async def brl_to_eur_converter(brl_amount: Decimal) -> Decimal:
-    """ "
-    A tool to convert from BRL to EUR.
-    This tool is used to convert money exchange rates from one currency to another.
-    It'll receive a Decimal with the amount in BRL and return a Decimal with the amount in EUR.
-
-    Example:
-    brl_to_eur_converter(Decimal("1000"))
+async def convert_currency(amount: Decimal, from_currency: str, to_currency: str) -> Decimal:
     """
-
-    rates = await fetch_rates()
-    result = brl_amount * (rates["EUR"] / rates["BRL"])
-    return result.quantize(Decimal("0.01"), rounding=ROUND_CEILING)
-
-
-@tool
-async def eur_to_brl_converter(eur_amount: Decimal) -> Decimal:
-    """ "
-    A tool to convert from EUR to BRL.
-    This tool is used to convert money exchange rates from one currency to another.
-    It'll receive a Decimal with the amount in EUR and return a Decimal with the amount in BRL.
+    A tool to convert an amount of money from one currency to another.
+    Currencies are ISO 4217 codes, such as BRL, EUR, USD or GBP.
+    It'll receive a Decimal with the amount in `from_currency` and return a Decimal with the amount in `to_currency`.
 
     Example:
-    eur_to_brl_converter(Decimal("1000"))
+    convert_currency(Decimal("1000"), "BRL", "EUR")
     """
 
     rates = await fetch_rates()
-    result = eur_amount * (rates["BRL"] / rates["EUR"])
-    return result.quantize(Decimal("0.01"), rounding=ROUND_CEILING)
+    return rates.convert(amount, from_currency.upper(), to_currency.upper())
 
 
 prompt_template = ChatPromptTemplate.from_template(
@@ -104,22 +220,39 @@ prompt_template = ChatPromptTemplate.from_template(
         You are a helpful travelling assistant whose main goal is to help the traveller converting money exchange rates
         from one currency to another.
 
-        You are able to convert from BRL to EUR, and vice-versa.
+        You are able to convert between any two currencies using their ISO 4217 codes.
 
-        If the traveller inputs a currency that is not BRL or EUR,
-        you must explain them that you are only able to convert between these two currencies with a very short answer.
+        When the traveller does not say which currency they want, convert BRL to EUR, and any other currency to BRL.
 
         Traveller amount and currency: {input}
     """,
 )
 
 tools = [
-    brl_to_eur_converter,
-    eur_to_brl_converter,
+    convert_currency,
 ]
 
-llm = ChatOllama(model="qwen2.5-coder:14b")
+llm = get_llm("currency_converter")
 
-currency_converter_chain = (
+llm_currency_converter_chain = (
     prompt_template | llm.bind_tools(tools=tools) | RunnableLambda(invoke_currency_converter_tool) | StrOutputParser()
 )
+
+
+async def convert(input: dict) -> str:
+    parsed = parse_amount(input["input"])
+
+    if parsed is not None:
+        amount, from_currency = parsed
+        to_currency = default_target_currency(from_currency)
+        try:
+            rates = await fetch_rates()
+            return f"{amount} {from_currency} = {rates.convert(amount, from_currency, to_currency)} {to_currency}"
+        except ValueError:
+            # Currencies missing from the rate table are explained by the LLM.
+            pass
+
+    return await llm_currency_converter_chain.ainvoke(input)
+
+
+currency_converter_chain = RunnableLambda(convert)
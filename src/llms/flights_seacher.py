@@ -0,0 +1,25 @@
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
+
+from ..graph.traveller import build_graph
+from ..models import Flight
+
+traveller_graph = build_graph().compile()
+
+
+def format_flight(flight: Flight) -> str:
+    return (
+        f"{flight.airline} {flight.from_airport} → {flight.to_airport} "
+        f"{flight.departure_date:%Y-%m-%d %H:%M}, {flight.price} {flight.currency}, "
+        f"{flight.stops} stops, {flight.duration_in_minutes} min"
+    )
+
+
+async def search_flights(input: dict) -> str:
+    result = await traveller_graph.ainvoke({"trip_details": input["input"]})
+    ranked_flights = result.get("ranked_flights", [])
+
+    return "\n".join([result.get("friendly_greeting", ""), *(format_flight(f) for f in ranked_flights)])
+
+
+search_flights_chain = RunnableLambda(search_flights) | StrOutputParser()
@@ -0,0 +1,182 @@
+from collections import Counter
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_ollama import ChatOllama
+from ollama import AsyncClient
+from pydantic import BaseModel
+
+from .scheduler import ScheduledChatOllama, llm_scheduler
+from ..config import settings
+from ..metrics import LLM_TOKENS
+
+
+class ModelSpec(BaseModel):
+    """
+    How a model is kept in Ollama. Every role served by the same model shares these options,
+    since Ollama reloads a model whenever its context size changes.
+    """
+
+    model: str
+    num_ctx: Optional[int] = None
+    keep_alive: Optional[str | int] = None
+
+
+MODELS = {
+    "gemma3:12b": ModelSpec(model="gemma3:12b", num_ctx=4096),
+    "qwen2.5-coder:14b": ModelSpec(model="qwen2.5-coder:14b", num_ctx=4096),
+    "qwen3:14b": ModelSpec(model="qwen3:14b", num_ctx=8192),
+}
+
+ROLES = {
+    "routing": "gemma3:12b",
+    "translator": "gemma3:12b",
+    "currency_converter": "qwen2.5-coder:14b",
+    "flights_planner": "qwen3:14b",
+}
+
+# Per role chat options that do not affect model residency.
+ROLE_OPTIONS = {
+    "flights_planner": {"temperature": 0},
+}
+
+
+class ModelUsageTracker(BaseCallbackHandler):
+    """
+    Counts calls and cold loads per model from the `load_duration` Ollama reports.
+    A load of a model that had already been loaded before is counted as a swap,
+    meaning Ollama evicted it in between.
+    """
+
+    def __init__(self, load_threshold_seconds: float):
+        self.load_threshold_seconds = load_threshold_seconds
+        self.calls = Counter()
+        self.loads = Counter()
+        self.swaps = Counter()
+
+    def record(self, model: str, load_duration_seconds: float) -> None:
+        self.calls[model] += 1
+        if load_duration_seconds >= self.load_threshold_seconds:
+            if self.loads[model]:
+                self.swaps[model] += 1
+            self.loads[model] += 1
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                info = generation.generation_info or (message.response_metadata if message else None)
+                if info and info.get("model"):
+                    self.record(info["model"], info.get("load_duration", 0) / 1e9)
+                    LLM_TOKENS.labels(info["model"], "input").inc(info.get("prompt_eval_count") or 0)
+                    LLM_TOKENS.labels(info["model"], "output").inc(info.get("eval_count") or 0)
+
+
+class ModelRegistry:
+    """
+    Maps each role (routing, translator, ...) to a resident Ollama model and hands out
+    one ChatOllama client per model and role options.
+    """
+
+    def __init__(
+        self,
+        roles: dict[str, str],
+        models: dict[str, ModelSpec],
+        keep_alive: str | int | None = None,
+        base_url: Optional[str] = None,
+        load_threshold_seconds: float = 1.0,
+    ):
+        self.roles = roles
+        self.models = models
+        self.keep_alive = keep_alive
+        self.base_url = base_url
+        self.tracker = ModelUsageTracker(load_threshold_seconds)
+        self._clients: dict[tuple, ChatOllama] = {}
+
+    def model_for(self, role: str) -> str:
+        if role not in self.roles:
+            raise ValueError(f"Unknown model role: {role}")
+        return self.roles[role]
+
+    def spec(self, model: str) -> ModelSpec:
+        return self.models.get(model) or ModelSpec(model=model)
+
+    def _keep_alive(self, spec: ModelSpec) -> str | int | None:
+        return spec.keep_alive if spec.keep_alive is not None else self.keep_alive
+
+    def get_llm(self, role: str) -> ChatOllama:
+        spec = self.spec(self.model_for(role))
+        options = ROLE_OPTIONS.get(role, {})
+        key = (spec.model, tuple(sorted(options.items())))
+
+        if key not in self._clients:
+            self._clients[key] = ScheduledChatOllama(
+                model=spec.model,
+                num_ctx=spec.num_ctx,
+                keep_alive=self._keep_alive(spec),
+                base_url=self.base_url,
+                callbacks=[self.tracker],
+                **options,
+            )
+
+        return self._clients[key]
+
+    def resident_models(self) -> list[str]:
+        return list(dict.fromkeys(self.roles.values()))
+
+    async def warm_up(self, client: Optional[AsyncClient] = None) -> None:
+        """
+        Loads every resident model with an empty prompt, one at a time so they do not
+        compete for memory, using the same options the chat clients will send.
+        """
+        client = client or AsyncClient(host=self.base_url)
+
+        for model in self.resident_models():
+            spec = self.spec(model)
+            options = {"num_ctx": spec.num_ctx} if spec.num_ctx else None
+            try:
+                response = await client.generate(
+                    model=model, prompt="", keep_alive=self._keep_alive(spec), options=options
+                )
+                self.tracker.record(model, (response.load_duration or 0) / 1e9)
+            except Exception as e:
+                print(f"Could not warm up model {model}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "roles": dict(self.roles),
+            "models": {
+                model: {
+                    "num_ctx": self.spec(model).num_ctx,
+                    "keep_alive": self._keep_alive(self.spec(model)),
+                    "calls": self.tracker.calls[model],
+                    "loads": self.tracker.loads[model],
+                    "swaps": self.tracker.swaps[model],
+                    "scheduler": llm_scheduler.limiter(model).stats(),
+                }
+                for model in self.resident_models()
+            },
+            "swaps": sum(self.tracker.swaps.values()),
+        }
+
+
+def build_registry() -> ModelRegistry:
+    models = dict(MODELS)
+    for model, num_ctx in (settings.LLM_NUM_CTX or {}).items():
+        models[model] = models.get(model, ModelSpec(model=model)).model_copy(update={"num_ctx": num_ctx})
+
+    return ModelRegistry(
+        roles={**ROLES, **(settings.LLM_ROLE_MODELS or {})},
+        models=models,
+        keep_alive=settings.LLM_KEEP_ALIVE,
+        base_url=settings.OLLAMA_BASE_URL,
+        load_threshold_seconds=settings.LLM_LOAD_THRESHOLD_SECONDS,
+    )
+
+
+model_registry = build_registry()
+
+
+def get_llm(role: str) -> ChatOllama:
+    return model_registry.get_llm(role)
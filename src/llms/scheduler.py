@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from itertools import count
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_ollama import ChatOllama
+
+from ..config import settings
+from ..metrics import LLM_DURATION, LLM_ERRORS, LLM_QUEUE_WAIT, span
+
+INTERACTIVE = 0
+BATCH = 1
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int):
+    """
+    Runs the LLM calls made inside the block with the given priority.
+    Example:
+        with priority(BATCH):
+            await chain.ainvoke(...)
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class ModelOverloadedError(Exception):
+    """
+    Raised when a model's wait queue is full or a call waited longer than the budget.
+    """
+
+    def __init__(self, model: str, reason: str, retry_after: int):
+        super().__init__(f"Model {model} is overloaded ({reason}), retry in {retry_after}s")
+        self.model = model
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ModelLimiter:
+    """
+    Admission control for one model: at most `max_concurrency` calls run at once and at most
+    `max_queue` wait, served by priority and then arrival order. A waiting call gives up after
+    `max_wait_seconds`.
+    """
+
+    def __init__(self, model: str, max_concurrency: int, max_queue: int, max_wait_seconds: float):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.active = 0
+        self.rejected = 0
+        self.avg_call_seconds: Optional[float] = None
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._order = count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def retry_after(self) -> int:
+        """
+        Seconds until a new call would likely be admitted, from the average call duration.
+        """
+        avg = self.avg_call_seconds or self.max_wait_seconds
+        return max(1, math.ceil(avg * (self.waiting + 1) / self.max_concurrency))
+
+    def _overloaded(self, reason: str) -> ModelOverloadedError:
+        self.rejected += 1
+        return ModelOverloadedError(self.model, reason, self.retry_after())
+
+    def check(self) -> None:
+        """
+        Raises ModelOverloadedError if a new call would be rejected right away.
+        """
+        if self.waiting >= self.max_queue:
+            raise self._overloaded("queue_full")
+
+    async def acquire(self, level: int = INTERACTIVE) -> None:
+        if self.active < self.max_concurrency and not self._queue:
+            self.active += 1
+            return
+
+        self.check()
+        future = asyncio.get_running_loop().create_future()
+        entry = (level, next(self._order), future)
+        heapq.heappush(self._queue, entry)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done():
+                # The slot was handed over just as the wait ended, pass it on.
+                self.release()
+            else:
+                future.cancel()
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._overloaded("queue_timeout") from None
+            raise
+
+    def release(self) -> None:
+        if self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            future.set_result(None)
+        else:
+            self.active -= 1
+
+    def _record(self, seconds: float) -> None:
+        if self.avg_call_seconds is None:
+            self.avg_call_seconds = seconds
+        else:
+            self.avg_call_seconds = 0.8 * self.avg_call_seconds + 0.2 * seconds
+
+    @asynccontextmanager
+    async def slot(self, level: Optional[int] = None):
+        with LLM_QUEUE_WAIT.labels(self.model).time():
+            await self.acquire(_priority.get() if level is None else level)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record(time.monotonic() - started_at)
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "avg_call_seconds": self.avg_call_seconds,
+        }
+
+
+class LLMScheduler:
+    """
+    One ModelLimiter per model, created on first use from the settings.
+    """
+
+    def __init__(self):
+        self._limiters: dict[str, ModelLimiter] = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        if model not in self._limiters:
+            self._limiters[model] = ModelLimiter(
+                model,
+                max_concurrency=(settings.LLM_MAX_CONCURRENCY_PER_MODEL or {}).get(
+                    model, settings.LLM_MAX_CONCURRENCY
+                ),
+                max_queue=settings.LLM_MAX_QUEUE,
+                max_wait_seconds=settings.LLM_MAX_QUEUE_WAIT_SECONDS,
+            )
+        return self._limiters[model]
+
+    def stats(self) -> dict:
+        return {model: limiter.stats() for model, limiter in self._limiters.items()}
+
+
+llm_scheduler = LLMScheduler()
+
+
+class ScheduledChatOllama(ChatOllama):
+    """
+    ChatOllama that waits for a slot of its model's limiter before calling Ollama.
+    """
+
+    @asynccontextmanager
+    async def _call(self):
+        async with llm_scheduler.limiter(self.model).slot():
+            with LLM_DURATION.labels(self.model).time(), span("llm", model=self.model):
+                try:
+                    yield
+                except Exception:
+                    LLM_ERRORS.labels(self.model).inc()
+                    raise
+
+    async def _agenerate(self, *args: Any, **kwargs: Any) -> ChatResult:
+        async with self._call():
+            return await super()._agenerate(*args, **kwargs)
+
+    async def _astream(self, *args: Any, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        async with self._call():
+            async for chunk in super()._astream(*args, **kwargs):
+                yield chunk
@@ -1,6 +1,15 @@
+import asyncio
+import csv
+import sys
+from pathlib import Path
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_ollama import ChatOllama
+from langchain_core.runnables import RunnableLambda
+
+from ..cache import TieredCache, text_key
+from ..config import settings
+from .registry import get_llm
 
 prompt_template = ChatPromptTemplate.from_template(
     """
@@ -50,4 +59,61 @@ prompt_template = ChatPromptTemplate.from_template(
 )
 
 
-translator_chain = prompt_template | ChatOllama(model="gemma3:12b") | StrOutputParser()
+llm_translator_chain = prompt_template | get_llm("translator") | StrOutputParser()
+
+translation_memory = TieredCache(
+    prefix=settings.TRANSLATION_MEMORY_KEY_PREFIX,
+    maxsize=settings.TRANSLATION_MEMORY_MAX_ENTRIES,
+    ttl_seconds=settings.TRANSLATION_MEMORY_TTL_SECONDS,
+)
+
+_pending_writes: set[asyncio.Task] = set()
+
+
+def remember_translation(source: str, target: str) -> None:
+    """Stores a translation in the background, so the answer is not delayed by the write."""
+    task = asyncio.create_task(translation_memory.set(text_key(source), target))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def translate(input: dict) -> str:
+    cached = await translation_memory.get(text_key(input["input"]))
+    if cached is not None:
+        return cached
+
+    answer = await llm_translator_chain.ainvoke(input)
+    remember_translation(input["input"], answer)
+    return answer
+
+
+translator_chain = RunnableLambda(translate)
+
+
+def read_phrasebook(path: Path) -> dict[str, str]:
+    """
+    Reads a two-column phrasebook (Portuguese, Spanish) in CSV or TSV format.
+    Every pair is stored in both directions, as the translator works both ways.
+    """
+    with path.open(newline="", encoding="utf-8") as f:
+        dialect = csv.Sniffer().sniff(f.read(4096), delimiters=",;\t")
+        f.seek(0)
+        rows = [row for row in csv.reader(f, dialect) if len(row) >= 2 and row[0].strip() and row[1].strip()]
+
+    entries = {}
+    for portuguese, spanish, *_ in rows:
+        entries[text_key(portuguese)] = spanish.strip()
+        entries[text_key(spanish)] = portuguese.strip()
+    return entries
+
+
+async def preload_phrasebook(path: Path, batch_size: int = 1000) -> int:
+    entries = list(read_phrasebook(path).items())
+    for start in range(0, len(entries), batch_size):
+        await translation_memory.set_many(dict(entries[start : start + batch_size]))
+    return len(entries)
+
+
+if __name__ == "__main__":
+    count = asyncio.run(preload_phrasebook(Path(sys.argv[1])))
+    print(f"Loaded {count} entries into the translation memory")
@@ -1,12 +1,55 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from fastapi.responses import StreamingResponse, JSONResponse
+from contextlib import aclosing, asynccontextmanager
+from typing import Literal
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException, Request
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse, StreamingResponse, JSONResponse
+from src.cache import text_key
+from src.chains.app import UnsupportedRouteError, answer_batch, app_chain, to_model_response_schema
+from src.chains.routing import classify, invoke_chain
+from src.config import settings
 from src.graph.traveller import compile_with_checkpointer
-from src.models import Flight
+from src.inflight import SharedRun, planning_runs
+from src.llms.registry import model_registry
+from src.llms.scheduler import ModelOverloadedError, llm_scheduler
+from src.nodes.flights_planner.extractor import extract_trip_details
+from src.plan_cache import PlanLookup, plan_cache
+from src.metrics import MetricsMiddleware, registry as metrics_registry
+from src.models import Flight, ModelResponse
+from src.rates import close_http_client
+from src.serialization import StreamMessage, dump_json, ndjson_line, stream_message
+from src.streaming import SSEStream, format_sse, token_text
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.traveller_graph = compile_with_checkpointer()
+    if settings.LLM_WARM_UP:
+        await model_registry.warm_up()
+    yield
+    await planning_runs.aclose()
+    await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware, tracing=settings.TRACING_ENABLED)
 
-app = FastAPI()
 
-DEBUG = True
+@app.exception_handler(ModelOverloadedError)
+async def model_overloaded_handler(request: Request, exc: ModelOverloadedError):
+    return JSONResponse(
+        content={"detail": str(exc)},
+        status_code=429 if exc.reason == "queue_full" else 503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _overloaded_chunk(exc: ModelOverloadedError) -> bytes:
+    return ndjson_line(
+        stream_message("We are busy right now, please try again shortly.", retry_after=exc.retry_after)
+    )
 
 
 @app.get("/healthz")
@@ -16,52 +59,290 @@ def health_check():
     return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/llm/models")
+def llm_models():
+    return model_registry.stats()
+
+
 class TripPlanningRequest(BaseModel):
     trip_details: str
+    thread_id: str | None = None
+    stream_format: Literal["ndjson", "sse"] = "ndjson"
+    want_hotel_search: bool = False
+
+
+def node_update_message(node: str, values) -> StreamMessage:
+    if settings.DEBUG:
+        print("node values", values)
+
+    if node == "flights_search_node":
+        return stream_message(
+            f"Found {len(values['flights'])} flights options. I will rank them and return the best options for you",
+        )
+    elif node == "flights_ranking_node":
+        return stream_message(f"Picked the top {len(values['ranked_flights'])} flights.")
+    elif node == "hotels_search_node":
+        return stream_message(f"Found {len(values['hotels'])} hotels options. I will rank them as well")
+    elif node == "hotels_ranking_node":
+        return stream_message(f"Picked the top {len(values['ranked_hotels'])} hotels.")
+    elif node == "trip_output_node":
+        message = stream_message(values["friendly_greeting"], flights=values.get("ranked_flights", []))
+        if values.get("ranked_hotels"):
+            message["hotels"] = values["ranked_hotels"]
+        return message
+
+    return stream_message("Working on your request...")
+
+
+def partial_flights_message(flights: list[Flight]) -> StreamMessage:
+    return stream_message(f"Found {len(flights)} flights so far...", partial=True, flights=flights)
+
+
+def cached_plan_message(plan: dict) -> StreamMessage:
+    message = node_update_message("trip_output_node", plan)
+    message["cached"] = True
+    return message
+
+
+def remember_plan(lookup: PlanLookup | None, plan: dict | None) -> None:
+    if lookup is not None and plan and plan.get("ranked_flights"):
+        plan_cache.store(lookup, plan)
+
+
+def planning_run_key(request: TripPlanningRequest, idempotency_key: str | None) -> tuple:
+    """
+    Requests with the same key share one graph run: the same Idempotency-Key, or else the same
+    normalized trip details and options.
+    """
+    if idempotency_key:
+        return ("idempotency", idempotency_key, request.stream_format)
+    return ("request", planning_fingerprint(request), request.stream_format)
+
+
+def planning_fingerprint(request: TripPlanningRequest) -> tuple:
+    return (text_key(request.trip_details), request.want_hotel_search, request.thread_id)
+
+
+async def planning_stream(run: SharedRun, stream_format: str, thread_id: str | None):
+    events = 0
+    # Closed with the response, so a client that disconnects stops counting as a subscriber right away.
+    async with aclosing(run.subscribe()) as subscription:
+        async for chunk in subscription:
+            events += 1
+            yield chunk
+
+    # Every subscriber gets its own closing event, so a joiner never learns another caller's thread.
+    # Runs that failed or were overloaded are not retained, and end without one.
+    if stream_format == "sse" and run.retain:
+        yield format_sse({"thread_id": thread_id} if thread_id else {}, event="done", id=events + 1)
+
+
+def shared_run_response(
+    run: SharedRun, request: TripPlanningRequest, thread_id: str | None, joined: bool = False
+) -> StreamingResponse:
+    headers = {"Cache-Control": "no-cache"}
+    if thread_id:
+        headers["X-Thread-Id"] = thread_id
+    if joined:
+        headers["X-Shared-Run"] = "true"
+    return StreamingResponse(
+        planning_stream(run, request.stream_format, thread_id), media_type="text/event-stream", headers=headers
+    )
+
+
+def is_anonymous(request: TripPlanningRequest, idempotency_key: str | None) -> bool:
+    """Whether the client has no way to come back for a run: neither a thread_id nor an Idempotency-Key."""
+    return not (request.thread_id or idempotency_key)
+
+
+def join_planning_run(
+    run_key: tuple | None, request: TripPlanningRequest, idempotency_key: str | None
+) -> StreamingResponse | None:
+    """
+    Attaches the request to a run with the same key. Anonymous requests only join runs still
+    going, and do not get the run's thread.
+    """
+    anonymous = is_anonymous(request, idempotency_key)
+    run = planning_runs.join(run_key, running_only=anonymous) if run_key else None
+    if run is None:
+        return None
+    if run.meta["fingerprint"] != planning_fingerprint(request):
+        raise HTTPException(status_code=422, detail="The Idempotency-Key was already used for another request")
+
+    return shared_run_response(run, request, None if anonymous else run.meta["thread_id"], joined=True)
 
 
 @app.post("/trip/planning")
-async def trip_planning(request: TripPlanningRequest):
-    traveller_graph = compile_with_checkpointer()
+async def trip_planning(request: TripPlanningRequest, http_request: Request):
+    idempotency_key = http_request.headers.get("idempotency-key")
+    run_key = planning_run_key(request, idempotency_key) if settings.PLANNING_DEDUP_ENABLED else None
+    if response := join_planning_run(run_key, request, idempotency_key):
+        return response
+
+    traveller_graph = http_request.app.state.traveller_graph
+    thread_id = request.thread_id or f"traveller-{uuid4().hex}"
 
     config = {
-        "configurable": {"thread_id": "traveller-123"},
+        "configurable": {"thread_id": thread_id},
     }
 
-    def event_stream():
-        for step in traveller_graph.stream(
-            {"trip_details": request.trip_details}, config=config, stream_mode="updates"
-        ):
-            current_node = list(step.keys())[0]
-            current_node_values = list(step.values())[0]
-
-            if DEBUG:
-                print("node values", current_node_values)
-
-            if current_node == "flights_search_node":
-                data = {
-                    "response": f"Found {len(current_node_values['flights'])} flights options. I will rank them and return the best options for you"
-                }
-            elif current_node == "flights_ranking_node":
-                ranked_flights: list[Flight] = current_node_values.get("ranked_flights", [])
-
-                data = {
-                    "response": current_node_values["friendly_greeting"],
-                    "flights": [flight.model_dump(mode="json") for flight in ranked_flights],
-                }
-            else:
-                data = {"response": "Working on your request..."}
-
-            yield (
-                JSONResponse(
-                    content=data,
-                    media_type="application/json",
-                ).body.decode()
-                + "\n"
-            )
+    plan_lookup = None
+    if settings.PLAN_CACHE_ENABLED:
+        plan_lookup = plan_cache.lookup(request.trip_details, request.want_hotel_search)
+    cached_plan = plan_lookup.plan if plan_lookup else None
 
-    return StreamingResponse(
-        event_stream(),
-        media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache"},
+    needs_llm = settings.FLIGHTS_RANKING_MODE == "llm" or (
+        extract_trip_details(request.trip_details).confidence < settings.FLIGHTS_EXTRACTION_MIN_CONFIDENCE
     )
+    if needs_llm and cached_plan is None:
+        # Shed load before the stream starts, while a proper status code can still be sent.
+        llm_scheduler.limiter(model_registry.model_for("flights_planner")).check()
+
+    graph_input = {"trip_details": request.trip_details, "want_hotel_search": request.want_hotel_search}
+    stream_mode = ["updates", "custom"] if settings.FLIGHTS_STREAM_PARTIAL_RESULTS else ["updates"]
+
+    async def event_stream(run: SharedRun):
+        if cached_plan is not None:
+            yield ndjson_line(cached_plan_message(cached_plan))
+            return
+
+        plan = None
+        try:
+            async for mode, step in traveller_graph.astream(graph_input, config=config, stream_mode=stream_mode):
+                if mode == "custom":
+                    yield ndjson_line(partial_flights_message(step.get("flights", [])))
+                    continue
+
+                node, values = next(iter(step.items()))
+                if node == "trip_output_node":
+                    plan = values
+                yield ndjson_line(node_update_message(node, values))
+        except ModelOverloadedError as e:
+            run.retain = False
+            yield _overloaded_chunk(e)
+            return
+
+        remember_plan(plan_lookup, plan)
+
+    async def sse_event_stream(run: SharedRun):
+        sse = SSEStream()
+        if cached_plan is not None:
+            yield sse.event("update", {**cached_plan_message(cached_plan), "node": "trip_output_node"})
+            return
+
+        plan = None
+        try:
+            async for event in traveller_graph.astream_events(graph_input, config=config, version="v2"):
+                if event["event"] == "on_chat_model_stream":
+                    if token := token_text(event["data"]["chunk"]):
+                        yield sse.event("token", {"node": event["metadata"].get("langgraph_node"), "token": token})
+                elif event["event"] == "on_chain_stream" and not event["parent_ids"]:
+                    for node, values in event["data"]["chunk"].items():
+                        if node == "trip_output_node":
+                            plan = values
+                        message = node_update_message(node, values)
+                        message["node"] = node
+                        yield sse.event("update", message)
+        except ModelOverloadedError as e:
+            run.retain = False
+            yield sse.event("error", {"detail": str(e), "retry_after": e.retry_after})
+            return
+
+        remember_plan(plan_lookup, plan)
+
+    # An identical request may have started a run while this one was looking up the plan cache.
+    if response := join_planning_run(run_key, request, idempotency_key):
+        return response
+
+    # An anonymous client cannot come back for the result, so its run stops with its last subscriber.
+    # Runs with a thread_id or an Idempotency-Key finish and are kept for retries.
+    run = planning_runs.start(
+        run_key,
+        sse_event_stream if request.stream_format == "sse" else event_stream,
+        cancel_when_abandoned=is_anonymous(request, idempotency_key),
+        thread_id=thread_id,
+        fingerprint=planning_fingerprint(request),
+    )
+    return shared_run_response(run, request, thread_id)
+
+
+class AssistRequest(BaseModel):
+    input: str
+
+
+class AssistBatchRequest(BaseModel):
+    inputs: list[str] = Field(min_length=1)
+    max_concurrency: int | None = Field(default=None, ge=1)
+
+
+@app.post("/assist", response_model=ModelResponse)
+async def assist(request: AssistRequest):
+    try:
+        return await app_chain.ainvoke({"input": request.input})
+    except UnsupportedRouteError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def batch_result_line(index: int, result: ModelResponse | Exception) -> bytes:
+    if isinstance(result, ModelResponse):
+        return dump_json({"index": index, **result.model_dump()}) + b"\n"
+
+    line = {"index": index, "error": str(result)}
+    if isinstance(result, ModelOverloadedError):
+        line["retry_after"] = result.retry_after
+    return dump_json(line) + b"\n"
+
+
+@app.post("/assist/batch")
+async def assist_batch(request: AssistBatchRequest):
+    """
+    Answers every input, streaming one NDJSON line per input in order of completion.
+    Each line carries the input's index, and either its ModelResponse fields or an error.
+    """
+    if len(request.inputs) > settings.ASSIST_BATCH_MAX_INPUTS:
+        raise HTTPException(status_code=422, detail=f"At most {settings.ASSIST_BATCH_MAX_INPUTS} inputs per batch")
+
+    max_concurrency = min(
+        request.max_concurrency or settings.ASSIST_BATCH_MAX_CONCURRENCY, settings.ASSIST_BATCH_MAX_CONCURRENCY
+    )
+
+    async def results_stream():
+        async for index, result in answer_batch(request.inputs, max_concurrency):
+            yield batch_result_line(index, result)
+
+    return StreamingResponse(results_stream(), media_type="application/x-ndjson")
+
+
+@app.post("/assist/stream")
+async def assist_stream(request: AssistRequest):
+    routing = await classify({"input": request.input})
+    chain = invoke_chain({"classification": routing.route})
+
+    async def sse_event_stream():
+        sse = SSEStream()
+        yield sse.event("route", routing)
+
+        if chain is None:
+            yield sse.event("error", {"detail": f"Unsupported route: {routing.route}"})
+            return
+
+        try:
+            async for event in chain.astream_events({"input": request.input}, version="v2"):
+                if event["event"] == "on_chat_model_stream":
+                    if token := token_text(event["data"]["chunk"]):
+                        yield sse.event("token", {"token": token})
+                elif event["event"] == "on_chain_end" and not event["parent_ids"]:
+                    answer = to_model_response_schema(event["data"]["output"], routing)
+                    yield sse.event("answer", answer)
+        except ModelOverloadedError as e:
+            yield sse.event("error", {"detail": str(e), "retry_after": e.retry_after})
+            return
+
+        yield sse.event("done", {})
+
+    return StreamingResponse(sse_event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
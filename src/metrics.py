@@ -0,0 +1,181 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from uuid import uuid4
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Kept apart from the default registry, so /metrics serves the app metrics only.
+registry = CollectorRegistry()
+
+NODE_DURATION = Histogram(
+    "traveller_node_duration_seconds",
+    "Duration of traveller graph nodes.",
+    ["node"],
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+NODE_ERRORS = Counter("traveller_node_errors_total", "Traveller graph node failures.", ["node"], registry=registry)
+LLM_DURATION = Histogram(
+    "traveller_llm_request_duration_seconds",
+    "Duration of LLM calls once admitted.",
+    ["model"],
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+LLM_QUEUE_WAIT = Histogram(
+    "traveller_llm_queue_wait_seconds",
+    "Time LLM calls waited for a model slot.",
+    ["model"],
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+LLM_TOKENS = Counter(
+    "traveller_llm_tokens_total", "Tokens processed by LLM calls.", ["model", "type"], registry=registry
+)
+LLM_ERRORS = Counter("traveller_llm_errors_total", "Failed LLM calls.", ["model"], registry=registry)
+FLIGHT_SCRAPE_DURATION = Histogram(
+    "traveller_flight_scrape_duration_seconds",
+    "Duration of fast_flights get_flights calls.",
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+FLIGHT_SCRAPE_ERRORS = Counter(
+    "traveller_flight_scrape_errors_total", "Failed fast_flights get_flights calls.", registry=registry
+)
+CACHE_REQUESTS = Counter(
+    "traveller_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"], registry=registry
+)
+PLANNING_RUNS = Counter(
+    "traveller_planning_runs_total",
+    "Planning runs started, or joined by a duplicate request.",
+    ["result"],
+    registry=registry,
+)
+HTTP_IN_FLIGHT = Gauge("traveller_http_requests_in_flight", "Requests being served.", ["path"], registry=registry)
+HTTP_DURATION = Histogram(
+    "traveller_http_request_duration_seconds",
+    "Time until the full response body, streams included, was sent.",
+    ["method", "path", "status"],
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+
+
+class Trace:
+    """
+    The spans recorded while serving one request.
+    """
+
+    def __init__(self, name: str):
+        self.trace_id = uuid4().hex
+        self.name = name
+        self.started_at = time.perf_counter()
+        self.spans: list[dict] = []
+
+    def to_dict(self) -> dict:
+        return {"trace_id": self.trace_id, "name": self.name, "spans": self.spans}
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Records a span on the current request trace, if tracing is on for this request.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        trace.spans.append(
+            {
+                "name": name,
+                "start_ms": round((started_at - trace.started_at) * 1000, 3),
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 3),
+                **attributes,
+                **({"error": error} if error else {}),
+            }
+        )
+
+
+def instrument_node(name: str) -> Callable:
+    """
+    Times an async graph node into NODE_DURATION and records its span.
+    """
+
+    def decorator(node):
+        @functools.wraps(node)
+        async def wrapper(*args, **kwargs):
+            with NODE_DURATION.labels(name).time(), span(name):
+                try:
+                    return await node(*args, **kwargs)
+                except Exception:
+                    NODE_ERRORS.labels(name).inc()
+                    raise
+
+        return wrapper
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting in-flight requests and timing them until the last body chunk is
+    sent, so streamed responses are measured in full. With `tracing` on, each request gets a
+    Trace whose spans are printed as one JSON line when it ends, and an X-Trace-Id header.
+    """
+
+    def __init__(self, app, tracing: bool = False, log: Optional[Callable[[dict], None]] = None):
+        self.app = app
+        self.tracing = tracing
+        self.log = log or (lambda trace: print(json.dumps(trace)))
+
+    @staticmethod
+    def _path_label(scope) -> str:
+        # Only paths of declared routes become label values, to keep the label set bounded.
+        routes = getattr(scope.get("app"), "routes", [])
+        return scope["path"] if any(getattr(route, "path", None) == scope["path"] for route in routes) else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        path = self._path_label(scope)
+        status = "500"
+        trace = Trace(f"{scope['method']} {scope['path']}") if self.tracing else None
+        token = current_trace.set(trace)
+        started_at = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                if trace is not None:
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", trace.trace_id.encode())]
+            await send(message)
+
+        try:
+            with HTTP_IN_FLIGHT.labels(path).track_inprogress():
+                await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_DURATION.labels(scope["method"], path, status).observe(time.perf_counter() - started_at)
+            current_trace.reset(token)
+            if trace is not None:
+                self.log(trace.to_dict())
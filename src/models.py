@@ -23,3 +23,9 @@ class Hotel(BaseModel):
     total_price: Decimal
     currency: str = "USD"
     rating: float
+
+
+class ModelResponse(BaseModel):
+    model_response: str
+    route: str | None = None
+    routing_source: str | None = None
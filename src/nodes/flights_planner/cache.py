@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from ...cache import redis
+from ...config import settings
+from ...metrics import CACHE_REQUESTS
+from ...models import Flight
+
+
+class CachedFlights(BaseModel):
+    fetched_at: float
+    flights: list[Flight]
+
+
+class FlightSearchCache:
+    """
+    Caches search_flights results in Redis, keyed by the normalized route and date.
+
+    Entries are fresh for `ttl_seconds`. For `stale_seconds` after that they are still served,
+    while a single background refresh replaces them. Concurrent misses for the same key in a
+    worker share one upstream scrape.
+    """
+
+    def __init__(self, client: Redis, ttl_seconds: int, stale_seconds: int, prefix: str = "flights"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.prefix = prefix
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def key(self, from_airport: str, to_airport: str, departure_date: str) -> str:
+        return f"{self.prefix}:{from_airport.strip().upper()}:{to_airport.strip().upper()}:{departure_date.strip()}"
+
+    async def get_or_fetch(
+        self,
+        from_airport: str,
+        to_airport: str,
+        departure_date: str,
+        fetch: Callable[[], Awaitable[list[Flight]]],
+    ) -> list[Flight]:
+        key = self.key(from_airport, to_airport, departure_date)
+        cached = await self._read(key)
+
+        if cached is not None:
+            age = time.time() - cached.fetched_at
+            if age < self.ttl_seconds:
+                CACHE_REQUESTS.labels(self.prefix, "hit").inc()
+                return cached.flights
+            if age < self.ttl_seconds + self.stale_seconds:
+                CACHE_REQUESTS.labels(self.prefix, "stale_hit").inc()
+                self._fetch_once(key, fetch)
+                return cached.flights
+
+        CACHE_REQUESTS.labels(self.prefix, "miss").inc()
+
+        # The task is shielded so a cancelled caller does not abort the scrape for the others.
+        return await asyncio.shield(self._fetch_once(key, fetch))
+
+    def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[list[Flight]]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_fetch_done(key, t))
+        return task
+
+    def _on_fetch_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Retrieve background refresh errors so they are not reported as never retrieved.
+            task.exception()
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[list[Flight]]]) -> list[Flight]:
+        flights = await fetch()
+        entry = CachedFlights(fetched_at=time.time(), flights=flights)
+
+        try:
+            await self.client.set(key, entry.model_dump_json(), ex=self.ttl_seconds + self.stale_seconds)
+        except RedisError as e:
+            print(f"Could not cache flights for {key}: {e}")
+
+        return flights
+
+    async def _read(self, key: str) -> Optional[CachedFlights]:
+        try:
+            payload = await self.client.get(key)
+        except RedisError as e:
+            print(f"Could not read cached flights for {key}: {e}")
+            return None
+
+        return CachedFlights.model_validate_json(payload) if payload else None
+
+
+flight_search_cache = FlightSearchCache(
+    redis,
+    ttl_seconds=settings.FLIGHTS_CACHE_TTL_SECONDS,
+    stale_seconds=settings.FLIGHTS_CACHE_STALE_SECONDS,
+    prefix=settings.FLIGHTS_CACHE_KEY_PREFIX,
+)
@@ -0,0 +1,258 @@
+import re
+import unicodedata
+from datetime import date, timedelta
+from itertools import product
+from typing import Optional
+
+from pydantic import BaseModel
+
+from ...llms.currency_converter import CURRENCY_CODES
+
+MONTHS = {
+    "jan": 1, "january": 1, "janeiro": 1, "enero": 1,
+    "feb": 2, "february": 2, "fev": 2, "fevereiro": 2, "febrero": 2,
+    "mar": 3, "march": 3, "março": 3, "marco": 3, "marzo": 3,
+    "apr": 4, "april": 4, "abr": 4, "abril": 4,
+    "may": 5, "mai": 5, "maio": 5, "mayo": 5,
+    "jun": 6, "june": 6, "junho": 6, "junio": 6,
+    "jul": 7, "july": 7, "julho": 7, "julio": 7,
+    "aug": 8, "august": 8, "ago": 8, "agosto": 8,
+    "sep": 9, "sept": 9, "september": 9, "set": 9, "setembro": 9, "septiembre": 9,
+    "oct": 10, "october": 10, "out": 10, "outubro": 10, "octubre": 10,
+    "nov": 11, "november": 11, "novembro": 11, "noviembre": 11,
+    "dec": 12, "december": 12, "dez": 12, "dezembro": 12, "dic": 12, "diciembre": 12,
+}
+
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+ISO_DATE = re.compile(r"\b(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\b")
+NUMERIC_DATE = re.compile(r"\b(?P<day>\d{1,2})/(?P<month>\d{1,2})(?:/(?P<year>\d{4}|\d{2}))?\b")
+MONTH_FIRST_DATE = re.compile(
+    rf"\b(?P<month>{_MONTH})\.?\s+(?P<day>\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(?P<year>\d{{4}})\b)?",
+    re.IGNORECASE,
+)
+DAY_FIRST_DATE = re.compile(
+    rf"\b(?P<day>\d{{1,2}})(?:st|nd|rd|th|º)?\s+(?:of\s+|de\s+)?(?P<month>{_MONTH})\b\.?"
+    rf"(?:,?\s+(?:de\s+)?(?P<year>\d{{4}})\b)?",
+    re.IGNORECASE,
+)
+
+IATA_CODE = re.compile(r"\b[A-Z]{3}\b")
+ROUTE_WITH_KEYWORDS = re.compile(
+    r"\b(?i:from|de|desde)\s+(?P<from>[A-Z]{3})\b.*?\b(?i:to|para|pra|a|até|hasta)\s+(?P<to>[A-Z]{3})\b"
+)
+ROUTE_WITH_SEPARATOR = re.compile(r"\b(?P<from>[A-Z]{3})\s*(?:→|->|-|–|/|\s(?i:to|para|pra|a)\s)\s*(?P<to>[A-Z]{3})\b")
+
+# Metropolitan area codes and the airports they stand for.
+METRO_AIRPORTS = {
+    "SAO": ["GRU", "CGH", "VCP"],
+    "RIO": ["GIG", "SDU"],
+    "BHZ": ["CNF", "PLU"],
+    "BUE": ["EZE", "AEP"],
+    "LON": ["LHR", "LGW", "STN", "LTN", "LCY"],
+    "PAR": ["CDG", "ORY"],
+    "MIL": ["MXP", "LIN", "BGY"],
+    "ROM": ["FCO", "CIA"],
+    "NYC": ["JFK", "EWR", "LGA"],
+}
+
+METRO_NAMES = {
+    "sao paulo": "SAO",
+    "rio de janeiro": "RIO",
+    "belo horizonte": "BHZ",
+    "buenos aires": "BUE",
+    "london": "LON",
+    "londres": "LON",
+    "paris": "PAR",
+    "milan": "MIL",
+    "milao": "MIL",
+    "milano": "MIL",
+    "rome": "ROM",
+    "roma": "ROM",
+    "new york": "NYC",
+    "nova york": "NYC",
+    "nueva york": "NYC",
+}
+
+_METRO_NAME = "|".join(sorted(METRO_NAMES, key=len, reverse=True))
+METRO_NAME_PATTERN = re.compile(
+    rf"\b(?:(?:any|qualquer|cualquier)\s+(?:(?:airport|aeroporto|aeropuerto)\s+(?:in|of|de|em|en)\s+)?)?"
+    rf"(?P<name>{_METRO_NAME})(?:\s+(?:airports?|aeroportos?|aeropuertos?))?\b",
+    re.IGNORECASE,
+)
+
+DEFAULT_FLEX_DAYS = 3
+FLEX_DAYS = re.compile(
+    r"(?:±|\+/-|\+-|(?:plus or minus|mais ou menos|más o menos)\s)\s*(?P<days>\d+)\s*(?:days?|dias?|días?)"
+    r"|(?P<either>\d+)\s*(?:days?|dias?|días?)\s+(?:flexible|flex[ií]veis|either side|before or after|antes ou depois)",
+    re.IGNORECASE,
+)
+FLEXIBLE_DATES = re.compile(r"\b(?:flexible dates?|datas? flex[ií]ve(?:l|is)|fechas? flexibles?)\b", re.IGNORECASE)
+
+# Upper-case words that look like IATA codes but are not meant as airports.
+NOT_AIRPORTS = CURRENCY_CODES | {"AND", "THE", "FOR", "YOU", "ONE", "NOT", "BUT", "ANY", "ALL", "PRA", "VOO"}
+
+
+class TripDetails(BaseModel):
+    from_airport: Optional[str] = None
+    to_airport: Optional[str] = None
+    departure_date: Optional[date] = None
+    date_flex_days: int = 0
+    confidence: float = 0.0
+
+    def search_args(self) -> dict:
+        return {
+            "from_airport": self.from_airport,
+            "to_airport": self.to_airport,
+            "departure_date": self.departure_date.isoformat(),
+        }
+
+    def search_combinations(self, max_flex_days: int, today: Optional[date] = None) -> list[dict]:
+        """
+        Expands metropolitan area codes into their airports and the departure date into
+        ±`date_flex_days` (capped at `max_flex_days`), skipping dates in the past.
+        """
+        today = today or date.today()
+        flex_days = min(self.date_flex_days, max_flex_days)
+
+        origins = METRO_AIRPORTS.get(self.from_airport, [self.from_airport])
+        destinations = METRO_AIRPORTS.get(self.to_airport, [self.to_airport])
+        dates = [
+            day
+            for offset in range(-flex_days, flex_days + 1)
+            if (day := self.departure_date + timedelta(days=offset)) >= today
+        ]
+
+        return [
+            {"from_airport": origin, "to_airport": destination, "departure_date": day.isoformat()}
+            for origin, destination, day in product(origins, destinations, dates or [self.departure_date])
+            if origin != destination
+        ]
+
+
+def find_airports(text: str) -> list[str]:
+    """
+    Returns the distinct upper-case IATA-like codes in `text`, in order of appearance.
+    """
+    codes = [code for code in IATA_CODE.findall(text) if code not in NOT_AIRPORTS]
+    return list(dict.fromkeys(codes))
+
+
+def find_route(text: str) -> Optional[tuple[str, str, float]]:
+    """
+    Finds the departure and destination airports, with how confident the match is.
+    Examples:
+        "from CWB to GRU" -> ("CWB", "GRU", 1.0)
+        "GRU → LIS" -> ("GRU", "LIS", 0.9)
+        "CWB GRU" -> ("CWB", "GRU", 0.7)
+    """
+    for pattern, confidence in ((ROUTE_WITH_KEYWORDS, 1.0), (ROUTE_WITH_SEPARATOR, 0.9)):
+        for match in pattern.finditer(text):
+            from_airport, to_airport = match.group("from"), match.group("to")
+            if from_airport != to_airport and not {from_airport, to_airport} & NOT_AIRPORTS:
+                return from_airport, to_airport, confidence
+
+    airports = find_airports(text)
+    if len(airports) == 2:
+        return airports[0], airports[1], 0.7
+
+    return None
+
+
+def _build_date(year: Optional[str], month: int, day: int, today: date) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year) + 2000 if len(year) == 2 else int(year), month, day)
+
+        # Without a year the next occurrence of the date is meant.
+        candidate = date(today.year, month, day)
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def find_date(text: str, today: Optional[date] = None) -> Optional[tuple[date, float]]:
+    """
+    Finds the first departure date in `text`, with how confident the parse is.
+    Numeric dates are read day first, as in "01/08/2025" for the 1st of August.
+    Examples:
+        "on 2025-08-01" -> (date(2025, 8, 1), 1.0)
+        "on August 1st, 2025" -> (date(2025, 8, 1), 1.0)
+        "1 de agosto" -> (date(<next August 1st>), 0.8)
+        "01/08/2025" -> (date(2025, 8, 1), 0.8)
+    """
+    today = today or date.today()
+
+    for match in ISO_DATE.finditer(text):
+        if parsed := _build_date(match.group("year"), int(match.group("month")), int(match.group("day")), today):
+            return parsed, 1.0
+
+    for pattern in (MONTH_FIRST_DATE, DAY_FIRST_DATE):
+        for match in pattern.finditer(text):
+            month = MONTHS[match.group("month").lower()]
+            if parsed := _build_date(match.group("year"), month, int(match.group("day")), today):
+                return parsed, 1.0 if match.group("year") else 0.8
+
+    for match in NUMERIC_DATE.finditer(text):
+        day, month = int(match.group("day")), int(match.group("month"))
+        if parsed := _build_date(match.group("year"), month, day, today):
+            # Day and month can only be told apart when the day is above 12.
+            confidence = 0.9 if day > 12 else 0.8
+            return parsed, confidence if match.group("year") else confidence - 0.2
+
+    return None
+
+
+def find_flex_days(text: str) -> int:
+    """
+    Finds how many days around the departure date the traveller accepts.
+    Examples:
+        "±3 days" -> 3
+        "2 days either side" -> 2
+        "flexible dates" -> DEFAULT_FLEX_DAYS
+    """
+    if match := FLEX_DAYS.search(text):
+        return int(match.group("days") or match.group("either"))
+    if FLEXIBLE_DATES.search(text):
+        return DEFAULT_FLEX_DAYS
+    return 0
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def replace_metro_names(text: str) -> str:
+    """
+    Replaces multi-airport city names with their metropolitan area code.
+    Example: "from any São Paulo airport to LIS" -> "from SAO to LIS"
+    """
+    return METRO_NAME_PATTERN.sub(lambda m: METRO_NAMES[m.group("name").lower()], _strip_accents(text))
+
+
+def extract_trip_details(text: str, today: Optional[date] = None) -> TripDetails:
+    """
+    Extracts the search_flights arguments from free text without calling the LLM.
+    The confidence is the lowest of the route and date confidences, or 0 when either is missing.
+    """
+    route = find_route(replace_metro_names(text))
+    found_date = find_date(text, today)
+    flex_days = find_flex_days(text)
+
+    if route is None or found_date is None:
+        return TripDetails(
+            from_airport=route[0] if route else None,
+            to_airport=route[1] if route else None,
+            departure_date=found_date[0] if found_date else None,
+            date_flex_days=flex_days,
+        )
+
+    from_airport, to_airport, route_confidence = route
+    departure_date, date_confidence = found_date
+    return TripDetails(
+        from_airport=from_airport,
+        to_airport=to_airport,
+        departure_date=departure_date,
+        date_flex_days=flex_days,
+        confidence=min(route_confidence, date_confidence),
+    )
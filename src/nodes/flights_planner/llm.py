@@ -1,6 +1,3 @@
-from langchain_ollama import ChatOllama
+from ...llms.registry import get_llm
 
-llm = ChatOllama(
-    model="qwen3:14b",
-    temperature=0,
-)
+llm = get_llm("flights_planner")
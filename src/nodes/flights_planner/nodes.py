@@ -1,70 +1,77 @@
+import httpx
 from langchain.schema import HumanMessage, AIMessage
+from redis.exceptions import RedisError
 
 
 from .llm import llm
-from .prompts import flight_search_instructions, flight_ranking_instructions
-from .tools import search_flights
-from ...graph.state import TravellerState, TravellerInputState, TravellerOutputState, FlightList
+from .extractor import extract_trip_details
+from .prompts import flight_search_instructions
+from .ranking import get_ranking_engine
+from .tools import search_flights, search_flights_fanout
+from ...config import settings
+from ...metrics import instrument_node
+from ...llms.currency_converter import convert_flights
+from ...graph.state import TravellerState, TravellerInputState
 
 
-def flights_search_node(state: TravellerInputState):
+async def plan_search_with_llm(trip_details: str) -> dict | None:
     llm_with_tools = llm.bind_tools([search_flights])
 
-    result = llm_with_tools.invoke(
+    result = await llm_with_tools.ainvoke(
         [
             HumanMessage(
                 content=flight_search_instructions.format(
-                    trip_details=state.trip_details,
+                    trip_details=trip_details,
                 )
             ),
         ]
     )
 
-    flights = []
-
     if isinstance(result, AIMessage) and result.tool_calls:
         tool_call = result.tool_calls[0]
         args = tool_call["args"]
         if tool_call["name"] == "search_flights":
-            flights = search_flights.invoke(
-                {
-                    "from_airport": args["from_airport"],
-                    "to_airport": args["to_airport"],
-                    "departure_date": args["departure_date"],
-                }
-            )
+            return {
+                "from_airport": args["from_airport"],
+                "to_airport": args["to_airport"],
+                "departure_date": args["departure_date"],
+            }
 
-    return {"flights": flights}
+    return None
 
 
-def flights_ranking_node(state: TravellerState) -> TravellerOutputState:
-    if state.flights is None or not len(state.flights):
-        raise ValueError("No flights found to rank.")
+@instrument_node("flights_search_node")
+async def flights_search_node(state: TravellerInputState):
+    trip = extract_trip_details(state.trip_details)
 
-    structured_llm = llm.with_structured_output(schema=FlightList)
+    if trip.confidence >= settings.FLIGHTS_EXTRACTION_MIN_CONFIDENCE:
+        combinations = trip.search_combinations(settings.FLIGHTS_FLEX_MAX_DAYS)
+        combinations = combinations[: settings.FLIGHTS_SEARCH_MAX_COMBINATIONS]
+    else:
+        search_args = await plan_search_with_llm(state.trip_details)
+        combinations = [search_args] if search_args else []
 
-    result = structured_llm.invoke(
-        [
-            HumanMessage(
-                content=flight_ranking_instructions.format(
-                    flights_list=[flight.model_dump_json() for flight in state.flights],
-                )
-            ),
-        ]
-    )
+    if len(combinations) > 1:
+        flights = await search_flights_fanout(combinations, settings.FLIGHTS_SEARCH_MAX_CONCURRENCY)
+    else:
+        flights = await search_flights.ainvoke(combinations[0]) if combinations else []
 
-    flights_result = FlightList.model_validate(result)
+    return {"flights": flights, "trip_extraction_confidence": trip.confidence}
 
-    if not flights_result.flights:
-        ranked_flights = sorted(
-            state.flights,
-            key=lambda f: (f.price, f.duration_in_minutes, f.stops),
-        )
 
-        flights_result.flights = ranked_flights[:3]
+@instrument_node("flights_ranking_node")
+async def flights_ranking_node(state: TravellerState):
+    if state.flights is None or not len(state.flights):
+        raise ValueError("No flights found to rank.")
 
-    return TravellerOutputState(
-        friendly_greeting="Here are the top ranked flights based on your preferences.",
-        ranked_flights=flights_result.flights,
-        ranked_hotels=[],
-    )
+    flights = state.flights
+    if settings.FLIGHTS_CURRENCY:
+        try:
+            flights = await convert_flights(flights, settings.FLIGHTS_CURRENCY)
+        except (httpx.HTTPError, RedisError, ValueError) as e:
+            print(f"Could not convert flight prices to {settings.FLIGHTS_CURRENCY}: {e}")
+
+    rank = get_ranking_engine(settings.FLIGHTS_RANKING_MODE)
+    ranked_flights = await rank(flights, settings.FLIGHTS_RANKING_TOP_K)
+
+    return {"ranked_flights": ranked_flights}
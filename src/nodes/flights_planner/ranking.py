@@ -0,0 +1,125 @@
+from typing import Awaitable, Callable, Optional
+
+from langchain.schema import HumanMessage
+from pydantic import BaseModel
+
+from .llm import llm
+from .prompts import flight_ranking_instructions
+from ...config import settings
+from ...graph.state import FlightList
+from ...models import Flight
+
+
+class RankingWeights(BaseModel):
+    price: float = 1.0
+    duration: float = 0.0
+    stops: float = 0.0
+
+
+def ranking_key(flight: Flight) -> tuple:
+    """
+    The standard ranking criteria: cheapest first, then shortest, then fewest stops.
+    """
+    return (flight.price, flight.duration_in_minutes, flight.stops)
+
+
+def dominates(a: Flight, b: Flight) -> bool:
+    """
+    Whether `a` is at least as good as `b` on every criterion and strictly better on one.
+    """
+    a_values, b_values = ranking_key(a), ranking_key(b)
+    return all(x <= y for x, y in zip(a_values, b_values)) and a_values != b_values
+
+
+def pareto_front(flights: list[Flight]) -> list[Flight]:
+    """
+    Returns the flights that are not dominated by any other flight, in their original order.
+    """
+    return [flight for flight in flights if not any(dominates(other, flight) for other in flights)]
+
+
+def _weighted_key(flights: list[Flight], weights: RankingWeights) -> Callable[[Flight], tuple]:
+    def normalizer(values: list[float]) -> Callable[[float], float]:
+        low, high = min(values), max(values)
+        return lambda value: (value - low) / (high - low) if high > low else 0.0
+
+    price = normalizer([float(f.price) for f in flights])
+    duration = normalizer([float(f.duration_in_minutes) for f in flights])
+    stops = normalizer([float(f.stops) for f in flights])
+
+    def key(flight: Flight) -> tuple:
+        score = (
+            weights.price * price(float(flight.price))
+            + weights.duration * duration(float(flight.duration_in_minutes))
+            + weights.stops * stops(float(flight.stops))
+        )
+        return (score, *ranking_key(flight))
+
+    return key
+
+
+def rank_flights(
+    flights: list[Flight],
+    top_k: int = 3,
+    weights: Optional[RankingWeights] = None,
+    pareto: bool = False,
+) -> list[Flight]:
+    """
+    Deterministically ranks flights and returns the best `top_k`.
+
+    Without weights the flights are sorted by the standard criteria (see `ranking_key`).
+    With weights every criterion is min-max normalized and combined into a single score.
+    When `pareto` is set, non-dominated flights always come before dominated ones.
+    """
+    if not flights:
+        return []
+
+    key = _weighted_key(flights, weights) if weights is not None else ranking_key
+
+    if not pareto:
+        return sorted(flights, key=key)[:top_k]
+
+    front = pareto_front(flights)
+    front_ids = {id(flight) for flight in front}
+    rest = [flight for flight in flights if id(flight) not in front_ids]
+    return (sorted(front, key=key) + sorted(rest, key=key))[:top_k]
+
+
+async def llm_ranking(flights: list[Flight], top_k: int = 3) -> list[Flight]:
+    structured_llm = llm.with_structured_output(schema=FlightList)
+
+    result = await structured_llm.ainvoke(
+        [
+            HumanMessage(
+                content=flight_ranking_instructions.format(
+                    flights_list=[flight.model_dump_json() for flight in flights],
+                )
+            ),
+        ]
+    )
+
+    flights_result = FlightList.model_validate(result)
+
+    if not flights_result.flights:
+        return rank_flights(flights, top_k=top_k)
+
+    return flights_result.flights
+
+
+async def deterministic_ranking(flights: list[Flight], top_k: int = 3) -> list[Flight]:
+    weights = RankingWeights(**settings.FLIGHTS_RANKING_WEIGHTS) if settings.FLIGHTS_RANKING_WEIGHTS else None
+    return rank_flights(flights, top_k=top_k, weights=weights, pareto=settings.FLIGHTS_RANKING_PARETO)
+
+
+RankingEngine = Callable[[list[Flight], int], Awaitable[list[Flight]]]
+
+RANKING_ENGINES: dict[str, RankingEngine] = {
+    "deterministic": deterministic_ranking,
+    "llm": llm_ranking,
+}
+
+
+def get_ranking_engine(mode: str) -> RankingEngine:
+    if mode not in RANKING_ENGINES:
+        raise ValueError(f"Unknown flights ranking mode: {mode}")
+    return RANKING_ENGINES[mode]
@@ -1,12 +1,85 @@
-from langchain.tools import tool
+import asyncio
+import heapq
+from itertools import chain
+from typing import Iterator
+
+from langchain.tools import StructuredTool
+from langgraph.config import get_stream_writer
 from fast_flights import FlightData, Passengers, get_flights
+from .cache import flight_search_cache
+from .ranking import ranking_key
 from .utils import duration_to_minutes, parse_datetime_string, parse_amount_currency
 
+from ...config import settings
+from ...metrics import FLIGHT_SCRAPE_DURATION, FLIGHT_SCRAPE_ERRORS, span
 from ...models import Flight
 
 
-@tool
-def search_flights(
+def _flights_query(from_airport: str, to_airport: str, departure_date: str) -> dict:
+    return {
+        "flight_data": [FlightData(date=departure_date, from_airport=from_airport, to_airport=to_airport)],
+        "trip": "one-way",
+        "seat": "economy",
+        "passengers": Passengers(
+            adults=1,
+            children=0,
+        ),
+    }
+
+
+def _iter_flights(result, from_airport: str, to_airport: str) -> Iterator[Flight]:
+    for flight in result.flights:
+        amount, currency = parse_amount_currency(flight.price)
+
+        yield Flight(
+            from_airport=from_airport,
+            to_airport=to_airport,
+            departure_date=parse_datetime_string(flight.departure),
+            airline=flight.name,
+            price=amount,
+            currency=currency,
+            stops=flight.stops,
+            duration_in_minutes=duration_to_minutes(flight.duration),
+        )
+
+
+def _get_flights(from_airport: str, to_airport: str, departure_date: str):
+    with FLIGHT_SCRAPE_DURATION.time(), span("get_flights", route=f"{from_airport}-{to_airport}", date=departure_date):
+        try:
+            return get_flights(**_flights_query(from_airport, to_airport, departure_date))
+        except Exception:
+            FLIGHT_SCRAPE_ERRORS.inc()
+            raise
+
+
+def _parse_flights(result, from_airport: str, to_airport: str, top_k: int | None = None) -> list[Flight]:
+    """
+    Parses the whole result set lazily, keeping only the best `top_k` flights by the
+    ranking key in a bounded heap. The kept flights are returned in the provider's order.
+    """
+    top_k = top_k or settings.FLIGHTS_SEARCH_TOP_K
+    best = heapq.nsmallest(
+        top_k,
+        enumerate(_iter_flights(result, from_airport, to_airport)),
+        key=lambda item: (ranking_key(item[1]), item[0]),
+    )
+
+    return [flight for _, flight in sorted(best, key=lambda item: item[0])]
+
+
+def _stream_flights(flights: list[Flight]) -> None:
+    """
+    Pushes the flights of a finished search to the graph's custom stream, if any.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+
+    writer({"flights": flights})
+
+
+def _search_flights(
     from_airport: str,
     to_airport: str,
     departure_date: str,
@@ -19,36 +92,73 @@ def search_flights(
         departure_date (str): The date of departure in YYYY-MM-DD format.
     """
 
-    flight_data = [FlightData(date=departure_date, from_airport=from_airport, to_airport=to_airport)]
+    result = _get_flights(from_airport, to_airport, departure_date)
 
-    passengers = Passengers(
-        adults=1,
-        children=0,
-    )
+    return _parse_flights(result, from_airport, to_airport)
 
-    result = get_flights(
-        flight_data=flight_data,
-        trip="one-way",
-        seat="economy",
-        passengers=passengers,
-    )
 
-    flights = []
+async def _asearch_flights(
+    from_airport: str,
+    to_airport: str,
+    departure_date: str,
+) -> list[Flight]:
+    async def scrape() -> list[Flight]:
+        # fast_flights only offers a blocking client, so the scrape runs in a worker
+        # thread to keep the event loop free while the request is in flight.
+        result = await asyncio.to_thread(_get_flights, from_airport, to_airport, departure_date)
+        return _parse_flights(result, from_airport, to_airport)
+
+    flights = await flight_search_cache.get_or_fetch(from_airport, to_airport, departure_date, scrape)
+    _stream_flights(flights)
+
+    return flights
 
-    for flight in result.flights[:10]:
-        amount, currency = parse_amount_currency(flight.price)
 
-        flights.append(
-            Flight(
-                from_airport=from_airport,
-                to_airport=to_airport,
-                departure_date=parse_datetime_string(flight.departure),
-                airline=flight.name,
-                price=amount,
-                currency=currency,
-                stops=flight.stops,
-                duration_in_minutes=duration_to_minutes(flight.duration),
-            )
+search_flights = StructuredTool.from_function(
+    func=_search_flights,
+    coroutine=_asearch_flights,
+    name="search_flights",
+)
+
+
+def dedupe_flights(flights) -> list[Flight]:
+    """
+    Drops flights that were returned by more than one search, keeping the first occurrence.
+    """
+    seen = set()
+    unique = []
+    for flight in flights:
+        key = (
+            flight.from_airport,
+            flight.to_airport,
+            flight.departure_date,
+            flight.airline,
+            flight.price,
+            flight.currency,
+            flight.stops,
+            flight.duration_in_minutes,
         )
+        if key not in seen:
+            seen.add(key)
+            unique.append(flight)
+    return unique
 
-    return flights
+
+async def search_flights_fanout(combinations: list[dict], max_concurrency: int) -> list[Flight]:
+    """
+    Runs one search_flights call per combination of airports and dates, at most
+    `max_concurrency` at a time, and merges the results.
+    A failed search only drops its own combination.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def search(search_args: dict) -> list[Flight]:
+        async with semaphore:
+            try:
+                return await search_flights.ainvoke(search_args)
+            except Exception as e:
+                print(f"Flight search failed for {search_args}: {e}")
+                return []
+
+    results = await asyncio.gather(*(search(search_args) for search_args in combinations))
+    return dedupe_flights(chain.from_iterable(results))
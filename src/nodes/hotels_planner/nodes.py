@@ -0,0 +1,62 @@
+import re
+from datetime import timedelta
+from typing import Optional
+
+import httpx
+
+from .providers import get_hotel_provider
+from .ranking import rank_hotels
+from ..flights_planner.extractor import extract_trip_details
+from ...config import settings
+from ...metrics import instrument_node
+from ...graph.state import TravellerState, TravellerInputState
+
+HOTEL_WORDS = re.compile(
+    r"\b(?:hot[eé]is|hotels?|hostels?|hospedagem|alojamiento|accommodations?|nights?|noites|noches)\b", re.IGNORECASE
+)
+NIGHTS = re.compile(r"\b(\d{1,2})\s*(?:nights?|noites|noches)\b", re.IGNORECASE)
+
+
+def wants_hotels(trip_details: str) -> bool:
+    """
+    Examples:
+        "from GRU to LIS on 2025-08-01 and a hotel for 3 nights" -> True
+        "from GRU to LIS on 2025-08-01" -> False
+    """
+    return HOTEL_WORDS.search(trip_details) is not None
+
+
+def find_nights(text: str) -> Optional[int]:
+    """
+    Examples:
+        "a hotel for 3 nights" -> 3
+        "5 noites em Lisboa" -> 5
+    """
+    match = NIGHTS.search(text)
+    return int(match.group(1)) if match and int(match.group(1)) > 0 else None
+
+
+@instrument_node("hotels_search_node")
+async def hotels_search_node(state: TravellerInputState):
+    trip = extract_trip_details(state.trip_details)
+    if not trip.to_airport or not trip.departure_date:
+        print("Skipping the hotel search, the trip has no destination or date")
+        return {"hotels": []}
+
+    check_in = trip.departure_date
+    check_out = check_in + timedelta(days=find_nights(state.trip_details) or settings.HOTELS_DEFAULT_NIGHTS)
+
+    provider = get_hotel_provider(settings.HOTELS_PROVIDER)
+    try:
+        hotels = await provider.search(trip.to_airport, check_in, check_out)
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"Could not search hotels in {trip.to_airport}: {e}")
+        hotels = []
+
+    return {"hotels": hotels}
+
+
+@instrument_node("hotels_ranking_node")
+async def hotels_ranking_node(state: TravellerState):
+    ranked_hotels = rank_hotels(state.hotels, settings.HOTELS_RANKING_TOP_K, settings.HOTELS_MIN_RATING)
+    return {"ranked_hotels": ranked_hotels}
@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+from datetime import date
+from decimal import Decimal
+from typing import Protocol
+
+from ...models import Hotel
+
+
+class HotelProvider(Protocol):
+    async def search(self, destination: str, check_in: date, check_out: date) -> list[Hotel]: ...
+
+
+class StubHotelProvider:
+    """
+    Local hotel provider for tests and development: a fixed set of hotels per destination,
+    with prices derived from the destination so results are stable across runs.
+    """
+
+    NAMES = ("Grand Plaza", "Central Inn", "Harbour View", "Old Town Suites", "Airport Lodge")
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    async def search(self, destination: str, check_in: date, check_out: date) -> list[Hotel]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        nights = max((check_out - check_in).days, 1)
+        seed = int(hashlib.sha256(destination.upper().encode()).hexdigest(), 16)
+
+        hotels = []
+        for i, name in enumerate(self.NAMES):
+            price_per_night = Decimal(80 + (seed >> (i * 8)) % 220)
+            hotels.append(
+                Hotel(
+                    name=f"{name} {destination.upper()}",
+                    address=f"{10 + i * 7} Main Street, {destination.upper()}",
+                    check_in_date=check_in.isoformat(),
+                    check_out_date=check_out.isoformat(),
+                    price_per_night=price_per_night,
+                    total_price=price_per_night * nights,
+                    rating=round(3.0 + ((seed >> (i * 4)) % 21) / 10, 1),
+                )
+            )
+        return hotels
+
+
+HOTEL_PROVIDERS: dict[str, type] = {
+    "stub": StubHotelProvider,
+}
+
+
+def get_hotel_provider(name: str) -> HotelProvider:
+    if name not in HOTEL_PROVIDERS:
+        raise ValueError(f"Unknown hotels provider: {name}")
+    return HOTEL_PROVIDERS[name]()
@@ -0,0 +1,15 @@
+from ...models import Hotel
+
+
+def hotel_ranking_key(hotel: Hotel) -> tuple:
+    """
+    Cheapest stay first, then the best rated, then by name so ties are stable.
+    """
+    return (hotel.total_price, -hotel.rating, hotel.name)
+
+
+def rank_hotels(hotels: list[Hotel], top_k: int = 3, min_rating: float = 0.0) -> list[Hotel]:
+    """
+    Returns the best `top_k` hotels rated at least `min_rating`.
+    """
+    return sorted((hotel for hotel in hotels if hotel.rating >= min_rating), key=hotel_ranking_key)[:top_k]
@@ -0,0 +1,19 @@
+from ..graph.state import TravellerState, TravellerOutputState
+from ..metrics import instrument_node
+
+
+@instrument_node("trip_output_node")
+async def trip_output_node(state: TravellerState) -> TravellerOutputState:
+    """
+    Joins the flight and hotel branches into the trip plan.
+    """
+    if state.ranked_hotels:
+        friendly_greeting = "Here are the top ranked flights and hotels based on your preferences."
+    else:
+        friendly_greeting = "Here are the top ranked flights based on your preferences."
+
+    return TravellerOutputState(
+        friendly_greeting=friendly_greeting,
+        ranked_flights=state.ranked_flights,
+        ranked_hotels=state.ranked_hotels,
+    )
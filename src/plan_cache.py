@@ -0,0 +1,82 @@
+from typing import NamedTuple, Optional
+
+from .cache import LRUCache
+from .config import settings
+from .metrics import CACHE_REQUESTS
+from .nodes.flights_planner.extractor import METRO_AIRPORTS, extract_trip_details
+from .nodes.hotels_planner.nodes import find_nights, wants_hotels
+
+
+class PlanLookup(NamedTuple):
+    plan: Optional[dict]
+    signature: Optional[tuple]
+
+
+AIRPORT_METROS = {airport: metro for metro, airports in METRO_AIRPORTS.items() for airport in airports}
+
+
+def trip_signature(trip_details: str, want_hotel_search: bool = False) -> Optional[tuple]:
+    """
+    What makes two requests the same trip: the extracted route (airports of a metropolitan area
+    count as the area) and dates, and whether hotels were asked for.
+    None when the route or date cannot be extracted, as nothing would then tell two trips apart.
+    Example:
+        "from GRU to LIS on 2099-08-01" -> ("SAO", "LIS", date(2099, 8, 1), 0, False, None)
+    """
+    trip = extract_trip_details(trip_details)
+    if not (trip.from_airport and trip.to_airport and trip.departure_date):
+        return None
+
+    hotels = want_hotel_search or wants_hotels(trip_details)
+    return (
+        AIRPORT_METROS.get(trip.from_airport, trip.from_airport),
+        AIRPORT_METROS.get(trip.to_airport, trip.to_airport),
+        trip.departure_date,
+        trip.date_flex_days,
+        hotels,
+        find_nights(trip_details) if hotels else None,
+    )
+
+
+class PlanCache:
+    """
+    Caches whole trip plans by trip_signature, so other phrasings of a recent trip are answered
+    without running the graph.
+
+    Requests without a signature bypass the cache. Plans expire `ttl_seconds` after they were
+    made, however often they are served, and the least recently used one is evicted past `maxsize`.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float], maxsize: int):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl_seconds, sliding=False)
+
+    def lookup(self, trip_details: str, want_hotel_search: bool = False) -> PlanLookup:
+        signature = trip_signature(trip_details, want_hotel_search)
+        if signature is None:
+            CACHE_REQUESTS.labels("trip_plans", "bypass").inc()
+            return PlanLookup(None, None)
+
+        plan = self.entries.get(signature)
+        CACHE_REQUESTS.labels("trip_plans", "hit" if plan is not None else "miss").inc()
+        return PlanLookup(plan, signature)
+
+    def store(self, lookup: PlanLookup, plan: dict) -> None:
+        """
+        Caches the plan made for a missed lookup.
+        """
+        if lookup.signature is None:
+            return
+
+        self.entries.set(lookup.signature, plan)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries)}
+
+
+plan_cache = PlanCache(
+    ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS or settings.FLIGHTS_CACHE_TTL_SECONDS,
+    maxsize=settings.PLAN_CACHE_MAX_ENTRIES,
+)
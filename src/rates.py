@@ -0,0 +1,163 @@
+import asyncio
+import json
+import time
+from decimal import Decimal, ROUND_CEILING
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from .cache import redis
+from .config import settings
+from .metrics import CACHE_REQUESTS
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP client, so calls to the currency API reuse pooled connections.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=settings.CURRENCY_API_TIMEOUT_SECONDS)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    if _http_client is not None:
+        await _http_client.aclose()
+
+
+class RateTable:
+    """
+    Cross rates between every pair of currencies in the API payload.
+
+    The payload is quoted against a single base currency, so the N×N matrix is built once when
+    the rates are loaded and every conversion afterwards is a constant-time lookup.
+    """
+
+    def __init__(self, rates: dict[str, Decimal]):
+        self.currencies = sorted(rates)
+        self.index = {currency: i for i, currency in enumerate(self.currencies)}
+        self.matrix = [[rates[to] / rates[from_] for to in self.currencies] for from_ in self.currencies]
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.index
+
+    def rate(self, from_currency: str, to_currency: str) -> Decimal:
+        try:
+            return self.matrix[self.index[from_currency]][self.index[to_currency]]
+        except KeyError as e:
+            raise ValueError(f"Unsupported currency: {e.args[0]}") from e
+
+    def convert(self, amount: Decimal, from_currency: str, to_currency: str) -> Decimal:
+        if from_currency == to_currency:
+            return amount
+
+        result = amount * self.rate(from_currency, to_currency)
+        return result.quantize(Decimal("0.01"), rounding=ROUND_CEILING)
+
+    def convert_many(self, amounts: list[Decimal], from_currency: str, to_currency: str) -> list[Decimal]:
+        if from_currency == to_currency:
+            return list(amounts)
+
+        rate = self.rate(from_currency, to_currency)
+        return [(amount * rate).quantize(Decimal("0.01"), rounding=ROUND_CEILING) for amount in amounts]
+
+
+async def fetch_remote_rates() -> RateTable:
+    cached = await redis.get(settings.CURRENCY_CACHE_KEY)
+
+    if cached:
+        CACHE_REQUESTS.labels("currency_rates_redis", "hit").inc()
+        currencies_data = json.loads(cached)
+    else:
+        CACHE_REQUESTS.labels("currency_rates_redis", "miss").inc()
+        exchange_rate_api_url = f"https://api.freecurrencyapi.com/v1/latest?apikey={settings.EXCHANGE_RATE_API_KEY}"
+        response = await get_http_client().get(exchange_rate_api_url)
+        currencies = response.json()
+
+        if "data" not in currencies:
+            raise ValueError("Invalid response from the currency API")
+
+        currencies_data = currencies["data"]
+
+        await redis.set(
+            settings.CURRENCY_CACHE_KEY,
+            json.dumps(currencies_data),
+            ex=settings.CURRENCY_CACHE_EXPIRE_SECONDS,
+        )
+    return RateTable({currency: Decimal(str(rate)) for currency, rate in currencies_data.items()})
+
+
+class RatesCache:
+    """
+    Process-local copy of the parsed rate table kept in front of Redis.
+
+    Reads are served from memory while the table is younger than `ttl_seconds`. Once it is older
+    than `refresh_after_seconds` a single background task reloads it, so callers never wait for a
+    refresh unless the table expired. Concurrent misses wait on the same load. If a reload fails,
+    the last table keeps being served.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[RateTable]],
+        ttl_seconds: float,
+        refresh_after_seconds: float,
+    ):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after_seconds = refresh_after_seconds
+        self._rates: Optional[RateTable] = None
+        self._loaded_at = 0.0
+        self._load_task: Optional[asyncio.Task] = None
+
+    async def get(self) -> RateTable:
+        age = time.monotonic() - self._loaded_at
+
+        if self._rates is not None and age < self.ttl_seconds:
+            CACHE_REQUESTS.labels("currency_rates", "hit").inc()
+            if age >= self.refresh_after_seconds:
+                self._load()
+            return self._rates
+
+        CACHE_REQUESTS.labels("currency_rates", "miss").inc()
+
+        try:
+            return await asyncio.shield(self._load())
+        except Exception:
+            if self._rates is None:
+                raise
+            return self._rates
+
+    def invalidate(self) -> None:
+        self._rates = None
+        self._loaded_at = 0.0
+
+    def _load(self) -> asyncio.Task:
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self._reload())
+            self._load_task.add_done_callback(self._on_load_done)
+        return self._load_task
+
+    async def _reload(self) -> RateTable:
+        self._rates = await self.loader()
+        self._loaded_at = time.monotonic()
+        return self._rates
+
+    def _on_load_done(self, task: asyncio.Task) -> None:
+        self._load_task = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Could not refresh currency rates: {task.exception()}")
+
+
+rates_cache = RatesCache(
+    fetch_remote_rates,
+    ttl_seconds=settings.CURRENCY_RATES_TTL_SECONDS,
+    refresh_after_seconds=settings.CURRENCY_RATES_REFRESH_AFTER_SECONDS,
+)
+
+
+async def fetch_rates() -> RateTable:
+    return await rates_cache.get()
@@ -0,0 +1,50 @@
+from typing import Any
+
+from pydantic import TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+from .models import Flight, Hotel
+
+
+class StreamMessage(TypedDict):
+    """
+    One chunk of the planning streams. A TypedDict rather than a model, so building one
+    per event costs no more than a dict.
+    """
+
+    node: NotRequired[str]
+    response: str
+    partial: NotRequired[bool]
+    flights: NotRequired[list[Flight]]
+    hotels: NotRequired[list[Hotel]]
+    retry_after: NotRequired[int]
+    cached: NotRequired[bool]
+
+
+# Built once, so every event reuses the compiled pydantic-core serializers.
+_stream_message_adapter = TypeAdapter(StreamMessage)
+_any_adapter = TypeAdapter(Any)
+
+
+def stream_message(response: str, **fields) -> StreamMessage:
+    return StreamMessage(response=response, **fields)
+
+
+def encode_message(message: StreamMessage) -> bytes:
+    """
+    Serializes a StreamMessage, Flights included, straight to JSON bytes.
+    Example:
+        encode_message(stream_message("Working on your request...")) -> b'{"response":"Working on your request..."}'
+    """
+    return _stream_message_adapter.dump_json(message)
+
+
+def ndjson_line(message: StreamMessage) -> bytes:
+    return encode_message(message) + b"\n"
+
+
+def dump_json(value: Any) -> bytes:
+    """
+    Serializes any JSON-compatible value, pydantic models, Decimals and datetimes included, to bytes.
+    """
+    return _any_adapter.dump_json(value)
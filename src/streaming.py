@@ -0,0 +1,50 @@
+from itertools import count
+from typing import Any, Optional
+
+from .serialization import dump_json
+
+
+def format_sse(data: Any, event: Optional[str] = None, id: Optional[str | int] = None) -> bytes:
+    """
+    Frames one Server-Sent Event. Bytes and strings are sent as they are, anything else as JSON.
+    Examples:
+        format_sse("hi") -> b"data: hi\n\n"
+        format_sse({"token": "Olá"}, event="token", id=3) -> b'id: 3\nevent: token\ndata: {"token":"Olá"}\n\n'
+    """
+    if isinstance(data, bytes):
+        payload = data
+    elif isinstance(data, str):
+        payload = data.encode()
+    else:
+        payload = dump_json(data)
+
+    frame = b""
+    if id is not None:
+        frame += b"id: %s\n" % str(id).encode()
+    if event:
+        frame += b"event: %s\n" % event.encode()
+    frame += b"".join(b"data: %s\n" % line for line in payload.split(b"\n"))
+
+    return frame + b"\n"
+
+
+class SSEStream:
+    """
+    Numbers the events of one response, so clients can tell what they already received.
+    """
+
+    def __init__(self):
+        self._ids = count(1)
+
+    def event(self, event: str, data: Any) -> bytes:
+        return format_sse(data, event=event, id=next(self._ids))
+
+
+def token_text(chunk) -> str:
+    """
+    The text of a streamed chat model chunk, skipping non-text content parts.
+    """
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content if isinstance(part, dict))
@@ -0,0 +1,69 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("EXCHANGE_RATE_API_KEY", "test-api-key")
+
+
+class FakeRedis:
+    """An in-memory stand-in for the string commands of redis.asyncio.Redis."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    async def pttl(self, key):
+        if key not in self.data:
+            return -2
+        return -1 if self.ttls.get(key) is None else self.ttls[key] * 1000
+
+
+class FakePipeline:
+    def __init__(self, data):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def execute(self):
+        return []
+
+
+class PipelinedFakeRedis(FakeRedis):
+    """A FakeRedis that also batches writes in a pipeline."""
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.data)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def pipelined_fake_redis():
+    return PipelinedFakeRedis()
+
+
+@pytest.fixture
+def client():
+    from src.main import app
+
+    with patch("src.main.settings.LLM_WARM_UP", False), TestClient(app) as client:
+        yield client
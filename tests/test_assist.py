@@ -0,0 +1,125 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from src.chains.app import answer_batch
+from src.chains.routing import RoutingDecision
+from src.llms.scheduler import BATCH, INTERACTIVE, _priority
+from src.models import ModelResponse
+
+ROUTES = {"hola": "translation", "100 USD": "currency_converter", "voo": "search_flights", "oi": "weather"}
+
+
+async def fake_classify(input: dict) -> RoutingDecision:
+    assert _priority.get() == BATCH
+    return RoutingDecision(route=ROUTES[input["input"].split(" #")[0]], source="rules")
+
+
+def fake_invoke_chain(calls: list):
+    def invoke_chain(input):
+        route = input["classification"]
+        if route == "weather":
+            return None
+
+        async def answer(input):
+            calls.append((route, input["input"], _priority.get()))
+            if input["input"].endswith("#fail"):
+                raise RuntimeError("boom")
+            return f"{route}: {input['input']}"
+
+        return RunnableLambda(answer)
+
+    return invoke_chain
+
+
+@pytest.fixture
+def calls():
+    calls = []
+    with (
+        patch("src.chains.app.classify_chain", RunnableLambda(fake_classify)),
+        patch("src.chains.app.invoke_chain", fake_invoke_chain(calls)),
+    ):
+        yield calls
+
+
+class TestAnswerBatch:
+    """Test cases for the answer_batch function."""
+
+    async def test_inputs_are_answered_one_route_at_a_time(self, calls):
+        """Test that same-route inputs run together, in batch priority."""
+        inputs = ["hola #0", "100 USD #1", "hola #2", "voo #3", "100 USD #4", "hola #5"]
+
+        results = dict([result async for result in answer_batch(inputs, max_concurrency=2)])
+
+        assert sorted(results) == list(range(len(inputs)))
+        assert results[3] == ModelResponse(
+            model_response="search_flights: voo #3", route="search_flights", routing_source="rules"
+        )
+        assert [route for route, _, _ in calls] == ["translation"] * 3 + ["currency_converter"] * 2 + ["search_flights"]
+        assert {level for _, _, level in calls} == {BATCH}
+
+    async def test_batch_priority_does_not_leak_to_the_consumer(self, calls):
+        """Test that the caller iterating the results keeps its own priority between yields."""
+        levels = [_priority.get() async for _ in answer_batch(["hola #0", "oi #1", "100 USD #2"], max_concurrency=2)]
+
+        assert levels == [INTERACTIVE] * 3
+        assert {level for _, _, level in calls} == {BATCH}
+
+    async def test_failures_are_returned_per_input(self, calls):
+        """Test that a failing input or an unsupported route does not stop the rest."""
+        inputs = ["hola #fail", "oi #1", "hola #2"]
+
+        results = dict([result async for result in answer_batch(inputs, max_concurrency=4)])
+
+        assert isinstance(results[0], RuntimeError)
+        assert str(results[1]) == "Unsupported route: weather"
+        assert results[2].model_response == "translation: hola #2"
+
+
+class TestAssistEndpoints:
+    """Test cases for the /assist and /assist/batch endpoints."""
+
+    def test_assist_answers_one_input(self, client):
+        """Test answering one input through app_chain."""
+        with patch("src.chains.app.invoke_chain", fake_invoke_chain([])):
+            response = client.post("/assist", json={"input": "100 USD"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "model_response": "currency_converter: 100 USD",
+            "route": "currency_converter",
+            "routing_source": "rules",
+        }
+
+    def test_assist_rejects_unsupported_routes(self, client):
+        """Test that an input without a chain is a 422."""
+        with patch("src.chains.app.invoke_chain", return_value=None):
+            response = client.post("/assist", json={"input": "100 USD"})
+
+        assert response.status_code == 422
+
+    def test_batch_streams_one_line_per_input(self, client, calls):
+        """Test that every input gets an NDJSON line with its index."""
+        response = client.post(
+            "/assist/batch", json={"inputs": ["hola #0", "100 USD #1", "hola #fail"], "max_concurrency": 2}
+        )
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+        assert lines[0] == {
+            "index": 0,
+            "model_response": "translation: hola #0",
+            "route": "translation",
+            "routing_source": "rules",
+        }
+        assert lines[1]["route"] == "currency_converter"
+        assert lines[2] == {"index": 2, "error": "boom"}
+
+    def test_batch_rejects_too_many_inputs(self, client):
+        """Test the ASSIST_BATCH_MAX_INPUTS limit."""
+        with patch("src.main.settings.ASSIST_BATCH_MAX_INPUTS", 2):
+            response = client.post("/assist/batch", json={"inputs": ["a", "b", "c"]})
+
+        assert response.status_code == 422
@@ -0,0 +1,59 @@
+from benchmarks.fake_ollama import answer_for
+from benchmarks.load import compare, percentile, summarize
+
+
+class TestLoadReport:
+    """Test cases for the load benchmark statistics."""
+
+    def test_percentile_uses_the_nearest_rank(self):
+        """Test nearest-rank percentiles on a small sample."""
+        values = [float(i) for i in range(1, 101)]
+
+        assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+        assert percentile([], 50) is None
+
+    def test_errors_are_left_out_of_the_latencies(self):
+        """Test that failed requests count as errors but not as latency samples."""
+        samples = [
+            {"ok": True, "latency": 0.2, "ttfe": 0.05, "ttft": None},
+            {"ok": False, "latency": 30.0, "ttfe": None, "ttft": None},
+        ]
+
+        stats = summarize(samples, elapsed=1.0)
+
+        assert (stats["requests"], stats["errors"], stats["throughput_rps"]) == (2, 1, 1.0)
+        assert stats["latency_ms"]["p99"] == 200.0
+        assert stats["ttft_ms"]["p50"] is None
+
+    def test_compare_reports_relative_changes(self):
+        """Test comparing two result files metric by metric."""
+
+        def result(commit, p50):
+            distribution = {"p50": p50, "p95": p50, "p99": p50, "mean": p50}
+            workload = {"throughput_rps": 10.0, "latency_ms": distribution, "ttfe_ms": distribution}
+            workload["ttft_ms"] = {"p50": None, "p95": None, "p99": None, "mean": None}
+            return {"meta": {"commit": commit}, "workloads": {"planning": workload}}
+
+        lines = compare(result("abc", 200.0), result("def", 150.0))
+
+        assert lines[0] == "abc -> def"
+        assert any("latency_ms.p50" in line and "-25.0%" in line for line in lines)
+
+
+class TestFakeOllama:
+    """Test cases for the fake Ollama answers."""
+
+    def test_tool_prompts_get_tool_calls(self):
+        """Test that the flight planner gets a search_flights call."""
+        body = {"messages": [{"content": "plan"}], "tools": [{"function": {"name": "search_flights"}}]}
+
+        tokens, tool_calls = answer_for(body, tokens=5)
+
+        assert tokens == []
+        assert tool_calls[0]["function"]["name"] == "search_flights"
+
+    def test_routing_prompts_get_a_classification(self):
+        """Test that the routing prompt is answered with a route."""
+        body = {"messages": [{"content": "...\nTraveller input: I want flights to Lisbon\nClassification:"}]}
+
+        assert answer_for(body, tokens=5) == (["search_flights"], [])
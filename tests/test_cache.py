@@ -0,0 +1,159 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.cache import LRUCache, TieredCache, normalize_text
+
+
+class TestLRUCache:
+    """Test cases for the LRUCache class."""
+
+    def test_evicts_least_recently_used_entry(self):
+        """Test that the least recently used entry is evicted once maxsize is reached."""
+        evicted = []
+        cache = LRUCache(maxsize=2, on_evict=lambda key, value: evicted.append(key))
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert evicted == ["b"]
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert "b" not in cache
+
+    @patch("src.cache.time.monotonic")
+    def test_expires_idle_entries(self, mock_monotonic):
+        """Test that entries not touched within the ttl are dropped."""
+        mock_monotonic.return_value = 100.0
+        cache = LRUCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        mock_monotonic.return_value = 159.0
+        assert cache.get("a") == 1
+
+        mock_monotonic.return_value = 220.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    @patch("src.cache.time.monotonic")
+    def test_fixed_ttl_is_not_extended_by_reads(self, mock_monotonic):
+        """Test that entries of a non-sliding cache expire ttl seconds after they were set."""
+        mock_monotonic.return_value = 100.0
+        cache = LRUCache(maxsize=10, ttl=60, sliding=False)
+        cache.set("a", 1)
+
+        mock_monotonic.return_value = 130.0
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+
+        mock_monotonic.return_value = 165.0
+        assert len(cache) == 1
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    @patch("src.cache.time.monotonic")
+    def test_per_entry_ttl(self, mock_monotonic):
+        """Test that a shorter per-entry ttl expires first, whatever the order entries were set in."""
+        mock_monotonic.return_value = 0.0
+        cache = LRUCache(maxsize=10, ttl=60, sliding=False)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=5)
+
+        mock_monotonic.return_value = 10.0
+        assert len(cache) == 1
+        assert cache.get("a") == 1
+
+    def test_per_entry_ttl_needs_a_fixed_ttl(self):
+        """Test that a sliding cache rejects a per-entry ttl."""
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=10, ttl=60).set("a", 1, ttl=5)
+
+    def test_touch_keeps_none_values(self):
+        """Test that touching a missing key stores it as a None value."""
+        cache = LRUCache(maxsize=2)
+        cache.touch("a")
+
+        assert "a" in cache
+        assert len(cache) == 1
+
+
+class TestTieredCache:
+    """Test cases for the TieredCache class."""
+
+    async def test_redis_hits_are_promoted_to_the_local_cache(self):
+        """Test that a value found in Redis is served locally afterwards."""
+        client = AsyncMock()
+        client.get.return_value = "translation"
+        cache = TieredCache(prefix="routing", maxsize=10, client=client)
+
+        assert await cache.get("key") == "translation"
+        assert await cache.get("key") == "translation"
+
+        client.get.assert_awaited_once_with("routing:key")
+        assert cache.stats()["hits"] == {"local": 1, "redis": 1}
+
+    async def test_set_writes_both_tiers_with_ttl(self):
+        """Test that values are stored locally and in Redis with the ttl."""
+        client = AsyncMock()
+        cache = TieredCache(prefix="routing", maxsize=10, ttl_seconds=60, client=client)
+
+        await cache.set("key", "search_flights")
+
+        client.set.assert_awaited_once_with("routing:key", "search_flights", ex=60)
+        assert await cache.get("key") == "search_flights"
+
+    @patch("src.cache.time.monotonic")
+    async def test_local_entries_expire_with_redis(self, mock_monotonic):
+        """Test that local hits do not keep an entry alive past the Redis ttl."""
+        mock_monotonic.return_value = 0.0
+        client = AsyncMock()
+        client.get.return_value = None
+        cache = TieredCache(prefix="routing", maxsize=10, ttl_seconds=60, client=client)
+        await cache.set("key", "search_flights")
+
+        for now in (20.0, 40.0, 59.0):
+            mock_monotonic.return_value = now
+            assert await cache.get("key") == "search_flights"
+
+        mock_monotonic.return_value = 61.0
+        assert await cache.get("key") is None
+        client.get.assert_awaited_once_with("routing:key")
+
+    @patch("src.cache.time.monotonic")
+    async def test_promoted_entries_expire_with_their_redis_key(self, mock_monotonic):
+        """Test that a value promoted from a nearly expired Redis key does not outlive it locally."""
+        mock_monotonic.return_value = 0.0
+        client = AsyncMock()
+        client.get.return_value = "translation"
+        client.pttl.return_value = 500
+        cache = TieredCache(prefix="routing", maxsize=10, ttl_seconds=60, client=client)
+
+        assert await cache.get("key") == "translation"
+        mock_monotonic.return_value = 0.4
+        assert await cache.get("key") == "translation"
+        assert client.get.await_count == 1
+
+        mock_monotonic.return_value = 0.6
+        client.get.return_value = None
+        assert await cache.get("key") is None
+        client.pttl.assert_awaited_once_with("routing:key")
+
+    async def test_redis_errors_count_as_misses(self):
+        """Test that an unavailable Redis is treated as a miss."""
+        client = AsyncMock()
+        client.get.side_effect = ConnectionError("connection refused")
+        cache = TieredCache(prefix="routing", maxsize=10, client=client)
+
+        assert await cache.get("key") is None
+        assert cache.stats()["misses"] == 1
+
+
+class TestNormalizeText:
+    """Test cases for the normalize_text function."""
+
+    def test_drops_case_accents_and_punctuation(self):
+        """Test that case, accents, extra whitespace and trailing punctuation are removed."""
+        assert normalize_text("  Açúcar,   POR favor! ") == "acucar, por favor"
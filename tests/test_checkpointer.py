@@ -0,0 +1,144 @@
+from unittest.mock import patch
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import StateGraph, START, END
+from pydantic import BaseModel
+
+from src.graph.checkpointer import BoundedMemorySaver, RedisSaver
+
+
+class CounterState(BaseModel):
+    count: int = 0
+
+
+def build_counter_graph(checkpointer):
+    builder = StateGraph(CounterState)
+    builder.add_node("increment", lambda state: {"count": state.count + 1})
+    builder.add_edge(START, "increment")
+    builder.add_edge("increment", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def thread_config(thread_id: str, **configurable) -> dict:
+    return {"configurable": {"thread_id": thread_id, **configurable}}
+
+
+class TestBoundedMemorySaver:
+    """Test cases for the BoundedMemorySaver checkpointer."""
+
+    async def test_keeps_separate_state_per_thread(self):
+        """Test that threads resume from their own checkpoints."""
+        graph = build_counter_graph(BoundedMemorySaver(max_threads=10))
+
+        await graph.ainvoke({"count": 0}, thread_config("thread-a"))
+        await graph.ainvoke({"count": 5}, thread_config("thread-b"))
+
+        assert (await graph.aget_state(thread_config("thread-a"))).values["count"] == 1
+        assert (await graph.aget_state(thread_config("thread-b"))).values["count"] == 6
+
+    async def test_evicts_least_recently_used_thread(self):
+        """Test that the oldest thread is dropped once max_threads is exceeded."""
+        checkpointer = BoundedMemorySaver(max_threads=2)
+        graph = build_counter_graph(checkpointer)
+
+        for thread_id in ("thread-a", "thread-b", "thread-c"):
+            await graph.ainvoke({"count": 0}, thread_config(thread_id))
+
+        assert set(checkpointer.storage) == {"thread-b", "thread-c"}
+        assert not any(key[0] == "thread-a" for key in checkpointer.blobs)
+        assert not any(key[0] == "thread-a" for key in checkpointer.writes)
+        assert (await graph.aget_state(thread_config("thread-a"))).values == {}
+
+    @patch("src.cache.time.monotonic")
+    async def test_expires_idle_threads(self, mock_monotonic):
+        """Test that threads idle for longer than the ttl are forgotten."""
+        mock_monotonic.return_value = 0.0
+        checkpointer = BoundedMemorySaver(max_threads=10, ttl_seconds=60)
+        graph = build_counter_graph(checkpointer)
+        await graph.ainvoke({"count": 0}, thread_config("thread-a"))
+
+        mock_monotonic.return_value = 120.0
+
+        assert (await graph.aget_state(thread_config("thread-a"))).values == {}
+        assert "thread-a" not in checkpointer.storage
+
+
+class TestRedisSaver:
+    """Test cases for the RedisSaver checkpointer."""
+
+    @pytest.fixture
+    def checkpointer(self):
+        return RedisSaver(FakeRedis(), ttl_seconds=60)
+
+    async def test_resumes_threads_from_redis(self, checkpointer):
+        """Test that a thread's state survives a new graph and saver over the same client."""
+        await build_counter_graph(checkpointer).ainvoke({"count": 0}, thread_config("thread-a"))
+        await build_counter_graph(checkpointer).ainvoke({"count": 5}, thread_config("thread-b"))
+
+        graph = build_counter_graph(RedisSaver(checkpointer.client))
+
+        assert (await graph.aget_state(thread_config("thread-a"))).values["count"] == 1
+        assert (await graph.aget_state(thread_config("thread-b"))).values["count"] == 6
+        assert (await graph.aget_state(thread_config("thread-c"))).values == {}
+
+    async def test_lists_checkpoints_newest_first(self, checkpointer):
+        """Test alist ordering, before and limit."""
+        graph = build_counter_graph(checkpointer)
+        await graph.ainvoke({"count": 0}, thread_config("thread-a"))
+        await graph.ainvoke({"count": 0}, thread_config("thread-b"))
+
+        history = [t async for t in checkpointer.alist(thread_config("thread-a"))]
+        ids = [t.config["configurable"]["checkpoint_id"] for t in history]
+        older = [t async for t in checkpointer.alist(thread_config("thread-a"), before=history[0].config, limit=1)]
+
+        assert ids == sorted(ids, reverse=True)
+        assert [t.metadata["step"] for t in history] == [1, 0, -1]
+        assert history[0].parent_config == history[1].config
+        assert [t.config for t in older] == [history[1].config]
+        assert len([t async for t in checkpointer.alist(None)]) == 2 * len(history)
+
+    async def test_pending_writes_are_loaded_with_their_checkpoint(self, checkpointer):
+        """Test that aput_writes are returned in order and are idempotent per task and index."""
+        config = await checkpointer.aput(thread_config("thread-a", checkpoint_ns=""), empty_checkpoint(), {}, {})
+
+        await checkpointer.aput_writes(config, [("count", 1), ("note", "a")], task_id="task-1")
+        await checkpointer.aput_writes(config, [("count", 2)], task_id="task-1")
+        await checkpointer.aput_writes(config, [("count", 3)], task_id="task-2")
+
+        checkpoint_tuple = await checkpointer.aget_tuple(config)
+
+        assert checkpoint_tuple.pending_writes == [
+            ("task-1", "count", 1),
+            ("task-1", "note", "a"),
+            ("task-2", "count", 3),
+        ]
+
+    async def test_writes_refresh_the_thread_ttl(self, checkpointer):
+        """Test that every key of a thread expires after ttl_seconds."""
+        config = await checkpointer.aput(thread_config("thread-a", checkpoint_ns=""), empty_checkpoint(), {}, {})
+        await checkpointer.aput_writes(config, [("count", 1)], task_id="task-1")
+
+        keys = await checkpointer.client.keys("checkpoint:thread-a:*")
+
+        assert len(keys) == 3
+        assert all(0 < ttl <= 60 for ttl in [await checkpointer.client.ttl(key) for key in keys])
+
+    async def test_nested_namespaces_stay_apart(self, checkpointer):
+        """Test that a subgraph namespace neither shadows nor is mistaken for its parent's."""
+        parent = thread_config("thread-a", checkpoint_ns="parent:1")
+        child = thread_config("thread-a", checkpoint_ns="parent:1|child:2")
+        parent_config = await checkpointer.aput(parent, empty_checkpoint(), {"source": "parent"}, {})
+        child_config = await checkpointer.aput(child, empty_checkpoint(), {"source": "child"}, {})
+        await checkpointer.aput_writes(child_config, [("count", 1)], task_id="task-1")
+
+        parent_tuple = await checkpointer.aget_tuple(parent)
+        child_tuple = await checkpointer.aget_tuple(child)
+        listed = [t async for t in checkpointer.alist(parent)]
+
+        assert parent_tuple.config == parent_config
+        assert parent_tuple.pending_writes == []
+        assert child_tuple.config == child_config
+        assert child_tuple.pending_writes == [("task-1", "count", 1)]
+        assert [t.metadata["source"] for t in listed] == ["parent"]
@@ -0,0 +1,187 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.llms.currency_converter import (
+    convert_currency,
+    convert_flights,
+    convert_many,
+    currency_converter_chain,
+    parse_amount,
+    parse_decimal,
+)
+from src.models import Flight
+from src.rates import RateTable
+
+RATES = RateTable(
+    {
+        "USD": Decimal("1"),
+        "BRL": Decimal("5.5"),
+        "EUR": Decimal("0.9"),
+        "GBP": Decimal("0.8"),
+    }
+)
+
+
+def make_flight(price: str, currency: str) -> Flight:
+    return Flight(
+        from_airport="GRU",
+        to_airport="LIS",
+        departure_date=datetime(2025, 8, 1, 8, 15),
+        airline="TAP Air Portugal",
+        price=Decimal(price),
+        currency=currency,
+        stops=0,
+        duration_in_minutes=600,
+    )
+
+
+class TestConvertCurrency:
+    """Test cases for the convert_currency tool and the convert_many API."""
+
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_converts_any_pair(self, mock_fetch_rates):
+        """Test converting between a pair that used to need its own tool."""
+        mock_fetch_rates.return_value = RATES
+
+        result = await convert_currency.ainvoke({"amount": Decimal("80"), "from_currency": "gbp", "to_currency": "EUR"})
+
+        assert result == Decimal("90.00")
+
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_convert_many_uses_one_rate_lookup(self, mock_fetch_rates):
+        """Test that a batch of amounts is converted with one rate fetch."""
+        mock_fetch_rates.return_value = RATES
+
+        result = await convert_many([Decimal("10"), Decimal("55")], "BRL", "USD")
+
+        mock_fetch_rates.assert_awaited_once()
+        assert result == [Decimal("1.82"), Decimal("10.00")]
+
+
+class TestConvertFlights:
+    """Test cases for the convert_flights function."""
+
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_converts_the_whole_batch_with_one_rate_fetch(self, mock_fetch_rates):
+        """Test that a mixed-currency batch is converted with a single rate lookup."""
+        mock_fetch_rates.return_value = RATES
+        flights = [make_flight("500", "BRL"), make_flight("90", "EUR"), make_flight("80", "GBP")]
+
+        result = await convert_flights(flights, "BRL")
+
+        mock_fetch_rates.assert_awaited_once()
+        assert [(f.price, f.currency) for f in result] == [
+            (Decimal("500"), "BRL"),
+            (Decimal("550.00"), "BRL"),
+            (Decimal("550.00"), "BRL"),
+        ]
+        assert flights[1].currency == "EUR"
+
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_skips_rate_fetch_when_already_normalized(self, mock_fetch_rates):
+        """Test that no rates are fetched when every flight is in the target currency."""
+        flights = [make_flight("500", "BRL")]
+
+        assert await convert_flights(flights, "BRL") == flights
+        mock_fetch_rates.assert_not_awaited()
+
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_keeps_unknown_currencies(self, mock_fetch_rates):
+        """Test that flights in a currency without a rate are returned unchanged."""
+        mock_fetch_rates.return_value = RATES
+        flights = [make_flight("500", "¥")]
+
+        assert await convert_flights(flights, "BRL") == flights
+
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_unsupported_target_currency_raises(self, mock_fetch_rates):
+        """Test that converting to an unknown currency raises ValueError."""
+        mock_fetch_rates.return_value = RATES
+
+        with pytest.raises(ValueError, match="Unsupported currency"):
+            await convert_flights([make_flight("500", "BRL")], "JPY")
+
+
+class TestParseAmount:
+    """Test cases for the parse_amount and parse_decimal functions."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("54.2 EUR", (Decimal("54.2"), "EUR")),
+            ("eur 54,20", (Decimal("54.20"), "EUR")),
+            ("R$ 1.234,56", (Decimal("1234.56"), "BRL")),
+            ("€99", (Decimal("99"), "EUR")),
+            ("100 reais", (Decimal("100"), "BRL")),
+            ("20 dólares?", (Decimal("20"), "USD")),
+            ("$1,500.50", (Decimal("1500.50"), "USD")),
+            ("R$ 1.000", (Decimal("1000"), "BRL")),
+            ("1,000 USD", (Decimal("1000"), "USD")),
+            ("1.234.567 BRL", (Decimal("1234567"), "BRL")),
+            ("1,234,567.89 USD", (Decimal("1234567.89"), "USD")),
+        ],
+    )
+    def test_parses_amount_and_currency(self, text, expected):
+        """Test parsing amounts with currency codes, symbols and names."""
+        assert parse_amount(text) == expected
+
+    @pytest.mark.parametrize(
+        "text", ["100", "54.2 ABC", "I have 20 EUR", "R$ 10 EUR", "Cerveja", "0.500 EUR", "1.23.456 BRL", "1,2.5 USD"]
+    )
+    def test_rejects_free_form_inputs(self, text):
+        """Test that inputs that are not a plain amount with one currency are not parsed."""
+        assert parse_amount(text) is None
+
+    def test_parse_decimal_uses_last_separator(self):
+        """Test that the last separator is taken as the decimal point."""
+        assert parse_decimal("1.234.567,8") == Decimal("1234567.8")
+
+    @pytest.mark.parametrize(
+        "amount, expected",
+        [
+            ("1.000", Decimal("1000")),
+            ("1,000", Decimal("1000")),
+            ("1.234.567", Decimal("1234567")),
+            ("12,345,678", Decimal("12345678")),
+            ("54.20", Decimal("54.20")),
+            ("1000,5", Decimal("1000.5")),
+        ],
+    )
+    def test_parse_decimal_thousands_separators(self, amount, expected):
+        """Test that repeated separators and three-digit groups are read as thousands separators."""
+        assert parse_decimal(amount) == expected
+
+    @pytest.mark.parametrize("amount", ["0.500", "1000.500", "1.23.456", "1,234.56.7"])
+    def test_parse_decimal_ambiguous_amounts(self, amount):
+        """Test that ambiguous or malformed amounts are not guessed."""
+        assert parse_decimal(amount) is None
+
+
+class TestCurrencyConverterChain:
+    """Test cases for the currency converter chain fast path."""
+
+    @patch("src.llms.currency_converter.llm_currency_converter_chain")
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_parseable_amounts_skip_the_llm(self, mock_fetch_rates, mock_llm_chain):
+        """Test that amounts with a currency are converted without tool calling."""
+        mock_fetch_rates.return_value = RATES
+        mock_llm_chain.ainvoke = AsyncMock()
+
+        assert await currency_converter_chain.ainvoke({"input": "90 EUR"}) == "90 EUR = 550.00 BRL"
+        assert await currency_converter_chain.ainvoke({"input": "R$ 10"}) == "10 BRL = 1.64 EUR"
+        mock_llm_chain.ainvoke.assert_not_awaited()
+
+    @patch("src.llms.currency_converter.llm_currency_converter_chain")
+    @patch("src.llms.currency_converter.fetch_rates", new_callable=AsyncMock)
+    async def test_free_form_inputs_use_the_llm(self, mock_fetch_rates, mock_llm_chain):
+        """Test that free-form inputs and currencies without rates go through the LLM."""
+        mock_fetch_rates.return_value = RATES
+        mock_llm_chain.ainvoke = AsyncMock(return_value="I can only convert known currencies.")
+
+        await currency_converter_chain.ainvoke({"input": "how much is a coffee in Madrid?"})
+        await currency_converter_chain.ainvoke({"input": "500 JPY"})
+
+        assert mock_llm_chain.ainvoke.await_count == 2
@@ -0,0 +1,88 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from src.models import Flight
+from src.nodes.flights_planner.ranking import (
+    RankingWeights,
+    deterministic_ranking,
+    get_ranking_engine,
+    pareto_front,
+    rank_flights,
+)
+
+
+def make_flight(airline: str, price: str, duration: int, stops: int) -> Flight:
+    return Flight(
+        from_airport="CWB",
+        to_airport="GRU",
+        departure_date=datetime(2025, 8, 1, 8, 0),
+        airline=airline,
+        price=Decimal(price),
+        currency="BRL",
+        stops=stops,
+        duration_in_minutes=duration,
+    )
+
+
+@pytest.fixture
+def flights() -> list[Flight]:
+    return [
+        make_flight("Slow cheap", "300", 600, 2),
+        make_flight("Fast pricey", "900", 60, 0),
+        make_flight("Balanced", "400", 90, 0),
+        make_flight("Cheap tie short", "300", 300, 1),
+        make_flight("Dominated", "950", 700, 2),
+    ]
+
+
+class TestRankFlights:
+    """Test cases for the deterministic rank_flights function."""
+
+    def test_default_matches_standard_criteria_sort(self, flights):
+        """Test that the default ranking is the price, duration, stops sort."""
+        expected = sorted(flights, key=lambda f: (f.price, f.duration_in_minutes, f.stops))[:3]
+
+        assert rank_flights(flights) == expected
+        assert [f.airline for f in rank_flights(flights)] == ["Cheap tie short", "Slow cheap", "Balanced"]
+
+    def test_weighted_ranking_prefers_short_flights(self, flights):
+        """Test that duration weights can outweigh price."""
+        result = rank_flights(flights, top_k=2, weights=RankingWeights(price=0.2, duration=1.0))
+
+        assert [f.airline for f in result] == ["Balanced", "Fast pricey"]
+
+    def test_pareto_front_excludes_dominated_flights(self, flights):
+        """Test that dominated flights are not part of the front."""
+        front = pareto_front(flights)
+
+        assert [f.airline for f in front] == ["Fast pricey", "Balanced", "Cheap tie short"]
+
+    def test_pareto_ranking_puts_front_first(self, flights):
+        """Test that pareto ranking fills the top with non-dominated flights."""
+        result = rank_flights(flights, top_k=4, pareto=True)
+
+        assert [f.airline for f in result] == ["Cheap tie short", "Balanced", "Fast pricey", "Slow cheap"]
+
+    def test_empty_list(self):
+        """Test ranking an empty list."""
+        assert rank_flights([]) == []
+
+
+class TestRankingEngines:
+    """Test cases for the ranking engine selection."""
+
+    async def test_deterministic_engine_uses_configured_weights(self, flights):
+        """Test that the deterministic engine reads the weights from settings."""
+        weights = {"price": 0.0, "duration": 1.0}
+        with patch("src.nodes.flights_planner.ranking.settings.FLIGHTS_RANKING_WEIGHTS", weights):
+            result = await deterministic_ranking(flights, 1)
+
+        assert result[0].airline == "Fast pricey"
+
+    def test_unknown_mode_raises(self):
+        """Test that an unknown ranking mode is rejected."""
+        with pytest.raises(ValueError, match="Unknown flights ranking mode"):
+            get_ranking_engine("magic")
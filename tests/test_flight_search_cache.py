@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from redis.exceptions import ConnectionError
+
+from src.models import Flight
+from src.nodes.flights_planner.cache import CachedFlights, FlightSearchCache
+
+
+def make_flight(airline: str = "LATAM", price: str = "500") -> Flight:
+    return Flight(
+        from_airport="GRU",
+        to_airport="LIS",
+        departure_date=datetime(2025, 8, 1, 8, 15),
+        airline=airline,
+        price=Decimal(price),
+        currency="BRL",
+        stops=0,
+        duration_in_minutes=600,
+    )
+
+
+class TestFlightSearchCache:
+    """Test cases for the FlightSearchCache class."""
+
+    async def test_miss_fetches_and_stores_normalized_key(self, fake_redis):
+        """Test that a miss scrapes once and stores the result under the normalized key."""
+        client = fake_redis
+        cache = FlightSearchCache(client, ttl_seconds=60, stale_seconds=60)
+        fetch = AsyncMock(return_value=[make_flight()])
+
+        result = await cache.get_or_fetch(" gru", "lis ", "2025-08-01", fetch)
+
+        assert result == [make_flight()]
+        fetch.assert_awaited_once()
+        assert "flights:GRU:LIS:2025-08-01" in client.data
+
+    @patch("src.nodes.flights_planner.cache.time.time")
+    async def test_fresh_hit_skips_fetch(self, mock_time, fake_redis):
+        """Test that a fresh entry is served without scraping."""
+        mock_time.return_value = 1000.0
+        client = fake_redis
+        cache = FlightSearchCache(client, ttl_seconds=60, stale_seconds=60)
+        client.data[cache.key("GRU", "LIS", "2025-08-01")] = CachedFlights(
+            fetched_at=990.0, flights=[make_flight()]
+        ).model_dump_json()
+        fetch = AsyncMock()
+
+        result = await cache.get_or_fetch("GRU", "LIS", "2025-08-01", fetch)
+
+        assert result == [make_flight()]
+        fetch.assert_not_awaited()
+
+    @patch("src.nodes.flights_planner.cache.time.time")
+    async def test_stale_hit_is_served_while_revalidating(self, mock_time, fake_redis):
+        """Test that a stale entry is returned immediately and refreshed in the background."""
+        mock_time.return_value = 1000.0
+        client = fake_redis
+        cache = FlightSearchCache(client, ttl_seconds=60, stale_seconds=600)
+        key = cache.key("GRU", "LIS", "2025-08-01")
+        client.data[key] = CachedFlights(fetched_at=900.0, flights=[make_flight(price="500")]).model_dump_json()
+        fetch = AsyncMock(return_value=[make_flight(price="450")])
+
+        result = await cache.get_or_fetch("GRU", "LIS", "2025-08-01", fetch)
+        await asyncio.sleep(0)
+
+        assert result[0].price == Decimal("500")
+        fetch.assert_awaited_once()
+        assert CachedFlights.model_validate_json(client.data[key]).flights[0].price == Decimal("450")
+
+    async def test_concurrent_misses_share_one_fetch(self, fake_redis):
+        """Test that concurrent identical searches trigger a single scrape."""
+        cache = FlightSearchCache(fake_redis, ttl_seconds=60, stale_seconds=60)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [make_flight()]
+
+        results = await asyncio.gather(*(cache.get_or_fetch("GRU", "LIS", "2025-08-01", fetch) for _ in range(10)))
+
+        assert calls == 1
+        assert all(result == [make_flight()] for result in results)
+
+    async def test_redis_errors_fall_back_to_fetch(self):
+        """Test that an unavailable Redis does not break the search."""
+        client = AsyncMock()
+        client.get.side_effect = ConnectionError("connection refused")
+        client.set.side_effect = ConnectionError("connection refused")
+        cache = FlightSearchCache(client, ttl_seconds=60, stale_seconds=60)
+
+        result = await cache.get_or_fetch("GRU", "LIS", "2025-08-01", AsyncMock(return_value=[make_flight()]))
+
+        assert result == [make_flight()]
@@ -1,6 +1,8 @@
 from decimal import Decimal
 from datetime import datetime
-from unittest.mock import patch, MagicMock
+from typing import TypedDict
+from unittest.mock import patch, AsyncMock, MagicMock
+from langgraph.graph import START, StateGraph
 from src.nodes.flights_planner.utils import parse_amount_currency, duration_to_minutes, parse_datetime_string
 from src.nodes.flights_planner.tools import search_flights
 
@@ -76,6 +78,29 @@ class TestSearchFlights:
         assert result[0].airline == "Airline 1"
         assert result[9].airline == "Airline 10"
 
+    @patch("src.nodes.flights_planner.tools.get_flights")
+    def test_search_flights_keeps_the_cheapest_beyond_the_first_results(self, mock_get_flights):
+        """Test that the best flights are kept from the whole result set, in provider order."""
+
+        mock_flights = []
+        for i, price in enumerate([900, 800, 700, 100, 600, 200]):
+            mock_flight = MagicMock()
+            mock_flight.price = f"R${price}"
+            mock_flight.departure = f"10:00 AM on Mon, Jul {i + 1}, 2024"
+            mock_flight.name = f"Airline {i + 1}"
+            mock_flight.stops = 0
+            mock_flight.duration = "2 hr"
+            mock_flights.append(mock_flight)
+
+        mock_result = MagicMock()
+        mock_result.flights = mock_flights
+        mock_get_flights.return_value = mock_result
+
+        with patch("src.nodes.flights_planner.tools.settings.FLIGHTS_SEARCH_TOP_K", 3):
+            result = search_flights.invoke({"from_airport": "GRU", "to_airport": "LIS", "departure_date": "2024-07-01"})
+
+        assert [flight.airline for flight in result] == ["Airline 4", "Airline 5", "Airline 6"]
+
     @patch("src.nodes.flights_planner.tools.get_flights")
     def test_search_flights_empty_results(self, mock_get_flights):
         """Test flight search with no results."""
@@ -88,6 +113,62 @@ class TestSearchFlights:
         assert len(result) == 0
         assert result == []
 
+    @patch("src.nodes.flights_planner.cache.flight_search_cache.client")
+    @patch("src.nodes.flights_planner.tools.get_flights")
+    async def test_search_flights_async_runs_scrape_off_the_event_loop(self, mock_get_flights, mock_redis):
+        """Test the async flight search parses results from the threaded scrape."""
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.set = AsyncMock()
+
+        mock_flight = MagicMock()
+        mock_flight.price = "R$218"
+        mock_flight.departure = "11:40 AM on Tue, Jul 1, 2025"
+        mock_flight.name = "GOL"
+        mock_flight.stops = 1
+        mock_flight.duration = "1 hr 15 min"
+
+        mock_result = MagicMock()
+        mock_result.flights = [mock_flight]
+        mock_get_flights.return_value = mock_result
+
+        result = await search_flights.ainvoke(
+            {"from_airport": "CWB", "to_airport": "GRU", "departure_date": "2025-07-01"}
+        )
+
+        assert len(result) == 1
+        assert result[0].airline == "GOL"
+        assert result[0].price == Decimal("218")
+        assert result[0].duration_in_minutes == 75
+        mock_get_flights.assert_called_once()
+
+    @patch("src.nodes.flights_planner.cache.flight_search_cache.client")
+    @patch("src.nodes.flights_planner.tools.get_flights")
+    async def test_search_flights_pushes_results_to_the_custom_stream(self, mock_get_flights, mock_redis):
+        """Test that a search inside a graph node streams its flights before the node finishes."""
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.set = AsyncMock()
+
+        mock_flight = MagicMock()
+        mock_flight.price = "R$218"
+        mock_flight.departure = "11:40 AM on Tue, Jul 1, 2025"
+        mock_flight.name = "GOL"
+        mock_flight.stops = 0
+        mock_flight.duration = "1 hr"
+        mock_get_flights.return_value = MagicMock(flights=[mock_flight])
+
+        async def search_node(state: dict):
+            await search_flights.ainvoke({"from_airport": "CWB", "to_airport": "GRU", "departure_date": "2025-07-01"})
+            return {"done": True}
+
+        builder = StateGraph(TypedDict("State", {"done": bool}))
+        builder.add_node("search", search_node)
+        builder.add_edge(START, "search")
+        graph = builder.compile()
+
+        chunks = [chunk async for chunk in graph.astream({"done": False}, stream_mode="custom")]
+
+        assert [flight.airline for flight in chunks[0]["flights"]] == ["GOL"]
+
 
 class TestParseDatetimeString:
     """Test cases for the parse_datetime_string function."""
@@ -0,0 +1,151 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.graph.traveller import build_graph
+from src.models import Flight, Hotel
+from src.nodes.hotels_planner.nodes import find_nights, wants_hotels
+from src.nodes.hotels_planner.providers import StubHotelProvider, get_hotel_provider
+from src.nodes.hotels_planner.ranking import rank_hotels
+
+FLIGHT = Flight(
+    from_airport="CWB",
+    to_airport="GRU",
+    departure_date="2099-08-01T10:00:00",
+    airline="GOL",
+    price=218,
+    currency="BRL",
+    stops=0,
+    duration_in_minutes=60,
+)
+
+
+def hotel(name: str, total_price: int, rating: float) -> Hotel:
+    return Hotel(
+        name=name,
+        address="1 Main Street",
+        check_in_date="2099-08-01",
+        check_out_date="2099-08-03",
+        price_per_night=Decimal(total_price) / 2,
+        total_price=Decimal(total_price),
+        rating=rating,
+    )
+
+
+class TestHotelIntent:
+    """Test cases for wants_hotels and find_nights."""
+
+    def test_detects_hotel_requests(self):
+        """Test that hotel and night words ask for hotels."""
+        assert wants_hotels("from GRU to LIS on 2099-08-01 and a hotel")
+        assert wants_hotels("de GRU para LIS em 2099-08-01, 4 noites")
+        assert not wants_hotels("from GRU to LIS on 2099-08-01")
+
+    def test_finds_the_number_of_nights(self):
+        """Test parsing the length of the stay."""
+        assert find_nights("a hotel for 3 nights") == 3
+        assert find_nights("5 noites em Lisboa") == 5
+        assert find_nights("a hotel in Lisbon") is None
+
+
+class TestHotelProviders:
+    """Test cases for the hotel providers."""
+
+    async def test_stub_results_are_stable(self):
+        """Test that the stub returns the same hotels for the same destination."""
+        provider = StubHotelProvider()
+
+        first = await provider.search("LIS", date(2099, 8, 1), date(2099, 8, 4))
+        second = await provider.search("lis", date(2099, 8, 1), date(2099, 8, 4))
+
+        assert first == second
+        assert len(first) == len(StubHotelProvider.NAMES)
+        assert all(h.total_price == h.price_per_night * 3 for h in first)
+
+    def test_unknown_provider(self):
+        """Test that an unknown provider name is rejected."""
+        with pytest.raises(ValueError, match="Unknown hotels provider"):
+            get_hotel_provider("booking")
+
+
+class TestRankHotels:
+    """Test cases for the rank_hotels function."""
+
+    def test_cheapest_then_best_rated(self):
+        """Test the ranking order and the rating floor."""
+        hotels = [hotel("A", 300, 4.0), hotel("B", 200, 3.5), hotel("C", 200, 4.5), hotel("D", 100, 2.0)]
+
+        assert [h.name for h in rank_hotels(hotels, top_k=3)] == ["D", "C", "B"]
+        assert [h.name for h in rank_hotels(hotels, top_k=3, min_rating=3.0)] == ["C", "B", "A"]
+
+
+class TestTravellerGraphBranches:
+    """Test cases for the parallel flight and hotel branches."""
+
+    @pytest.fixture
+    def slow_flights(self):
+        async def search(args):
+            await asyncio.sleep(0.2)
+            return [FLIGHT]
+
+        with (
+            patch("src.nodes.flights_planner.nodes.search_flights") as mock_search_flights,
+            patch("src.nodes.flights_planner.nodes.settings.FLIGHTS_CURRENCY", None),
+        ):
+            mock_search_flights.ainvoke = AsyncMock(side_effect=search)
+            yield
+
+    @patch("src.nodes.hotels_planner.nodes.get_hotel_provider")
+    @patch("src.nodes.flights_planner.nodes.search_flights")
+    @patch("src.nodes.flights_planner.nodes.settings.FLIGHTS_CURRENCY", None)
+    @patch("src.graph.traveller.settings.HOTELS_PROVIDER", "stub")
+    async def test_branches_run_in_parallel(self, mock_search_flights, mock_get_hotel_provider):
+        """Test that each branch's search only finishes once the other one has started."""
+        started = {"flights": asyncio.Event(), "hotels": asyncio.Event()}
+
+        async def rendezvous(branch: str, other: str) -> None:
+            started[branch].set()
+            await asyncio.wait_for(started[other].wait(), timeout=1)
+
+        async def search_flights(args):
+            await rendezvous("flights", "hotels")
+            return [FLIGHT]
+
+        async def search_hotels(*args):
+            await rendezvous("hotels", "flights")
+            return await StubHotelProvider().search(*args)
+
+        mock_search_flights.ainvoke = AsyncMock(side_effect=search_flights)
+        mock_get_hotel_provider.return_value.search = AsyncMock(side_effect=search_hotels)
+        graph = build_graph().compile()
+
+        result = await graph.ainvoke({"trip_details": "from CWB to GRU on 2099-08-01, hotel for 2 nights"})
+
+        assert result["ranked_flights"] == [FLIGHT]
+        assert len(result["ranked_hotels"]) == 3
+        assert result["ranked_hotels"][0].check_out_date == "2099-08-03"
+        assert "hotels" in result["friendly_greeting"]
+
+    @patch("src.nodes.hotels_planner.nodes.get_hotel_provider")
+    @patch("src.graph.traveller.settings.HOTELS_PROVIDER", "stub")
+    async def test_hotels_are_skipped_unless_asked(self, mock_get_hotel_provider, slow_flights):
+        """Test that the hotel branch only runs for trips that want hotels."""
+        graph = build_graph().compile()
+
+        result = await graph.ainvoke({"trip_details": "from CWB to GRU on 2099-08-01"})
+
+        mock_get_hotel_provider.assert_not_called()
+        assert result["ranked_flights"] == [FLIGHT]
+        assert result["ranked_hotels"] == []
+
+    @patch("src.graph.traveller.settings.HOTELS_PROVIDER", None)
+    async def test_hotels_need_a_provider(self, slow_flights):
+        """Test that asking for hotels without a configured provider only plans flights."""
+        graph = build_graph().compile()
+
+        result = await graph.ainvoke({"trip_details": "from CWB to GRU on 2099-08-01", "want_hotel_search": True})
+
+        assert result["ranked_hotels"] == []
@@ -0,0 +1,230 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from src.inflight import InflightRuns, SharedRun
+from src.models import Flight
+
+FLIGHT = Flight(
+    from_airport="CWB",
+    to_airport="GRU",
+    departure_date="2099-08-01T10:00:00",
+    airline="GOL",
+    price=218,
+    currency="BRL",
+    stops=0,
+    duration_in_minutes=60,
+)
+
+
+def ticker(count: int, fail: bool = False, delay: float = 0.01):
+    async def source(run: SharedRun):
+        for i in range(count):
+            await asyncio.sleep(delay)
+            yield i
+        if fail:
+            raise RuntimeError("boom")
+
+    return source
+
+
+async def collect(run: SharedRun) -> list:
+    return [event async for event in run.subscribe()]
+
+
+class TestSharedRun:
+    """Test cases for the SharedRun class."""
+
+    async def test_late_subscribers_get_a_replay(self):
+        """Test that every subscriber gets every event, whenever it joined."""
+        run = SharedRun(ticker(5))
+        early = asyncio.create_task(collect(run))
+        await asyncio.sleep(0.025)
+
+        late = await collect(run)
+
+        assert late == await early == [0, 1, 2, 3, 4]
+        assert await collect(run) == [0, 1, 2, 3, 4]
+
+    async def test_errors_reach_every_subscriber(self):
+        """Test that a failed producer fails its subscribers after the events it emitted."""
+        run = SharedRun(ticker(2, fail=True))
+        events = []
+
+        with pytest.raises(RuntimeError, match="boom"):
+            async for event in run.subscribe():
+                events.append(event)
+
+        assert events == [0, 1]
+        assert not run.retain
+
+
+class TestInflightRuns:
+    """Test cases for the InflightRuns class."""
+
+    async def test_joins_running_and_recent_runs(self):
+        """Test that a run is shared while it runs and for the retention time after."""
+        runs = InflightRuns(retention_seconds=60)
+        run = runs.start("key", ticker(2))
+
+        assert runs.join("key") is run
+        await collect(run)
+        assert runs.join("key") is run
+        assert runs.join("other") is None
+
+    @patch("src.inflight.time.monotonic")
+    async def test_finished_runs_expire(self, mock_monotonic):
+        """Test that a finished run is not joined after the retention time."""
+        mock_monotonic.return_value = 0.0
+        runs = InflightRuns(retention_seconds=30)
+        await collect(runs.start("key", ticker(1, delay=0)))
+
+        mock_monotonic.return_value = 31.0
+
+        assert runs.join("key") is None
+        assert "key" not in runs.runs
+
+    async def test_opted_out_runs_are_not_retained(self):
+        """Test that a run with retain unset is forgotten as soon as it ends."""
+
+        async def overloaded(run: SharedRun):
+            run.retain = False
+            yield "busy"
+
+        runs = InflightRuns(retention_seconds=60)
+        await collect(runs.start("key", overloaded))
+        await asyncio.sleep(0)
+
+        assert runs.join("key") is None
+
+    async def test_abandoned_runs_are_cancelled(self):
+        """Test that a run cancelled when abandoned stops, and cannot be joined, once its last subscriber leaves."""
+        runs = InflightRuns(retention_seconds=60)
+        run = runs.start("key", ticker(100), cancel_when_abandoned=True)
+        kept = runs.start("other", ticker(100))
+
+        for shared in (run, kept):
+            subscription = shared.subscribe()
+            await subscription.__anext__()
+            await subscription.aclose()
+
+        assert runs.join("key") is None
+        assert runs.join("other") is kept
+        await asyncio.sleep(0)
+        assert run.task.cancelled()
+        assert not kept.task.done()
+        await runs.aclose()
+
+    async def test_aclose_cancels_running_runs(self):
+        """Test that shutdown cancels the runs still going."""
+        runs = InflightRuns(retention_seconds=60)
+        run = runs.start("key", ticker(100))
+
+        await runs.aclose()
+
+        assert run.task.cancelled() and run.done
+        assert runs.runs == {}
+
+
+class TestTripPlanningDeduplication:
+    """Test cases for the deduplication of /trip/planning runs."""
+
+    @pytest.fixture
+    async def client(self):
+        from src.main import app
+
+        async def search(args):
+            await asyncio.sleep(0.1)
+            return [FLIGHT]
+
+        with (
+            patch("src.main.settings.LLM_WARM_UP", False),
+            patch("src.main.settings.FLIGHTS_CURRENCY", None),
+            patch("src.nodes.flights_planner.nodes.search_flights") as mock_search_flights,
+        ):
+            mock_search_flights.ainvoke = AsyncMock(side_effect=search)
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    client.search_flights = mock_search_flights.ainvoke
+                    yield client
+
+    async def test_identical_requests_share_one_run(self, client):
+        """Test that a double submit runs the graph once and both get the same stream."""
+        first, second = await asyncio.gather(
+            client.post("/trip/planning", json={"trip_details": "from CWB to GRU on 2099-08-01"}),
+            client.post("/trip/planning", json={"trip_details": "  From CWB to GRU on 2099-08-01!"}),
+        )
+
+        assert client.search_flights.await_count == 1
+        assert first.text == second.text
+        assert '"airline":"GOL"' in first.text
+        assert "x-shared-run" not in first.headers
+        assert second.headers["x-shared-run"] == "true"
+
+    async def test_anonymous_joiners_do_not_get_the_thread(self, client):
+        """Test that an anonymous duplicate shares the run but not its thread."""
+        payload = {"trip_details": "from CWB to GRU on 2099-08-01", "stream_format": "sse"}
+
+        first, second = await asyncio.gather(
+            client.post("/trip/planning", json=payload), client.post("/trip/planning", json=payload)
+        )
+
+        assert client.search_flights.await_count == 1
+        thread_id = first.headers["x-thread-id"]
+        assert f'"thread_id":"{thread_id}"' in first.text
+        assert "x-thread-id" not in second.headers
+        assert "thread_id" not in second.text
+        assert second.text.endswith("event: done\ndata: {}\n\n")
+
+    async def test_anonymous_requests_do_not_join_finished_runs(self, client):
+        """Test that only runs still going are shared between anonymous requests."""
+        await client.post("/trip/planning", json={"trip_details": "from CWB to GRU on 2099-08-01"})
+        await client.post("/trip/planning", json={"trip_details": "from CWB to GRU on 2099-08-01"})
+
+        assert client.search_flights.await_count == 2
+
+    async def test_retries_with_an_idempotency_key_replay_the_run(self, client):
+        """Test that a retry after completion gets the retained result."""
+        headers = {"Idempotency-Key": "trip-42"}
+        payload = {"trip_details": "from CWB to GRU on 2099-08-01", "stream_format": "sse"}
+
+        first = await client.post("/trip/planning", json=payload, headers=headers)
+        retry = await client.post("/trip/planning", json=payload, headers=headers)
+        other = await client.post(
+            "/trip/planning", json={**payload, "trip_details": "from CWB to GIG on 2099-08-01"}, headers=headers
+        )
+
+        assert client.search_flights.await_count == 1
+        assert retry.text == first.text
+        assert other.status_code == 422
+
+    async def test_retries_with_a_thread_join_the_run_after_a_disconnect(self, client):
+        """Test that a thread_id run keeps going when its client goes away, so a retry attaches to it."""
+        from src.main import TripPlanningRequest, app, planning_runs, trip_planning
+
+        request = TripPlanningRequest(
+            trip_details="from CWB to GRU on 2099-08-01", thread_id="trip-thread", stream_format="sse"
+        )
+        response = await trip_planning(request, Request({"type": "http", "app": app, "headers": []}))
+        await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+        await asyncio.sleep(0)
+
+        retry = await client.post("/trip/planning", json=request.model_dump())
+
+        assert client.search_flights.await_count == 1
+        assert retry.headers["x-shared-run"] == "true"
+        assert retry.headers["x-thread-id"] == "trip-thread"
+        assert not any(run.task.cancelled() for run in planning_runs.runs.values())
+
+    async def test_deduplication_can_be_turned_off(self, client):
+        """Test PLANNING_DEDUP_ENABLED."""
+        payload = {"trip_details": "from CWB to GRU on 2099-08-01"}
+        with patch("src.main.settings.PLANNING_DEDUP_ENABLED", False):
+            await asyncio.gather(*(client.post("/trip/planning", json=payload) for _ in range(2)))
+
+        assert client.search_flights.await_count == 2
@@ -0,0 +1,90 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from src.llms.registry import ModelRegistry, ModelSpec, ROLES, MODELS
+
+
+def _registry(roles=None, **kwargs) -> ModelRegistry:
+    return ModelRegistry(roles=roles or dict(ROLES), models=dict(MODELS), keep_alive="30m", **kwargs)
+
+
+class TestModelRegistry:
+    """Test cases for the ModelRegistry class."""
+
+    def test_roles_sharing_a_model_share_the_client(self):
+        """Test that routing and translation reuse the same resident model and client."""
+        registry = _registry()
+
+        assert registry.get_llm("routing") is registry.get_llm("translator")
+        assert registry.get_llm("routing").model == "gemma3:12b"
+
+    def test_clients_use_the_model_options(self):
+        """Test that keep_alive and num_ctx come from the model spec, with a global keep_alive default."""
+        registry = ModelRegistry(
+            roles={"routing": "gemma3:12b"},
+            models={"gemma3:12b": ModelSpec(model="gemma3:12b", num_ctx=2048, keep_alive=-1)},
+            keep_alive="30m",
+        )
+
+        llm = registry.get_llm("routing")
+
+        assert (llm.num_ctx, llm.keep_alive) == (2048, -1)
+
+    def test_roles_can_be_consolidated_onto_one_model(self):
+        """Test that every role can be served by a single resident model."""
+        registry = _registry(roles={role: "qwen3:14b" for role in ROLES})
+
+        assert registry.resident_models() == ["qwen3:14b"]
+        assert registry.get_llm("currency_converter").model == "qwen3:14b"
+        assert registry.get_llm("flights_planner").temperature == 0
+
+    def test_unknown_role_raises(self):
+        """Test that asking for an undeclared role fails loudly."""
+        registry = _registry()
+
+        with pytest.raises(ValueError, match="Unknown model role"):
+            registry.get_llm("hotels")
+
+    async def test_warm_up_loads_each_resident_model_once(self):
+        """Test that warm-up loads every distinct model with its options and records the loads."""
+        registry = _registry()
+        client = MagicMock()
+        client.generate = AsyncMock(return_value=MagicMock(load_duration=20_000_000_000))
+
+        await registry.warm_up(client)
+
+        loaded = [call.kwargs["model"] for call in client.generate.await_args_list]
+        assert loaded == ["gemma3:12b", "qwen2.5-coder:14b", "qwen3:14b"]
+        assert client.generate.await_args_list[0].kwargs["options"] == {"num_ctx": 4096}
+        assert registry.stats()["models"]["gemma3:12b"]["loads"] == 1
+
+    async def test_warm_up_failures_do_not_stop_startup(self):
+        """Test that an unreachable Ollama only logs the failure."""
+        registry = _registry()
+        client = MagicMock()
+        client.generate = AsyncMock(side_effect=ConnectionError("refused"))
+
+        await registry.warm_up(client)
+
+        assert registry.stats()["swaps"] == 0
+
+
+class TestModelUsageTracker:
+    """Test cases for counting model loads and swaps."""
+
+    def test_reloads_are_counted_as_swaps(self):
+        """Test that a second cold load of the same model counts as a swap."""
+        registry = _registry()
+
+        for load_duration in [15e9, 2e6, 12e9]:
+            message = AIMessage(content="ok")
+            generation = ChatGeneration(
+                message=message, generation_info={"model": "gemma3:12b", "load_duration": load_duration}
+            )
+            registry.tracker.on_llm_end(LLMResult(generations=[[generation]]))
+
+        stats = registry.stats()["models"]["gemma3:12b"]
+        assert (stats["calls"], stats["loads"], stats["swaps"]) == (3, 2, 1)
@@ -0,0 +1,147 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_ollama import ChatOllama
+
+from src.llms.scheduler import BATCH, INTERACTIVE, ModelLimiter, ModelOverloadedError, ScheduledChatOllama, priority
+
+
+def _limiter(**kwargs) -> ModelLimiter:
+    options = {"max_concurrency": 1, "max_queue": 4, "max_wait_seconds": 1.0, **kwargs}
+    return ModelLimiter("gemma3:12b", **options)
+
+
+class TestModelLimiter:
+    """Test cases for the ModelLimiter class."""
+
+    async def test_concurrency_is_limited(self):
+        """Test that no more than max_concurrency calls hold a slot at once."""
+        limiter = _limiter(max_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(call() for _ in range(5)))
+
+        assert peak == 2
+        assert limiter.active == 0
+
+    async def test_interactive_calls_are_served_before_batch_calls(self):
+        """Test that waiting calls are admitted by priority, then arrival order."""
+        limiter = _limiter()
+        order = []
+        await limiter.acquire()
+
+        async def call(name, level):
+            async with limiter.slot(level):
+                order.append(name)
+
+        tasks = [asyncio.create_task(call("batch", BATCH)), asyncio.create_task(call("interactive", INTERACTIVE))]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["interactive", "batch"]
+
+    async def test_priority_context_sets_the_level(self):
+        """Test that calls inside priority(BATCH) queue behind interactive ones."""
+        limiter = _limiter()
+        order = []
+        await limiter.acquire()
+
+        async def call(name):
+            async with limiter.slot():
+                order.append(name)
+
+        with priority(BATCH):
+            batch = asyncio.create_task(call("batch"))
+        interactive = asyncio.create_task(call("interactive"))
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(batch, interactive)
+
+        assert order == ["interactive", "batch"]
+
+    async def test_full_queue_rejects_right_away(self):
+        """Test that calls beyond the queue size are shed with a retry hint."""
+        limiter = _limiter(max_queue=1)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(ModelOverloadedError) as exc_info:
+            await limiter.acquire()
+
+        assert exc_info.value.reason == "queue_full"
+        assert exc_info.value.retry_after >= 1
+        waiting.cancel()
+
+    async def test_waiting_past_the_budget_gives_up(self):
+        """Test that a call waiting longer than max_wait_seconds leaves the queue."""
+        limiter = _limiter(max_wait_seconds=0.01)
+        await limiter.acquire()
+
+        with pytest.raises(ModelOverloadedError) as exc_info:
+            await limiter.acquire()
+
+        assert exc_info.value.reason == "queue_timeout"
+        assert limiter.waiting == 0
+        assert limiter.rejected == 1
+
+    async def test_cancelled_waiters_leave_the_queue(self):
+        """Test that a cancelled caller does not keep its place or leak a slot."""
+        limiter = _limiter()
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        limiter.release()
+
+        assert (limiter.waiting, limiter.active) == (0, 0)
+
+
+class TestScheduledChatOllama:
+    """Test cases for the ScheduledChatOllama client."""
+
+    async def test_calls_hold_a_slot_of_their_model(self):
+        """Test that a model call only reaches Ollama once it holds a slot."""
+        limiter = _limiter()
+        result = ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+        async def generate(*args, **kwargs):
+            assert limiter.active == 1
+            return result
+
+        with (
+            patch("src.llms.scheduler.llm_scheduler.limiter", return_value=limiter),
+            patch.object(ChatOllama, "_agenerate", AsyncMock(side_effect=generate)),
+        ):
+            response = await ScheduledChatOllama(model="gemma3:12b").ainvoke("hi")
+
+        assert response.content == "ok"
+        assert limiter.active == 0
+
+
+class TestOverloadResponses:
+    """Test cases for how overload is reported over HTTP."""
+
+    def test_trip_planning_sheds_load_before_streaming(self, client):
+        """Test that a full planner queue answers 429 with Retry-After instead of a hanging stream."""
+        limiter = _limiter(max_queue=0)
+        with patch("src.main.llm_scheduler.limiter", return_value=limiter):
+            response = client.post("/trip/planning", json={"trip_details": "somewhere warm next month"})
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
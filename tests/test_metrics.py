@@ -0,0 +1,73 @@
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from src.metrics import MetricsMiddleware, Trace, current_trace, instrument_node, registry, span
+
+
+class TestInstrumentNode:
+    """Test cases for the instrument_node decorator."""
+
+    async def test_durations_and_errors_are_recorded(self):
+        """Test that a node's calls are timed and its failures counted."""
+
+        @instrument_node("test_node")
+        async def failing_node(state):
+            raise ValueError("No flights found to rank.")
+
+        with pytest.raises(ValueError):
+            await failing_node({})
+
+        labels = {"node": "test_node"}
+        assert registry.get_sample_value("traveller_node_duration_seconds_count", labels) == 1
+        assert registry.get_sample_value("traveller_node_errors_total", labels) == 1
+
+
+class TestSpans:
+    """Test cases for per-request trace spans."""
+
+    def test_spans_are_only_recorded_inside_a_trace(self):
+        """Test that spans are free when tracing is off and recorded when it is on."""
+        with span("get_flights"):
+            pass
+
+        trace = Trace("POST /trip/planning")
+        token = current_trace.set(trace)
+        try:
+            with span("get_flights", route="GRU-LIS"):
+                pass
+        finally:
+            current_trace.reset(token)
+
+        assert [(s["name"], s["route"]) for s in trace.spans] == [("get_flights", "GRU-LIS")]
+
+
+class TestMetricsMiddleware:
+    """Test cases for the MetricsMiddleware."""
+
+    def test_requests_are_timed_and_traced(self):
+        """Test that responses carry a trace id and their trace is logged with its spans."""
+        app = FastAPI()
+        logged = []
+        app.add_middleware(MetricsMiddleware, tracing=True, log=logged.append)
+
+        @app.get("/work")
+        def work():
+            with span("work"):
+                return {"ok": True}
+
+        response = TestClient(app).get("/work")
+
+        assert response.headers["x-trace-id"] == logged[0]["trace_id"]
+        assert [s["name"] for s in logged[0]["spans"]] == ["work"]
+
+    def test_metrics_endpoint(self, client):
+        """Test that /metrics serves the Prometheus text format."""
+        client.get("/healthz")
+        response = client.get("/metrics")
+
+        assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+        expected = 'traveller_http_request_duration_seconds_count{method="GET",path="/healthz",status="200"}'
+        assert expected in response.text
@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.models import Flight
+from src.plan_cache import PlanCache, trip_signature
+
+TRIP = "from GRU to LIS on 2099-08-01"
+PARAPHRASE = "Flights GRU -> LIS, 2099-08-01 please"
+NEXT_DAY = "from GRU to LIS on 2099-08-02"
+METRO = "from São Paulo to LIS on 2099-08-01"
+UNRESOLVED = "Rio to Paris on Aug 1"
+OTHER_UNRESOLVED = "São Paulo to Lisbon on Aug 1"
+
+FLIGHT = Flight(
+    from_airport="GRU",
+    to_airport="LIS",
+    departure_date="2099-08-01T10:00:00",
+    airline="TAP",
+    price=3200,
+    currency="BRL",
+    stops=0,
+    duration_in_minutes=600,
+)
+PLAN = {"friendly_greeting": "Here you go.", "ranked_flights": [FLIGHT], "ranked_hotels": []}
+
+
+def make_cache(**kwargs) -> PlanCache:
+    options = {"ttl_seconds": 900, "maxsize": 10, **kwargs}
+    return PlanCache(**options)
+
+
+class TestPlanCache:
+    """Test cases for the PlanCache class."""
+
+    def test_paraphrases_share_a_plan(self):
+        """Test that another phrasing of the same trip is a hit."""
+        cache = make_cache()
+        cache.store(cache.lookup(TRIP), PLAN)
+
+        assert cache.lookup(PARAPHRASE).plan == PLAN
+
+    def test_other_trips_miss(self):
+        """Test that another date or a hotel request is another plan."""
+        cache = make_cache()
+        cache.store(cache.lookup(TRIP), PLAN)
+
+        assert trip_signature(TRIP) != trip_signature(NEXT_DAY)
+        assert cache.lookup(NEXT_DAY).plan is None
+        assert cache.lookup(TRIP, want_hotel_search=True).plan is None
+
+    def test_metro_areas_match_their_airports(self):
+        """Test that a trip from a metropolitan area matches one from its airport."""
+        cache = make_cache()
+        cache.store(cache.lookup(TRIP), PLAN)
+
+        assert cache.lookup(METRO).plan == PLAN
+
+    def test_unresolved_trips_bypass_the_cache(self):
+        """Test that trips without an extracted route and date are neither cached nor served."""
+        cache = make_cache()
+
+        assert trip_signature(UNRESOLVED) is None
+        cache.store(cache.lookup(UNRESOLVED), PLAN)
+
+        assert cache.lookup(OTHER_UNRESOLVED).plan is None
+        assert len(cache.entries) == 0
+
+    @patch("src.cache.time.monotonic")
+    def test_plans_expire_after_the_ttl(self, mock_monotonic):
+        """Test that plans expire from when they were made, even when used since."""
+        mock_monotonic.return_value = 0.0
+        cache = make_cache(ttl_seconds=900)
+        cache.store(cache.lookup(TRIP), PLAN)
+
+        mock_monotonic.return_value = 600.0
+        assert cache.lookup(PARAPHRASE).plan == PLAN
+
+        mock_monotonic.return_value = 901.0
+        assert cache.lookup(PARAPHRASE).plan is None
+        assert len(cache.entries) == 0
+
+    def test_least_recently_used_plan_is_evicted(self):
+        """Test that the cache never holds more than maxsize plans."""
+        cache = make_cache(maxsize=1)
+        cache.store(cache.lookup(TRIP), PLAN)
+        cache.store(cache.lookup(NEXT_DAY), PLAN)
+
+        assert len(cache.entries) == 1
+        assert cache.lookup(TRIP).plan is None
+
+
+class TestTripPlanningPlanCache:
+    """Test cases for the plan cache in /trip/planning."""
+
+    @pytest.fixture
+    def client(self, client):
+        with (
+            patch("src.main.settings.PLAN_CACHE_ENABLED", True),
+            patch("src.main.settings.FLIGHTS_CURRENCY", None),
+            patch("src.main.plan_cache", make_cache()),
+        ):
+            yield client
+
+    @patch("src.nodes.flights_planner.nodes.search_flights")
+    def test_paraphrase_skips_the_graph(self, mock_search_flights, client):
+        """Test that a cached plan is streamed without searching again."""
+        mock_search_flights.ainvoke = AsyncMock(return_value=[FLIGHT])
+
+        first = client.post("/trip/planning", json={"trip_details": TRIP})
+        second = client.post("/trip/planning", json={"trip_details": PARAPHRASE, "stream_format": "sse"})
+
+        assert mock_search_flights.ainvoke.await_count == 1
+        assert '"cached"' not in first.text
+        assert '"cached":true' in second.text
+        assert '"airline":"TAP"' in second.text
+        assert len(second.text.strip().split("\n\n")) == 2
@@ -0,0 +1,110 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.rates import RatesCache, RateTable
+
+RATES = {"USD": Decimal("1"), "BRL": Decimal("5.5"), "EUR": Decimal("0.9"), "GBP": Decimal("0.8")}
+NEW_RATES = {"USD": Decimal("1"), "BRL": Decimal("5.6"), "EUR": Decimal("0.9"), "GBP": Decimal("0.8")}
+
+
+class TestRatesCache:
+    """Test cases for the in-process RatesCache."""
+
+    @patch("src.rates.time.monotonic")
+    async def test_serves_loaded_rates_from_memory(self, mock_monotonic):
+        """Test that fresh rates are served without calling the loader again."""
+        mock_monotonic.return_value = 100.0
+        loader = AsyncMock(return_value=RATES)
+        cache = RatesCache(loader, ttl_seconds=60, refresh_after_seconds=50)
+
+        assert await cache.get() == RATES
+        mock_monotonic.return_value = 120.0
+        assert await cache.get() == RATES
+
+        loader.assert_awaited_once()
+
+    async def test_concurrent_misses_share_one_load(self):
+        """Test that concurrent callers on a cold cache trigger a single load."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return RATES
+
+        cache = RatesCache(loader, ttl_seconds=60, refresh_after_seconds=50)
+        results = await asyncio.gather(*(cache.get() for _ in range(20)))
+
+        assert calls == 1
+        assert all(result == RATES for result in results)
+
+    @patch("src.rates.time.monotonic")
+    async def test_refreshes_in_background_before_expiry(self, mock_monotonic):
+        """Test that an ageing table is served while a background refresh replaces it."""
+        mock_monotonic.return_value = 100.0
+        loader = AsyncMock(side_effect=[RATES, NEW_RATES])
+        cache = RatesCache(loader, ttl_seconds=60, refresh_after_seconds=50)
+        await cache.get()
+
+        mock_monotonic.return_value = 155.0
+        assert await cache.get() == RATES
+        await asyncio.sleep(0)
+
+        assert await cache.get() == NEW_RATES
+        assert loader.await_count == 2
+
+    @patch("src.rates.time.monotonic")
+    async def test_keeps_serving_last_rates_when_reload_fails(self, mock_monotonic):
+        """Test that a failing reload falls back to the last loaded table."""
+        mock_monotonic.return_value = 100.0
+        loader = AsyncMock(side_effect=[RATES, ValueError("Invalid response from the currency API")])
+        cache = RatesCache(loader, ttl_seconds=60, refresh_after_seconds=50)
+        await cache.get()
+
+        mock_monotonic.return_value = 200.0
+
+        assert await cache.get() == RATES
+
+    async def test_raises_when_first_load_fails(self):
+        """Test that the loader error is raised when there are no rates to fall back to."""
+        cache = RatesCache(AsyncMock(side_effect=ValueError("boom")), ttl_seconds=60, refresh_after_seconds=50)
+
+        with pytest.raises(ValueError, match="boom"):
+            await cache.get()
+
+
+class TestRateTable:
+    """Test cases for the RateTable cross-rate matrix."""
+
+    def test_cross_rates_for_every_pair(self):
+        """Test that every pair is available from a base-currency payload."""
+        table = RateTable(RATES)
+
+        assert table.rate("EUR", "BRL") == Decimal("5.5") / Decimal("0.9")
+        assert table.rate("BRL", "BRL") == Decimal("1")
+        assert len(table.matrix) == len(RATES)
+        assert all(len(row) == len(RATES) for row in table.matrix)
+
+    def test_convert_rounds_up_to_cents(self):
+        """Test that conversions are rounded up to two decimal places."""
+        table = RateTable(RATES)
+
+        assert table.convert(Decimal("90"), "EUR", "BRL") == Decimal("550.00")
+        assert table.convert(Decimal("10"), "BRL", "EUR") == Decimal("1.64")
+
+    def test_convert_many(self):
+        """Test converting a batch of amounts."""
+        table = RateTable(RATES)
+
+        assert table.convert_many([Decimal("1"), Decimal("2")], "USD", "BRL") == [Decimal("5.50"), Decimal("11.00")]
+
+    def test_unknown_currency_raises(self):
+        """Test that converting an unknown currency raises ValueError."""
+        table = RateTable(RATES)
+
+        with pytest.raises(ValueError, match="Unsupported currency: JPY"):
+            table.convert(Decimal("1"), "JPY", "BRL")
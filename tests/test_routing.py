@@ -0,0 +1,94 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.cache import TieredCache
+from src.chains.routing import classify, classify_with_rules, parse_route
+
+
+@pytest.fixture(autouse=True)
+def routing_cache(fake_redis):
+    cache = TieredCache(prefix="routing", maxsize=10, client=fake_redis)
+    with patch("src.chains.routing.routing_cache", cache):
+        yield cache
+
+
+class TestClassifyWithRules:
+    """Test cases for the rule-based classify_with_rules function."""
+
+    @pytest.mark.parametrize("text", ["54.2 EUR", "R$ 100", "€99,99", "USD 20", "100 reais", "20 dólares?"])
+    def test_amount_with_currency_is_a_conversion(self, text):
+        """Test that amounts with a currency code, symbol or name are routed to the converter."""
+        assert classify_with_rules(text) == "currency_converter"
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "I want to search for flights from CWB to GRU on March 1st, 2024.",
+            "GRU to LIS on Aug 1",
+            "CWB GRU 2025-08-01",
+            "Flights from GRU to LIS",
+        ],
+    )
+    def test_two_airports_with_a_date_or_flight_word_is_a_search(self, text):
+        """Test that two IATA codes plus a date or flight keyword are routed to the flight search."""
+        assert classify_with_rules(text) == "search_flights"
+
+    @pytest.mark.parametrize(
+        "text",
+        ["Eu quero uma cerveja, por favor", "Me empresta um dinheiro ai?", "100", "54.2 ABC", "I have 20 EUR"],
+    )
+    def test_ambiguous_inputs_are_left_to_the_llm(self, text):
+        """Test that inputs without a confident rule match return None."""
+        assert classify_with_rules(text) is None
+
+
+class TestClassify:
+    """Test cases for the classify function."""
+
+    @patch("src.chains.routing.routing_chain")
+    async def test_rules_skip_the_llm(self, mock_routing_chain):
+        """Test that confident inputs never reach the routing LLM."""
+        mock_routing_chain.ainvoke = AsyncMock()
+
+        decision = await classify({"input": "54.2 EUR"})
+
+        assert decision.route == "currency_converter"
+        assert decision.source == "rules"
+        mock_routing_chain.ainvoke.assert_not_awaited()
+
+    @patch("src.chains.routing.routing_chain")
+    async def test_falls_back_to_the_llm(self, mock_routing_chain):
+        """Test that ambiguous inputs are classified by the routing LLM."""
+        mock_routing_chain.ainvoke = AsyncMock(return_value=" translation\n")
+
+        decision = await classify({"input": "Cerveja"})
+
+        assert decision.route == "translation"
+        assert decision.source == "llm"
+
+    @patch("src.chains.routing.routing_chain")
+    async def test_repeated_inputs_are_served_from_the_cache(self, mock_routing_chain, routing_cache):
+        """Test that a retried query reuses the cached LLM decision."""
+        mock_routing_chain.ainvoke = AsyncMock(return_value="translation")
+
+        await classify({"input": "Cerveja"})
+        decision = await classify({"input": "  cerveja! "})
+
+        assert decision.route == "translation"
+        assert decision.source == "cache"
+        mock_routing_chain.ainvoke.assert_awaited_once()
+        assert routing_cache.stats()["hits"]["local"] == 1
+
+    @patch("src.chains.routing.routing_chain")
+    async def test_unknown_classifications_are_not_cached(self, mock_routing_chain, routing_cache):
+        """Test that unexpected LLM answers are not memoized."""
+        mock_routing_chain.ainvoke = AsyncMock(return_value="I do not know")
+
+        await classify({"input": "Hello"})
+
+        assert routing_cache.client.data == {}
+
+    def test_parse_route_extracts_known_routes(self):
+        """Test that extra words around the LLM classification are ignored."""
+        assert parse_route("Classification: search_flights") == "search_flights"
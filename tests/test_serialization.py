@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+from src.models import Flight, ModelResponse
+from src.serialization import dump_json, encode_message, ndjson_line, stream_message
+
+FLIGHT = Flight(
+    from_airport="CWB",
+    to_airport="GRU",
+    departure_date=datetime(2025, 8, 1, 5, 20),
+    airline="LATAM",
+    price=Decimal("155.90"),
+    currency="BRL",
+    stops=0,
+    duration_in_minutes=65,
+)
+
+
+class TestEncodeMessage:
+    """Test cases for the stream message serialization."""
+
+    def test_matches_the_json_response_encoding(self):
+        """Test that flights are encoded exactly as model_dump(mode="json") through JSONResponse was."""
+        message = stream_message("Here are the top ranked flights.", flights=[FLIGHT])
+        previous = JSONResponse(
+            content={"response": "Here are the top ranked flights.", "flights": [FLIGHT.model_dump(mode="json")]}
+        ).body
+
+        assert json.loads(encode_message(message)) == json.loads(previous)
+
+    def test_unset_fields_are_left_out(self):
+        """Test that status messages only carry the response text."""
+        assert encode_message(stream_message("Working on your request...")) == (
+            b'{"response":"Working on your request..."}'
+        )
+
+    def test_ndjson_lines_end_with_a_newline(self):
+        """Test that every NDJSON chunk is a single line."""
+        line = ndjson_line(stream_message("Found 3 flights so far...", partial=True, flights=[FLIGHT]))
+
+        assert line.endswith(b"\n")
+        assert line.count(b"\n") == 1
+        assert json.loads(line)["flights"][0]["price"] == "155.90"
+
+
+class TestDumpJson:
+    """Test cases for the dump_json function."""
+
+    def test_models_and_plain_values(self):
+        """Test dumping pydantic models nested in plain containers."""
+        value = {"answer": ModelResponse(model_response="Olá", route="translation"), "amount": Decimal("1.50")}
+
+        assert json.loads(dump_json(value)) == {
+            "answer": {"model_response": "Olá", "route": "translation", "routing_source": None},
+            "amount": "1.50",
+        }
@@ -0,0 +1,101 @@
+from unittest.mock import AsyncMock, patch
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import StrOutputParser
+
+from src.chains.routing import RoutingDecision
+from src.llms import translator
+from src.models import Flight
+from src.streaming import SSEStream, format_sse
+
+
+def _events(body: str) -> list[dict]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event = {}
+        for line in block.split("\n"):
+            field, _, value = line.partition(": ")
+            event[field] = value
+        events.append(event)
+    return events
+
+
+class TestFormatSSE:
+    """Test cases for the format_sse function."""
+
+    def test_json_event_with_id_and_type(self):
+        """Test framing a JSON payload with an id and an event type."""
+        expected = 'id: 3\nevent: token\ndata: {"token":"Olá"}\n\n'.encode()
+
+        assert format_sse({"token": "Olá"}, event="token", id=3) == expected
+
+    def test_multiline_strings_use_one_data_line_each(self):
+        """Test that newlines in the payload do not break the event framing."""
+        assert format_sse("a\nb") == b"data: a\ndata: b\n\n"
+
+    def test_stream_numbers_its_events(self):
+        """Test that events of one stream get increasing ids."""
+        sse = SSEStream()
+
+        assert [_events(sse.event("token", "x").decode())[0]["id"] for _ in range(3)] == ["1", "2", "3"]
+
+
+class TestAssistStream:
+    """Test cases for the /assist/stream endpoint."""
+
+    @patch("src.main.classify", new_callable=AsyncMock)
+    def test_translation_tokens_are_streamed_before_the_answer(self, mock_classify, client):
+        """Test that LLM tokens are pushed as they are generated, followed by the full answer."""
+        mock_classify.return_value = RoutingDecision(route="translation", source="rules")
+        fake_llm = GenericFakeChatModel(messages=iter([AIMessage(content="Olá mundo")]))
+
+        with (
+            patch.object(translator, "llm_translator_chain", translator.prompt_template | fake_llm | StrOutputParser()),
+            patch.object(translator, "translation_memory") as memory,
+        ):
+            memory.get = AsyncMock(return_value=None)
+            memory.set = AsyncMock()
+            response = client.post("/assist/stream", json={"input": "translate hello world to portuguese"})
+
+        events = _events(response.text)
+        kinds = [event["event"] for event in events]
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert kinds[0] == "route"
+        assert kinds.count("token") > 1
+        assert kinds[-2:] == ["answer", "done"]
+        assert '"model_response":"Olá mundo"' in events[-2]["data"]
+
+
+class TestTripPlanningSSE:
+    """Test cases for the SSE mode of /trip/planning."""
+
+    @patch("src.nodes.flights_planner.nodes.search_flights")
+    def test_node_updates_are_sse_events(self, mock_search_flights, client):
+        """Test that each node update is an SSE event with an id, ending with done."""
+        mock_search_flights.ainvoke = AsyncMock(
+            return_value=[
+                Flight(
+                    from_airport="CWB",
+                    to_airport="GRU",
+                    departure_date="2099-08-01T10:00:00",
+                    airline="GOL",
+                    price=218,
+                    currency="BRL",
+                    stops=0,
+                    duration_in_minutes=60,
+                )
+            ]
+        )
+
+        with patch("src.nodes.flights_planner.nodes.settings.FLIGHTS_CURRENCY", None):
+            response = client.post(
+                "/trip/planning", json={"trip_details": "from CWB to GRU on 2099-08-01", "stream_format": "sse"}
+            )
+
+        events = _events(response.text)
+        assert [event["event"] for event in events] == ["update", "update", "update", "done"]
+        assert [event["id"] for event in events] == ["1", "2", "3", "4"]
+        assert '"node":"flights_ranking_node"' in events[1]["data"]
+        assert '"node":"trip_output_node"' in events[2]["data"]
+        assert '"airline":"GOL"' in events[2]["data"]
@@ -0,0 +1,60 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.cache import TieredCache, text_key
+from src.llms.translator import preload_phrasebook, read_phrasebook, translator_chain
+
+
+@pytest.fixture(autouse=True)
+def translation_memory(pipelined_fake_redis):
+    memory = TieredCache(prefix="translation_memory", maxsize=10, client=pipelined_fake_redis)
+    with patch("src.llms.translator.translation_memory", memory):
+        yield memory
+
+
+class TestTranslationMemory:
+    """Test cases for the translation memory in front of the translator chain."""
+
+    @patch("src.llms.translator.llm_translator_chain")
+    async def test_miss_calls_the_llm_and_remembers_the_answer(self, mock_chain, translation_memory):
+        """Test that a miss is translated by the LLM and stored in the background."""
+        mock_chain.ainvoke = AsyncMock(return_value="Cerveza")
+
+        assert await translator_chain.ainvoke({"input": "Cerveja"}) == "Cerveza"
+        await asyncio.sleep(0)
+
+        assert translation_memory.client.data["translation_memory:" + text_key("Cerveja")] == "Cerveza"
+
+    @patch("src.llms.translator.llm_translator_chain")
+    async def test_normalized_hits_skip_the_llm(self, mock_chain, translation_memory):
+        """Test that case and accent variants are answered from memory."""
+        mock_chain.ainvoke = AsyncMock()
+        await translation_memory.set(text_key("Açúcar"), "Azúcar")
+
+        assert await translator_chain.ainvoke({"input": "acucar"}) == "Azúcar"
+        mock_chain.ainvoke.assert_not_awaited()
+
+
+class TestPhrasebook:
+    """Test cases for the phrasebook preload."""
+
+    def test_reads_pairs_in_both_directions(self, tmp_path):
+        """Test that every phrasebook pair is stored for both languages."""
+        phrasebook = tmp_path / "phrasebook.tsv"
+        phrasebook.write_text("Cerveja\tCerveza\nObrigado\tGracias\n", encoding="utf-8")
+
+        entries = read_phrasebook(phrasebook)
+
+        assert entries[text_key("cerveja")] == "Cerveza"
+        assert entries[text_key("CERVEZA")] == "Cerveja"
+        assert len(entries) == 4
+
+    async def test_preload_writes_to_redis(self, tmp_path, translation_memory):
+        """Test that the preload stores all entries in Redis."""
+        phrasebook = tmp_path / "phrasebook.csv"
+        phrasebook.write_text("Cerveja,Cerveza\nObrigado,Gracias\n", encoding="utf-8")
+
+        assert await preload_phrasebook(phrasebook, batch_size=3) == 4
+        assert await translation_memory.get(text_key("gracias")) == "Obrigado"
@@ -0,0 +1,192 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.graph.state import TravellerInputState
+from src.nodes.flights_planner.extractor import extract_trip_details, find_date, find_route
+from src.models import Flight
+from src.nodes.flights_planner.nodes import flights_search_node
+from src.nodes.flights_planner.tools import search_flights_fanout
+
+TODAY = date(2025, 6, 18)
+
+
+class TestExtractTripDetails:
+    """Test cases for the extract_trip_details function."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("I want to travel from CWB to GRU on August 1st, 2025", ("CWB", "GRU", date(2025, 8, 1), 1.0)),
+            ("Quero ir de GRU para LIS em 1 de agosto de 2025", ("GRU", "LIS", date(2025, 8, 1), 1.0)),
+            ("GRU-LIS 2025-08-01", ("GRU", "LIS", date(2025, 8, 1), 0.9)),
+            ("GRU to LIS on Aug 1", ("GRU", "LIS", date(2025, 8, 1), 0.8)),
+        ],
+    )
+    def test_confident_extractions(self, text, expected):
+        """Test extracting explicit IATA codes and dates."""
+        trip = extract_trip_details(text, today=TODAY)
+
+        assert (trip.from_airport, trip.to_airport, trip.departure_date, trip.confidence) == expected
+
+    @pytest.mark.parametrize(
+        "text",
+        ["São Paulo → Lisbon, 1st of August", "I want to fly to Lisbon", "CWB GRU 01/08"],
+    )
+    def test_uncertain_extractions_have_low_confidence(self, text):
+        """Test that missing or ambiguous details are below the default threshold."""
+        assert extract_trip_details(text, today=TODAY).confidence < 0.8
+
+    def test_search_args_use_iso_dates(self):
+        """Test that extracted details are formatted as search_flights arguments."""
+        trip = extract_trip_details("from CWB to GRU on 01/08/2025", today=TODAY)
+
+        assert trip.search_args() == {"from_airport": "CWB", "to_airport": "GRU", "departure_date": "2025-08-01"}
+
+    def test_currency_codes_are_not_airports(self):
+        """Test that currency codes are not taken as airports."""
+        assert find_route("USD to EUR") is None
+
+    def test_dates_without_year_roll_over_to_next_year(self):
+        """Test that a past day of the current year means next year."""
+        assert find_date("on March 3rd", today=TODAY) == (date(2026, 3, 3), 0.8)
+
+    @pytest.mark.parametrize(
+        "text, flex_days",
+        [
+            ("GRU to LIS on 2025-08-01 ±3 days", 3),
+            ("GRU to LIS on 2025-08-01 +/- 1 day", 1),
+            ("GRU to LIS on 2025-08-01, 2 days either side", 2),
+            ("GRU para LIS em 1 de agosto de 2025, datas flexíveis", 3),
+            ("GRU to LIS on 2025-08-01", 0),
+        ],
+    )
+    def test_flexible_dates(self, text, flex_days):
+        """Test detecting how many days around the departure date are acceptable."""
+        assert extract_trip_details(text, today=TODAY).date_flex_days == flex_days
+
+    def test_metro_area_names_become_area_codes(self):
+        """Test that multi-airport city names are read as metropolitan area codes."""
+        trip = extract_trip_details("from any São Paulo airport to LIS on 2025-08-01", today=TODAY)
+
+        assert (trip.from_airport, trip.to_airport, trip.confidence) == ("SAO", "LIS", 1.0)
+
+    def test_search_combinations_expand_airports_and_dates(self):
+        """Test expanding metro areas and flexible days into one search per combination."""
+        trip = extract_trip_details("from SAO to LIS on 2025-08-01 ±1 day", today=TODAY)
+
+        combinations = trip.search_combinations(max_flex_days=3, today=TODAY)
+
+        assert len(combinations) == 9
+        assert {c["from_airport"] for c in combinations} == {"GRU", "CGH", "VCP"}
+        assert {c["departure_date"] for c in combinations} == {"2025-07-31", "2025-08-01", "2025-08-02"}
+
+    def test_search_combinations_cap_flex_days_and_skip_past_dates(self):
+        """Test that the flexibility is capped and never searches days before today."""
+        trip = extract_trip_details("GRU to LIS on 2025-06-19 ±5 days", today=TODAY)
+
+        combinations = trip.search_combinations(max_flex_days=2, today=TODAY)
+
+        assert [c["departure_date"] for c in combinations] == ["2025-06-18", "2025-06-19", "2025-06-20", "2025-06-21"]
+
+
+class TestFlightsSearchNode:
+    """Test cases for the flights_search_node planning step."""
+
+    @patch("src.nodes.flights_planner.nodes.search_flights")
+    @patch("src.nodes.flights_planner.nodes.llm")
+    async def test_confident_extraction_skips_the_llm(self, mock_llm, mock_search_flights):
+        """Test that explicit trip details go straight to the flight search."""
+        mock_search_flights.ainvoke = AsyncMock(return_value=[])
+
+        result = await flights_search_node(TravellerInputState(trip_details="from CWB to GRU on 2025-08-01"))
+
+        mock_llm.bind_tools.assert_not_called()
+        mock_search_flights.ainvoke.assert_awaited_once_with(
+            {"from_airport": "CWB", "to_airport": "GRU", "departure_date": "2025-08-01"}
+        )
+        assert result["trip_extraction_confidence"] == 1.0
+
+    @patch("src.nodes.flights_planner.nodes.search_flights")
+    @patch("src.nodes.flights_planner.nodes.llm")
+    async def test_uncertain_extraction_falls_back_to_the_llm(self, mock_llm, mock_search_flights):
+        """Test that vague trip details are planned by the tool-calling LLM."""
+        args = {"from_airport": "GRU", "to_airport": "LIS", "departure_date": "2025-08-01"}
+        llm_with_tools = MagicMock()
+        llm_with_tools.ainvoke = AsyncMock(
+            return_value=AIMessage(content="", tool_calls=[{"name": "search_flights", "args": args, "id": "1"}])
+        )
+        mock_llm.bind_tools.return_value = llm_with_tools
+        mock_search_flights.ainvoke = AsyncMock(return_value=[])
+
+        result = await flights_search_node(TravellerInputState(trip_details="São Paulo to Lisbon, 1st of August"))
+
+        mock_search_flights.ainvoke.assert_awaited_once_with(args)
+        assert result["trip_extraction_confidence"] == 0.0
+
+    @patch("src.nodes.flights_planner.nodes.search_flights_fanout", new_callable=AsyncMock)
+    @patch("src.nodes.flights_planner.nodes.search_flights")
+    async def test_flexible_trip_fans_out(self, mock_search_flights, mock_fanout):
+        """Test that several airport and date combinations are searched together."""
+        mock_fanout.return_value = []
+
+        await flights_search_node(TravellerInputState(trip_details="from SAO to LIS on 2099-08-01 ±1 day"))
+
+        combinations = mock_fanout.await_args.args[0]
+        assert len(combinations) == 9
+        mock_search_flights.ainvoke.assert_not_called()
+
+
+def _flight(airline: str, price: float) -> Flight:
+    return Flight(
+        from_airport="GRU",
+        to_airport="LIS",
+        departure_date="2025-08-01T10:00:00",
+        airline=airline,
+        price=price,
+        currency="BRL",
+        stops=0,
+        duration_in_minutes=600,
+    )
+
+
+class TestSearchFlightsFanout:
+    """Test cases for the search_flights_fanout function."""
+
+    @patch("src.nodes.flights_planner.tools.search_flights")
+    async def test_concurrency_is_bounded(self, mock_search_flights):
+        """Test that no more than max_concurrency searches run at once."""
+        running = 0
+        peak = 0
+
+        async def search(args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return [_flight(args["departure_date"], 100)]
+
+        mock_search_flights.ainvoke = search
+        combinations = [{"from_airport": "GRU", "to_airport": "LIS", "departure_date": str(day)} for day in range(8)]
+
+        flights = await search_flights_fanout(combinations, max_concurrency=3)
+
+        assert peak == 3
+        assert len(flights) == 8
+
+    @patch("src.nodes.flights_planner.tools.search_flights")
+    async def test_results_are_merged_and_deduplicated(self, mock_search_flights):
+        """Test that duplicates are dropped and a failed search does not fail the others."""
+        mock_search_flights.ainvoke = AsyncMock(
+            side_effect=[[_flight("LATAM", 100), _flight("TAP", 200)], RuntimeError("blocked"), [_flight("LATAM", 100)]]
+        )
+        combinations = [{"from_airport": code, "to_airport": "LIS", "departure_date": "2025-08-01"} for code in "ABC"]
+
+        flights = await search_flights_fanout(combinations, max_concurrency=2)
+
+        assert [flight.airline for flight in flights] == ["LATAM", "TAP"]